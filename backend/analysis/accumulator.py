@@ -0,0 +1,132 @@
+import numpy as np
+
+from analysis.landmarks import LANDMARK_FIELDS, NUM_LANDMARKS
+from analysis.posture_metrics import SERIES, aggregate_landmarks, score_aggregates
+
+# Frames buffered before they are folded into the running moments
+ACCUMULATOR_BLOCK = 256
+
+
+class PostureAccumulator:
+    """
+    Online posture scoring engine with constant memory
+
+    Frames are ingested one at a time (add) or in batches (add_batch).
+    Each series keeps only a count, running mean and sum of squared
+    deviations (Welford / Chan et al.), so memory does not grow with the
+    video and the variance stays accurate over multi-hour sessions.
+    Single frames are buffered in a small block and folded in with one
+    vectorized pass per block.
+
+    score() returns the full scoring dict at any moment, snapshot() /
+    from_snapshot() round-trip the state (JSON and pickle safe), and
+    merge() combines accumulators of disjoint frame ranges exactly.
+    """
+
+    def __init__(self, fps: float = 0.0, block_size: int = ACCUMULATOR_BLOCK):
+        self.fps = float(fps)
+        # Frame counters are owned by the frame source and copied in
+        self.total_frames = 0
+        self.sampled_frames = 0
+        self.frames_with_pose = 0
+        self._mean = {name: 0.0 for name, _, _ in SERIES}
+        self._m2 = {name: 0.0 for name, _, _ in SERIES}
+        self._block = np.empty((max(1, block_size), NUM_LANDMARKS, len(LANDMARK_FIELDS)), dtype=np.float32)
+        self._pending = 0
+
+    # ---------- Ingest ----------
+    def add(self, landmarks):
+        """
+        Adds one frame with a detected pose
+
+        `landmarks` is a (33, 4) array or MediaPipe's landmark list
+        """
+        if isinstance(landmarks, np.ndarray):
+            self._block[self._pending] = landmarks
+        else:
+            self._block[self._pending] = [(p.x, p.y, p.z, p.visibility) for p in landmarks]
+        self._pending += 1
+        if self._pending == len(self._block):
+            self.flush()
+
+    def add_batch(self, lms: np.ndarray):
+        """Adds a (frames, 33, 4) array of frames with a detected pose"""
+        self.flush()
+        if len(lms):
+            self.add_moments(aggregate_landmarks(lms))
+
+    def add_moments(self, agg: dict):
+        """Merges count / mean / var aggregates (see aggregate_landmarks)"""
+        n_b = agg["frames_with_pose"]
+        if n_b == 0:
+            return
+        n_a = self.frames_with_pose
+        n = n_a + n_b
+        for name, _, _ in SERIES:
+            mean_b = agg[f"{name}_mean"]
+            delta = mean_b - self._mean[name]
+            self._mean[name] += delta * n_b / n
+            self._m2[name] += agg[f"{name}_var"] * n_b + delta * delta * n_a * n_b / n
+        self.frames_with_pose = n
+
+    def flush(self):
+        """Folds buffered single frames into the running moments"""
+        if self._pending:
+            pending, self._pending = self._pending, 0
+            self.add_moments(aggregate_landmarks(self._block[:pending]))
+
+    # ---------- Combine / persist ----------
+    def merge(self, other: "PostureAccumulator") -> "PostureAccumulator":
+        """Adds another accumulator's frames and counters into this one"""
+        other.flush()
+        self.flush()
+        self.add_moments(other.moments())
+        self.total_frames += other.total_frames
+        self.sampled_frames += other.sampled_frames
+        if not self.fps:
+            self.fps = other.fps
+        return self
+
+    def snapshot(self) -> dict:
+        self.flush()
+        return {
+            "fps": self.fps,
+            "total_frames": self.total_frames,
+            "sampled_frames": self.sampled_frames,
+            "frames_with_pose": self.frames_with_pose,
+            "series": {
+                name: {"mean": self._mean[name], "m2": self._m2[name]}
+                for name, _, _ in SERIES
+            },
+        }
+
+    @classmethod
+    def from_snapshot(cls, snap: dict) -> "PostureAccumulator":
+        acc = cls(snap["fps"])
+        acc.total_frames = snap["total_frames"]
+        acc.sampled_frames = snap["sampled_frames"]
+        acc.frames_with_pose = snap["frames_with_pose"]
+        for name, _, _ in SERIES:
+            acc._mean[name] = snap["series"][name]["mean"]
+            acc._m2[name] = snap["series"][name]["m2"]
+        return acc
+
+    # ---------- Results ----------
+    def moments(self) -> dict:
+        """Counters plus <series>_mean / <series>_var, as score_aggregates expects"""
+        self.flush()
+        n = self.frames_with_pose
+        out = {
+            "fps": self.fps,
+            "total_frames": self.total_frames,
+            "sampled_frames": self.sampled_frames,
+            "frames_with_pose": n,
+        }
+        for name, _, _ in SERIES:
+            out[f"{name}_mean"] = self._mean[name]
+            out[f"{name}_var"] = self._m2[name] / n if n else 0.0
+        return out
+
+    def score(self) -> dict:
+        """Metrics, score, weak label and feature vector so far"""
+        return score_aggregates(self.moments())
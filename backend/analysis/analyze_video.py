@@ -1,18 +1,30 @@
 import sys
 import os
 import json
+import time
 import hashlib
+from contextlib import closing
 from datetime import datetime
 
-import cv2
-import mediapipe as mp
 import numpy as np
 
+# Allow running as a script (python analysis/analyze_video.py ...)
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis.accumulator import PostureAccumulator
+from analysis.landmarks import LandmarkBuffer
+from analysis.posture_metrics import rounded_metrics, safe_div
+from analysis.timeseries import write_series
+
 
 # ============================================================
 # Configuration
 # ============================================================
 
+# Bumped whenever scoring or extraction changes, so cached analyses expire
+ANALYSIS_VERSION = "mediapipe-calibrated-v3"
+
 # Minimum confidence required for MediaPipe pose landmarks
 # Lower values increase coverage but risk noisy detections
 POSE_CONFIDENCE = 0.35
@@ -20,10 +32,39 @@ POSE_CONFIDENCE = 0.35
 #To reduce compute cost and smooth noise, we analyze every 2nd frame instead of every frame
 FRAME_SAMPLE_RATE = 2 
 
-# Calibrated biomechanical ideals (empirically derived for piano)
-# Acts as reference points, not hard rules
-IDEAL_HEAD_ANGLE = 163.0
-IDEAL_TORSO_ANGLE = 179.0
+# "fixed" analyzes every FRAME_SAMPLE_RATE-th frame. "adaptive" skips
+# static stretches, samples up to every FRAME_SAMPLE_RATE-th frame while
+# the player moves, and caps inferences per minute of video.
+# Adaptive is opt-in: its aggregates are not time-weighted, so coverage
+# and the mean / variance metrics shift toward high-motion frames and
+# no longer match what the classifier was trained on (fixed-rate
+# features). metadata["sampler"]["mode"] records which one ran
+SAMPLING_MODE = os.getenv("SAMPLING_MODE", "fixed")
+MAX_INFERENCES_PER_MIN = int(os.getenv("MAX_INFERENCES_PER_MIN", "600"))
+
+# "pipelined" decodes on a background thread while pose inference runs,
+# "serial" decodes and infers one frame at a time on the same thread
+ANALYSIS_MODE = os.getenv("ANALYSIS_MODE", "pipelined")
+
+# Number of preallocated RGB buffers between decode and inference
+PIPELINE_RING_SIZE = 4
+
+# Resize frames after decoding so the longer side is at most this many
+# pixels, before color conversion and inference (0 = off). Frames are
+# always decoded at full resolution; on 1080p the resize costs more than
+# the smaller conversion saves (benchmarks/bench_decode.py), so it is off
+DECODE_MAX_SIDE = int(os.getenv("DECODE_MAX_SIDE", "0"))
+
+# Seek instead of grabbing when the sampler's next wanted frame is at least
+# this many frames ahead (0 = never seek). The fixed sampler at
+# FRAME_SAMPLE_RATE 2 never has a gap over 1 and the adaptive one can't
+# tell its next frame in advance, so this only matters for sparse fixed
+# rates; even there seeking back to a keyframe measured slower than grabbing
+SEEK_MIN_GAP = int(os.getenv("SEEK_MIN_GAP", "0"))
+
+# Seconds between progress reports (frame counts + provisional posture
+# statistics) while a video is being analyzed
+ANALYSIS_PROGRESS_SEC = float(os.getenv("ANALYSIS_PROGRESS_SEC", "1.0"))
 
 
 # ============================================================
@@ -51,27 +92,6 @@ def compute_angle_vertical(p1, p2) -> float:
     return angle
 
 
-def angle_deviation(angle: float, ideal: float) -> float:
-    """Measures how far a posture angle deviates from a calibrated 'ideal' reference"""
-    return abs(float(angle) - float(ideal))
-
-
-def clamp01(x: float) -> float:
-    """
-    Clamps values into [0, 1] so penalties
-    remain bounded and composable.
-    """
-    return max(0.0, min(1.0, float(x)))
-
-
-def safe_div(a: float, b: float, default: float = 0.0) -> float:
-    """
-    Safe division helper used for coverage and duration
-    to avoid runtime errors on edge cases
-    """
-    return float(a) / float(b) if b != 0 else float(default)
-
-
 def video_id_from_path(video_path: str) -> str:
     """
     Generates a stable, deterministic ID for a video
@@ -81,195 +101,255 @@ def video_id_from_path(video_path: str) -> str:
 
 
 # ============================================================
-# Main analysis
+# Pose model
 # ============================================================
 
-def main():
-    # Usage:
-    # python analyze_video.py <video_path> <instrument> <output_json_path>
+def create_pose():
+    """
+    Builds the MediaPipe Pose graph used for analysis
 
-    if len(sys.argv) != 4:
-        print("Invalid arguments", file=sys.stderr)
-        sys.exit(1)
+    Building the graph is the expensive part of startup, so long-lived
+    workers create it once and reuse it across videos
+    """
+    import mediapipe as mp
 
-    video_path = sys.argv[1]
-    instrument = sys.argv[2]
-    output_path = sys.argv[3]
+    return mp.solutions.pose.Pose(
+        static_image_mode=False,
+        model_complexity=1,
+        min_detection_confidence=POSE_CONFIDENCE,
+        min_tracking_confidence=POSE_CONFIDENCE,
+    )
+
+
+# ============================================================
+# Main analysis
+# ============================================================
 
+def analyze_range(
+    video_path: str,
+    pose=None,
+    mode: str = ANALYSIS_MODE,
+    sampling: str = SAMPLING_MODE,
+    start_frame: int = 1,
+    end_frame: int = None,
+    warmup_frames: int = 0,
+    keep_landmarks: bool = False,
+    progress=None,
+) -> dict:
+    """
+    Runs pose extraction on frames [start_frame, end_frame) of a video
+
+    Returns mergeable partial aggregates (see merge_partials) rather than
+    a finished analysis, so long videos can be split across workers.
+    Posture statistics are accumulated online, so memory stays constant
+    however long the range is.
+    `warmup_frames` before the range are run through Pose to prime its
+    tracking state but are not counted. With `keep_landmarks` the raw
+    per-frame landmarks are included as "landmarks" / "frame_index".
+    `progress`, if given, is called every ANALYSIS_PROGRESS_SEC with a
+    progress_report() dict; it must not block.
+
+    If a warm `pose` graph is passed in it is reset and reused,
+    otherwise a new one is created and closed when the range is done.
+    Raises FileNotFoundError / RuntimeError on unreadable input.
+    """
     if not os.path.exists(video_path):
-        print("Video file not found", file=sys.stderr)
-        sys.exit(1)
+        raise FileNotFoundError("Video file not found")
 
+    import cv2
+
+    from analysis.frames import open_frames
+    from analysis.sampling import make_sampler
+
+    # Opening a FIFO blocks until the first bytes arrive, so time from here
+    opened_at = time.perf_counter()
     cap = cv2.VideoCapture(video_path)
     if not cap.isOpened():
-        print("Failed to open video", file=sys.stderr)
-        sys.exit(1)
+        raise RuntimeError("Failed to open video")
 
     fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
 
-    # Counters
-    total_frames = 0
-    sampled_frames = 0
-    frames_with_pose = 0
-
-    mp_pose = mp.solutions.pose
-    pose = mp_pose.Pose(
-        static_image_mode=False,
-        model_complexity=1,
-        min_detection_confidence=POSE_CONFIDENCE,
-        min_tracking_confidence=POSE_CONFIDENCE,
+    owns_pose = pose is None
+    if owns_pose:
+        pose = create_pose()
+    else:
+        # Drop tracking state left over from the previous video
+        pose.reset()
+
+    posture = PostureAccumulator(fps)
+
+    # Frames in the range (0 when the container doesn't say, e.g. streams)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    span = max(0, (end_frame or frame_count + 1) - start_frame) if frame_count else 0
+
+    # Per-frame landmarks (only kept for the series artifact), preallocated
+    # for the most frames the sampler can pick
+    buffer = None
+    if keep_landmarks:
+        buffer = LandmarkBuffer(span // FRAME_SAMPLE_RATE + 1)
+
+    sampler = make_sampler(sampling, fps, FRAME_SAMPLE_RATE, MAX_INFERENCES_PER_MIN)
+    frames = open_frames(
+        cap,
+        sampler,
+        mode,
+        ring_size=PIPELINE_RING_SIZE,
+        max_side=DECODE_MAX_SIDE,
+        seek_gap=SEEK_MIN_GAP,
+        start=start_frame,
+        end=end_frame,
+        warmup=warmup_frames,
     )
-
-    # Per-frame measurements
-    head_angles = []
-    torso_angles = []
-
-    frame_index = 0
+    started = time.perf_counter()
+    first_frame_at = None
+    reported_at = started
 
     # ------------------------------------------------------------
-    # Frame loop
+    # Frame loop (decode -> inference)
     # ------------------------------------------------------------
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        total_frames += 1
-        frame_index += 1
-        # Skip frames based on sampling rate to reduce noise and computational load
-        if frame_index % FRAME_SAMPLE_RATE != 0:
-            continue
-
-        sampled_frames += 1
-        #Convert frame to RGB and run pose estimation
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = pose.process(rgb)
-        #Only process frames where a valid pose was detected
-        if not result.pose_landmarks:
-            continue
-
-        frames_with_pose += 1
-        lm = result.pose_landmarks.landmark
-
-        #Extract the landmarks we care about (ears, shoulders, hips)
-        left_ear = lm[mp_pose.PoseLandmark.LEFT_EAR]
-        left_shoulder = lm[mp_pose.PoseLandmark.LEFT_SHOULDER]
-        right_shoulder = lm[mp_pose.PoseLandmark.RIGHT_SHOULDER]
-        left_hip = lm[mp_pose.PoseLandmark.LEFT_HIP]
-        right_hip = lm[mp_pose.PoseLandmark.RIGHT_HIP]
-
-        # Head posture metric: 
-        # Angle between ear -> shoulder relative to vertical
-        head_angle = compute_angle_vertical(
-            (left_ear.x, left_ear.y),
-            (left_shoulder.x, left_shoulder.y),
-        )
-        head_angles.append(head_angle)
-
-        # Torso angle (shoulder-mid → hip-mid)
-        shoulder_mid = (
-            (left_shoulder.x + right_shoulder.x) / 2.0,
-            (left_shoulder.y + right_shoulder.y) / 2.0,
-        )
-        hip_mid = (
-            (left_hip.x + right_hip.x) / 2.0,
-            (left_hip.y + right_hip.y) / 2.0,
-        )
-
-        #Torso posture metric: 
-        #Angle between midpoint of shoulders and hips
-        # relative to vertical
-        torso_angle = compute_angle_vertical(shoulder_mid, hip_mid)
-        torso_angles.append(torso_angle)
-
-    cap.release()
-    pose.close()
+    try:
+        # The frame source is closed (its decoder thread joined) before
+        # the capture it reads from is released, also on errors
+        with closing(frames):
+            for index, rgb in frames:
+                if first_frame_at is None:
+                    first_frame_at = time.perf_counter()
+                result = pose.process(rgb)
+
+                # Warm-up frames only prime tracking.
+                # Only keep frames where a valid pose was detected
+                if index >= start_frame and result.pose_landmarks:
+                    posture.add(result.pose_landmarks.landmark)
+                    if buffer is not None:
+                        buffer.append(index, result.pose_landmarks.landmark)
+
+                if progress is not None and time.perf_counter() - reported_at >= ANALYSIS_PROGRESS_SEC:
+                    reported_at = time.perf_counter()
+                    progress(progress_report(frames, posture, span, reported_at - started))
+    finally:
+        cap.release()
+        if owns_pose:
+            pose.close()
+
+    elapsed = time.perf_counter() - started
+
+    posture.total_frames = frames.total_frames
+    posture.sampled_frames = frames.sampled_frames
+
+    partial = {
+        "posture": posture.snapshot(),
+        "sampler": sampler.summary(),
+        "decode": frames.summary(),
+        "processing_sec": elapsed,
+        "first_frame_sec": (first_frame_at or time.perf_counter()) - opened_at,
+    }
+    if keep_landmarks:
+        partial["landmarks"] = buffer.landmarks.copy()
+        partial["frame_index"] = buffer.indices.copy()
+    return partial
+
+
+def progress_report(frames, posture: PostureAccumulator, frame_count: int, elapsed: float) -> dict:
+    """Progress so far for one range, with its provisional posture state"""
+    posture.total_frames = frames.total_frames
+    posture.sampled_frames = frames.sampled_frames
+    return {
+        "frames_decoded": frames.total_frames,
+        "frames_analyzed": frames.sampled_frames,
+        "frame_count": frame_count,
+        "elapsed_sec": elapsed,
+        "posture": posture.snapshot(),
+    }
 
-    # ------------------------------------------------------------
-    # Aggregate metrics
-    # ------------------------------------------------------------
 
-    # Coverage tells us how much of the video contained a usable pose
-    pose_coverage = safe_div(frames_with_pose, total_frames)
-    pose_coverage_sampled = safe_div(frames_with_pose, sampled_frames)
-    #Session duration inferred from frame count
-    duration_sec = safe_div(total_frames, fps) if fps > 0 else 0.0
-
-    #Mean posture angles across the session
-    head_mean = float(np.mean(head_angles)) if head_angles else 0.0
-    head_var = float(np.var(head_angles)) if head_angles else 0.0
-    torso_mean = float(np.mean(torso_angles)) if torso_angles else 0.0
-
-    # Deviations from calibrated ideals
-    head_dev = angle_deviation(head_mean, IDEAL_HEAD_ANGLE)
-    torso_dev = angle_deviation(torso_mean, IDEAL_TORSO_ANGLE)
-
-    # Stability captures how consistent posture is over time
-    # (low varience = stable posture)
-    if head_angles:
-        devs = [angle_deviation(a, IDEAL_HEAD_ANGLE) for a in head_angles]
-        stability_std = float(np.std(devs))
-    else:
-        stability_std = 0.0
+def merge_partials(partials: list) -> dict:
+    """
+    Combines per-range partial aggregates into one
 
-    # ------------------------------------------------------------
-    # Scoring
-    # ------------------------------------------------------------
-    
-    #Normalize penalties so they can be weighted together
-    head_penalty = clamp01(head_dev / 25.0)
-    torso_penalty = clamp01(torso_dev / 20.0)
-    stability_penalty = clamp01(stability_std / 10.0)
-    #Weighted quality score (domain-informed weights)
-    quality = 1.0 - (
-        0.40 * head_penalty +
-        0.35 * torso_penalty +
-        0.25 * stability_penalty
-    )
-    quality = clamp01(quality)
-    #Reduce score if pose detection was poor
-    coverage_mult = clamp01((pose_coverage_sampled - 0.30) / 0.50)
-    #Final score in [0, 100]
-    overall_score = int(round(
-        100.0 * quality * (0.60 + 0.40 * coverage_mult)
-    ))
-    overall_score = max(0, min(100, overall_score))
+    Posture accumulators merge exactly, so scoring the merged partial
+    gives the same means / variances as a single pass.
+    """
+    posture = PostureAccumulator.from_snapshot(partials[0]["posture"])
+    for p in partials[1:]:
+        posture.merge(PostureAccumulator.from_snapshot(p["posture"]))
+
+    merged = {"posture": posture.snapshot()}
+    merged["processing_sec"] = max(p["processing_sec"] for p in partials)
+    merged["first_frame_sec"] = partials[0]["first_frame_sec"]
+
+    decode = {}
+    for p in partials:
+        for key, value in p["decode"].items():
+            decode[key] = value if key == "max_side" else decode.get(key, 0) + value
+    merged["decode"] = decode
+
+    sampler = dict(partials[0]["sampler"])
+    if "decisions" in sampler:
+        sampler["decisions"] = {
+            key: sum(p["sampler"]["decisions"][key] for p in partials)
+            for key in sampler["decisions"]
+        }
+        per_minute = []
+        for p in partials:
+            for minute, count in enumerate(p["sampler"]["inferences_per_minute"]):
+                if minute >= len(per_minute):
+                    per_minute.append(0)
+                per_minute[minute] += count
+        sampler["inferences_per_minute"] = per_minute
+    merged["sampler"] = sampler
+
+    # Chunks are passed in video order, so their series simply concatenate
+    if "landmarks" in partials[0]:
+        merged["landmarks"] = np.concatenate([p["landmarks"] for p in partials])
+        merged["frame_index"] = np.concatenate([p["frame_index"] for p in partials])
+    return merged
+
+
+def save_series(partial: dict, series_path: str):
+    """
+    Writes the landmark time series of a partial and drops it from the dict
 
-    # ------------------------------------------------------------
-    # Weak label
-    # ------------------------------------------------------------
+    The artifact header carries everything build_analysis needs besides
+    the landmarks, so metrics can be recomputed without the video.
+    """
+    write_series(
+        series_path,
+        partial.pop("frame_index"),
+        partial.pop("landmarks"),
+        partial["posture"]["fps"],
+        meta={
+            "analysis_version": ANALYSIS_VERSION,
+            "pose_confidence": POSE_CONFIDENCE,
+            "frame_sample_rate": FRAME_SAMPLE_RATE,
+            "total_frames": partial["posture"]["total_frames"],
+            "sampled_frames": partial["posture"]["sampled_frames"],
+            "sampler": partial["sampler"],
+            "decode": partial["decode"],
+        },
+    )
 
-    #Heuristic bucket used for quick user feedback and baseline interpretation
-    if pose_coverage_sampled < 0.25:
-        weak_label = "Unknown"
-    elif overall_score >= 85:
-        weak_label = "Excellent"
-    elif overall_score >= 70:
-        weak_label = "Good"
-    elif overall_score >= 55:
-        weak_label = "Okay"
-    else:
-        weak_label = "Risky"
 
-    # ------------------------------------------------------------
-    # Feature vector (for ML)
-    # ------------------------------------------------------------
+# ============================================================
+# Scoring
+# ============================================================
 
-    #Raw, un-normalized metrics used as ML inputs. 
-    # ML interprets these signals, does not replace them
-    feature_vector = {
-        "head_angle_mean_deg": head_mean,
-        "head_angle_var": head_var,
-        "torso_angle_mean_deg": torso_mean,
-        "head_dev_deg": head_dev,
-        "torso_dev_deg": torso_dev,
-        "stability_std_dev_deg": stability_std,
-        "pose_coverage": pose_coverage,
-        "pose_coverage_sampled": pose_coverage_sampled,
-        "session_duration_sec": duration_sec,
-        "sampled_frames": float(sampled_frames),
-        "frames_with_pose": float(frames_with_pose),
-    }
+def build_analysis(
+    partial: dict,
+    video_path: str,
+    instrument: str,
+    mode: str = ANALYSIS_MODE,
+) -> dict:
+    """Turns (merged) partial aggregates into the final analysis dict"""
+    posture = PostureAccumulator.from_snapshot(partial["posture"])
+    fps = posture.fps
+    total_frames = posture.total_frames
+    sampled_frames = posture.sampled_frames
+    frames_with_pose = posture.frames_with_pose
+    elapsed = partial["processing_sec"]
+
+    # Metrics, score and weak label (shared with the live path)
+    scored = posture.score()
+    feature_vector = scored["feature_vector"]
 
     # ------------------------------------------------------------
     # Final output
@@ -280,46 +360,102 @@ def main():
         "video_id": video_id_from_path(video_path),
         "instrument": instrument,
         "created_at": datetime.utcnow().isoformat() + "Z",
-        "overall_score": overall_score,
-        "weak_label": weak_label,
+        "overall_score": scored["overall_score"],
+        "weak_label": scored["weak_label"],
         "feature_vector": {
             k: round(v, 6) if isinstance(v, float) else v
             for k, v in feature_vector.items()
         },
-        "metrics": {
-            "head_angle_mean_deg": round(head_mean, 2),
-            "torso_angle_mean_deg": round(torso_mean, 2),
-            "head_dev_deg": round(head_dev, 2),
-            "torso_dev_deg": round(torso_dev, 2),
-            "stability_std_dev_deg": round(stability_std, 3),
-            "pose_coverage": round(pose_coverage, 3),
-            "pose_coverage_sampled": round(pose_coverage_sampled, 3),
-        },
+        "metrics": rounded_metrics(scored),
         "feedback": [
             "Maintain neutral head alignment to reduce neck strain.",
             "Keep torso upright with relaxed shoulders.",
             "Consistent posture improves long-term comfort and performance.",
         ],
         "metadata": {
-            "analysis_version": "mediapipe-calibrated-v3",
+            "analysis_version": ANALYSIS_VERSION,
             "pose_confidence": POSE_CONFIDENCE,
             "frame_sample_rate": FRAME_SAMPLE_RATE,
             "total_frames": total_frames,
             "fps": round(float(fps), 3),
-            "duration_sec": round(float(duration_sec), 3),
+            "duration_sec": round(float(scored["duration_sec"]), 3),
             "sampled_frames": sampled_frames,
             "frames_with_pose": frames_with_pose,
             "pose_detected": frames_with_pose > 0,
+            "analysis_mode": mode,
+            "sampler": partial["sampler"],
+            "decode": partial["decode"],
+            "processing_sec": round(elapsed, 3),
+            "time_to_first_frame_sec": round(partial.get("first_frame_sec", 0.0), 3),
+            "processing_fps": round(safe_div(total_frames, elapsed), 2),
         },
     }
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    return analysis_result
+
+
+def analyze_video(
+    video_path: str,
+    instrument: str,
+    pose=None,
+    mode: str = ANALYSIS_MODE,
+    sampling: str = SAMPLING_MODE,
+    series_path: str = None,
+    progress=None,
+) -> dict:
+    """
+    Runs pose extraction and scoring on a single video in one pass
+
+    When `series_path` is given the per-frame landmark series is written
+    there as well (see analysis/timeseries.py). `progress` is passed on
+    to analyze_range.
+    Raises FileNotFoundError / RuntimeError on unreadable input.
+    """
+    partial = analyze_range(
+        video_path,
+        pose=pose,
+        mode=mode,
+        sampling=sampling,
+        keep_landmarks=series_path is not None,
+        progress=progress,
+    )
+    if series_path is not None:
+        save_series(partial, series_path)
+    return build_analysis(partial, video_path, instrument, mode=mode)
+
+
+def write_analysis(analysis_result: dict, output_path: str):
+    """Writes the analysis JSON artifact, creating parent folders as needed"""
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
     with open(output_path, "w") as f:
         json.dump(analysis_result, f, indent=2)
 
+
+def main():
+    # Usage:
+    # python analyze_video.py <video_path> <instrument> <output_json_path> [<series_path>]
+
+    if len(sys.argv) not in (4, 5):
+        print("Invalid arguments", file=sys.stderr)
+        sys.exit(1)
+
+    video_path = sys.argv[1]
+    instrument = sys.argv[2]
+    output_path = sys.argv[3]
+    series_path = sys.argv[4] if len(sys.argv) == 5 else None
+
+    try:
+        analysis_result = analyze_video(video_path, instrument, series_path=series_path)
+    except (FileNotFoundError, RuntimeError) as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+
+    write_analysis(analysis_result, output_path)
+
+    metrics = analysis_result["metrics"]
     print("✅ Analysis complete")
-    print("Score:", overall_score)
-    print("Coverage(sampled):", round(pose_coverage_sampled, 3))
+    print("Score:", analysis_result["overall_score"])
+    print("Coverage(sampled):", metrics["pose_coverage_sampled"])
 
 
 if __name__ == "__main__":
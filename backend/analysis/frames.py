@@ -0,0 +1,240 @@
+import queue
+import threading
+
+import cv2
+import numpy as np
+
+
+# ============================================================
+# Frame sources
+# ============================================================
+#
+# A frame source owns the decode loop for one cv2.VideoCapture and
+# yields RGB frames for the frames selected by its sampler.
+# Both sources keep the same counters, so the analysis loop does not
+# care which one it is iterating.
+#
+# Frames the sampler does not need to look at are only grabbed: FFmpeg
+# still decodes them (later frames reference them), but they are never
+# retrieved, copied or color converted. Long gaps can be skipped by
+# seeking, which lands on the previous keyframe and decodes forward.
+
+def downscale(frame, max_side: int):
+    """Shrinks a frame so its longer side is at most `max_side` (0 = off)"""
+    if not max_side:
+        return frame
+    h, w = frame.shape[:2]
+    scale = max_side / float(max(h, w))
+    if scale >= 1.0:
+        return frame
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+class SerialFrames:
+    """
+    Decodes, converts and yields frames one at a time on the caller's thread
+
+    Yields (frame_index, rgb) with 1-based indices. With `start` / `end`
+    only frames in [start, end) are counted; `warmup` frames before
+    `start` are still yielded so the caller can prime pose tracking.
+    """
+
+    def __init__(
+        self,
+        cap,
+        sampler,
+        max_side: int = 0,
+        seek_gap: int = 0,
+        start: int = 1,
+        end: int = None,
+        warmup: int = 0,
+    ):
+        self.cap = cap
+        self.sampler = sampler
+        self.max_side = max_side
+        self.seek_gap = seek_gap
+        self.start = max(1, int(start))
+        self.end = end
+        self.warmup = max(0, int(warmup))
+        self.frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+        # Index of the last frame read / grabbed / seeked past
+        self.position = 0
+        self.total_frames = 0
+        self.sampled_frames = 0
+
+        # Decode work counters recorded in the analysis metadata
+        self.grabbed = 0
+        self.decoded = 0
+        self.seeks = 0
+
+        self._stop = threading.Event()
+
+    def _skip_to(self, target: int) -> bool:
+        """Seeks so the next read returns frame `target` (1-based)"""
+        if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, target - 1):
+            return False
+        self.seeks += 1
+        # Frames jumped over inside the range still count towards coverage
+        first_counted = max(self.position + 1, self.start)
+        if target > first_counted:
+            self.total_frames += target - first_counted
+        self.position = target - 1
+        return True
+
+    def _read_sampled(self):
+        """Yields (index, BGR frame) selected by the sampler, downscaled if configured"""
+        first = max(1, self.start - self.warmup)
+        if first > 1 and not self._skip_to(first):
+            raise RuntimeError("Failed to seek to chunk start")
+
+        while not self._stop.is_set() and self.cap.isOpened():
+            index = self.position + 1
+            if self.end is not None and index >= self.end:
+                break
+            counted = index >= self.start
+
+            # Frames the sampler will reject without looking are grabbed, not retrieved
+            if not self.sampler.wants(index):
+                target = self.sampler.next_wanted(index)
+                if (
+                    self.seek_gap
+                    and target is not None
+                    and target - index >= self.seek_gap
+                    and target <= self.frame_count
+                    and (self.end is None or target < self.end)
+                    and self._skip_to(target)
+                ):
+                    continue
+                if not self.cap.grab():
+                    break
+                self.position = index
+                self.grabbed += 1
+                if counted:
+                    self.total_frames += 1
+                continue
+
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+
+            self.position = index
+            self.decoded += 1
+            if counted:
+                self.total_frames += 1
+            frame = downscale(frame, self.max_side)
+            # Skip frames the sampler rejects to reduce noise and computational load
+            if not self.sampler.decide(index, frame):
+                continue
+
+            if counted:
+                self.sampled_frames += 1
+            yield index, frame
+
+    def __iter__(self):
+        for index, frame in self._read_sampled():
+            yield index, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    def close(self):
+        """Stops decoding; after this returns the source no longer touches `cap`"""
+        self._stop.set()
+
+    def summary(self) -> dict:
+        return {
+            "decoded": self.decoded,
+            "grabbed": self.grabbed,
+            "seeks": self.seeks,
+            "max_side": self.max_side,
+        }
+
+
+class PipelinedFrames(SerialFrames):
+    """
+    Decodes on a background thread into a bounded ring of RGB buffers
+
+    cv2 releases the GIL while decoding and converting, so the next frames
+    are prepared while the caller runs pose inference on the current one.
+    A yielded buffer is recycled as soon as the caller asks for the next
+    frame, so it must not be kept past that point.
+
+    The decoder thread reads `cap` until close() has joined it, so
+    close() must run before the capture is released, also when the
+    consumer stops with an exception.
+    """
+
+    def __init__(self, cap, sampler, ring_size: int = 4, **kwargs):
+        super().__init__(cap, sampler, **kwargs)
+        self.ring_size = max(2, int(ring_size))
+        self._buffers = None
+        self._free = queue.Queue()
+        self._ready = queue.Queue()
+        self._error = None
+        self._thread = None
+
+    def _decode(self):
+        try:
+            for index, frame in self._read_sampled():
+                if self._buffers is None:
+                    # Preallocate the ring once the frame size is known
+                    self._buffers = [
+                        np.empty(frame.shape, dtype=np.uint8)
+                        for _ in range(self.ring_size)
+                    ]
+                    for i in range(self.ring_size):
+                        self._free.put(i)
+
+                slot = self._free.get()
+                if self._stop.is_set():
+                    break
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._buffers[slot])
+                self._ready.put((slot, index))
+        except Exception as e:
+            self._error = e
+        finally:
+            self._ready.put(None)
+
+    def __iter__(self):
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                item = self._ready.get()
+                if item is None:
+                    break
+                slot, index = item
+                yield index, self._buffers[slot]
+                self._free.put(slot)
+        finally:
+            self.close()
+
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """Stops the decoder thread and waits for it to leave `cap`"""
+        self._stop.set()
+        # Unblocks the decoder if it waits for a free buffer
+        self._free.put(0)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+
+def open_frames(
+    cap,
+    sampler,
+    mode: str = "serial",
+    ring_size: int = 4,
+    **kwargs,
+):
+    """
+    Returns the frame source for the requested analysis mode
+
+    Extra keyword arguments (max_side, seek_gap, start, end, warmup)
+    are passed through to the source.
+    """
+    if mode == "pipelined":
+        return PipelinedFrames(cap, sampler, ring_size=ring_size, **kwargs)
+    if mode == "serial":
+        return SerialFrames(cap, sampler, **kwargs)
+    raise ValueError(f"Unknown analysis mode: {mode}")
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+# ============================================================
+# Landmark layout
+# ============================================================
+
+# MediaPipe Pose emits 33 landmarks, each with x, y, z and visibility
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = ("x", "y", "z", "visibility")
+
+# Indices into the landmark axis (mp.solutions.pose.PoseLandmark values),
+# kept here so aggregation does not need to import mediapipe
+LEFT_EAR = 7
+LEFT_SHOULDER = 11
+RIGHT_SHOULDER = 12
+LEFT_HIP = 23
+RIGHT_HIP = 24
+
+
+class LandmarkBuffer:
+    """
+    Preallocated frames x landmarks x (x, y, z, visibility) array
+
+    The frame loop only copies landmarks in; every metric is computed
+    afterwards from the array in vectorized passes. Capacity doubles if
+    the initial estimate turns out too small.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, int(capacity))
+        self.data = np.empty((capacity, NUM_LANDMARKS, len(LANDMARK_FIELDS)), dtype=np.float32)
+        self.frame_index = np.empty(capacity, dtype=np.int64)
+        self.size = 0
+
+    def append(self, frame_index: int, landmarks):
+        """Copies one frame of MediaPipe landmarks into the next row"""
+        if self.size == len(self.data):
+            self._grow()
+        self.data[self.size] = [(p.x, p.y, p.z, p.visibility) for p in landmarks]
+        self.frame_index[self.size] = frame_index
+        self.size += 1
+
+    def _grow(self):
+        self.data = np.concatenate([self.data, np.empty_like(self.data)])
+        self.frame_index = np.concatenate([self.frame_index, np.empty_like(self.frame_index)])
+
+    @property
+    def landmarks(self) -> np.ndarray:
+        """Filled rows, shape (frames, NUM_LANDMARKS, 4)"""
+        return self.data[:self.size]
+
+    @property
+    def indices(self) -> np.ndarray:
+        """Video frame index (1-based) of each filled row"""
+        return self.frame_index[:self.size]
@@ -0,0 +1,154 @@
+from collections import deque
+
+import numpy as np
+
+from analysis.accumulator import PostureAccumulator
+from analysis.landmarks import LANDMARK_FIELDS, NUM_LANDMARKS
+from analysis.posture_metrics import (
+    SERIES,
+    aggregate_series,
+    compute_series,
+    rounded_metrics,
+    safe_div,
+    score_aggregates,
+)
+
+# ============================================================
+# Live (streaming) scoring
+# ============================================================
+#
+# The browser already runs MediaPipe for the live overlay (LivePose.jsx),
+# so live sessions receive landmark frames instead of video. Each frame is
+# turned into the same per-frame series as the batch path, and the window
+# aggregates go through score_aggregates(), so a live score and an offline
+# score of the same frames agree.
+
+# Rolling window the live score is computed over
+LIVE_WINDOW_SEC = 10.0
+
+
+def parse_landmarks(raw) -> np.ndarray:
+    """
+    One frame of landmarks as a (33, 4) array
+
+    Accepts MediaPipe JS objects ({x, y, z, visibility}) or plain
+    [x, y, z, visibility] lists; missing z / visibility default to 0 / 1.
+    Raises ValueError on anything else.
+    """
+    if not isinstance(raw, (list, tuple)) or len(raw) != NUM_LANDMARKS:
+        raise ValueError(f"landmarks must be a list of {NUM_LANDMARKS} points")
+
+    out = np.zeros((NUM_LANDMARKS, len(LANDMARK_FIELDS)), dtype=np.float32)
+    out[:, 3] = 1.0
+    for i, p in enumerate(raw):
+        if isinstance(p, dict):
+            p = [p.get(k) for k in LANDMARK_FIELDS]
+        if not isinstance(p, (list, tuple)) or len(p) < 2:
+            raise ValueError("each landmark needs at least x and y")
+        for j, v in enumerate(p[:len(LANDMARK_FIELDS)]):
+            if v is None:
+                continue
+            try:
+                out[i, j] = float(v)
+            except (TypeError, ValueError):
+                raise ValueError(f"landmark {i}: {LANDMARK_FIELDS[j]} must be a number") from None
+    return out
+
+
+class LiveWindow:
+    """
+    Rolling posture statistics over the last `window_sec` seconds
+
+    Keeps one row of series values per received frame (None when no pose
+    was detected), plus a PostureAccumulator for the whole session so
+    the final summary doesn't need every frame.
+    """
+
+    def __init__(self, window_sec: float = LIVE_WINDOW_SEC):
+        self.window_sec = float(window_sec)
+        self._frames = deque()  # (t, row or None)
+        self.frames_received = 0
+        self.first_t = None
+        self.last_t = None
+        self.totals = PostureAccumulator()
+
+    def push(self, frames: list):
+        """
+        Adds a batch of (t, landmarks or None) frames
+
+        Frames older than the newest frame already seen are dropped, so
+        retried or reordered batches can't move the window backwards.
+        """
+        accepted = []
+        for t, lms in frames:
+            t = float(t)
+            if self.last_t is not None and t <= self.last_t:
+                continue
+            accepted.append((t, lms))
+            self.last_t = t
+        if not accepted:
+            return 0
+
+        detected = [lms for _, lms in accepted if lms is not None]
+        rows = iter(())
+        if detected:
+            series = compute_series(np.stack(detected))
+            values = np.column_stack([series[name] for name, _, _ in SERIES])
+            rows = iter(values)
+            self.totals.add_moments(aggregate_series(series, len(values)))
+
+        for t, lms in accepted:
+            self._frames.append((t, None if lms is None else next(rows)))
+
+        if self.first_t is None:
+            self.first_t = accepted[0][0]
+        self.frames_received += len(accepted)
+
+        horizon = self.last_t - self.window_sec
+        while self._frames and self._frames[0][0] < horizon:
+            self._frames.popleft()
+        return len(accepted)
+
+    def _window_aggregates(self) -> dict:
+        n = len(self._frames)
+        span = self._frames[-1][0] - self._frames[0][0] if n else 0.0
+        values = np.asarray(
+            [row for _, row in self._frames if row is not None]
+        ).reshape(-1, len(SERIES))
+        series = {name: values[:, k] for k, (name, _, _) in enumerate(SERIES)}
+        return {
+            "fps": safe_div(n - 1, span),
+            "total_frames": n,
+            "sampled_frames": n,
+            **aggregate_series(series, len(values)),
+        }
+
+    def snapshot(self) -> dict:
+        """Score, weak label and metrics for the current window"""
+        scored = score_aggregates(self._window_aggregates())
+        return {
+            "overall_score": scored["overall_score"],
+            "weak_label": scored["weak_label"],
+            "metrics": rounded_metrics(scored),
+            "window": {
+                "seconds": self.window_sec,
+                "frames": len(self._frames),
+                "duration_sec": round(scored["duration_sec"], 3),
+            },
+        }
+
+    def summary(self) -> dict:
+        """Score and metrics over the whole session so far"""
+        span = (self.last_t - self.first_t) if self.frames_received else 0.0
+        self.totals.fps = safe_div(self.frames_received - 1, span)
+        self.totals.total_frames = self.frames_received
+        self.totals.sampled_frames = self.frames_received
+        scored = self.totals.score()
+        return {
+            "overall_score": scored["overall_score"],
+            "weak_label": scored["weak_label"],
+            "metrics": rounded_metrics(scored),
+            "feature_vector": scored["feature_vector"],
+            "frames_received": self.frames_received,
+            "duration_sec": round(span, 3),
+        }
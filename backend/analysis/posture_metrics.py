@@ -0,0 +1,238 @@
+import numpy as np
+
+from analysis.landmarks import (
+    LEFT_EAR,
+    LEFT_HIP,
+    LEFT_SHOULDER,
+    RIGHT_HIP,
+    RIGHT_SHOULDER,
+)
+
+# Calibrated biomechanical ideals (empirically derived for piano)
+# Acts as reference points, not hard rules
+IDEAL_HEAD_ANGLE = 163.0
+IDEAL_TORSO_ANGLE = 179.0
+
+
+# ============================================================
+# Vectorized geometry
+# ============================================================
+
+def compute_angles_vertical(p1: np.ndarray, p2: np.ndarray) -> np.ndarray:
+    """
+    Vectorized compute_angle_vertical over arrays of (x, y) points
+
+    p1, p2 have shape (n, 2); returns n angles in degrees
+    """
+    d = np.asarray(p1, dtype=np.float64) - np.asarray(p2, dtype=np.float64)
+    angles = np.abs(np.degrees(np.arctan2(d[:, 0], d[:, 1])))
+    return np.where(angles > 180.0, 360.0 - angles, angles)
+
+
+# ============================================================
+# Per-frame series
+# ============================================================
+
+def head_angle(lms: np.ndarray) -> np.ndarray:
+    """Angle between ear -> shoulder relative to vertical"""
+    return compute_angles_vertical(lms[:, LEFT_EAR, :2], lms[:, LEFT_SHOULDER, :2])
+
+
+def torso_angle(lms: np.ndarray) -> np.ndarray:
+    """Angle between midpoint of shoulders and hips relative to vertical"""
+    shoulder_mid = (lms[:, LEFT_SHOULDER, :2] + lms[:, RIGHT_SHOULDER, :2]) / 2.0
+    hip_mid = (lms[:, LEFT_HIP, :2] + lms[:, RIGHT_HIP, :2]) / 2.0
+    return compute_angles_vertical(shoulder_mid, hip_mid)
+
+
+def head_dev(lms: np.ndarray, series: dict) -> np.ndarray:
+    """Per-frame deviation of the head angle from its calibrated ideal"""
+    return np.abs(series["head"] - IDEAL_HEAD_ANGLE)
+
+
+# Registry of per-frame series, computed in order from the landmark array.
+# Each entry is (name, fn, needs_series); functions flagged with
+# needs_series also receive the series computed before them. Every series
+# gets <name>_mean / <name>_var aggregates, so adding a metric here is
+# enough for it to be aggregated and merged across chunks.
+SERIES = [
+    ("head", head_angle, False),
+    ("torso", torso_angle, False),
+    ("head_dev", head_dev, True),
+]
+
+
+def compute_series(lms: np.ndarray) -> dict:
+    """Computes every registered per-frame series for a landmark array"""
+    series = {}
+    for name, fn, needs_series in SERIES:
+        series[name] = fn(lms, series) if needs_series else fn(lms)
+    return series
+
+
+def aggregate_series(series: dict, n: int) -> dict:
+    """Count, mean and population variance of already computed series"""
+    out = {"frames_with_pose": int(n)}
+    for name, values in series.items():
+        out[f"{name}_mean"] = float(np.mean(values)) if n else 0.0
+        out[f"{name}_var"] = float(np.var(values)) if n else 0.0
+    return out
+
+
+def aggregate_landmarks(lms: np.ndarray) -> dict:
+    """
+    Count, mean and variance of every series in one vectorized pass
+
+    The result can be merged into a PostureAccumulator (add_moments)
+    """
+    return aggregate_series(compute_series(lms), len(lms))
+
+
+# ============================================================
+# Scoring
+# ============================================================
+#
+# Shared by the batch analysis and the live window so offline and live
+# scores are computed with exactly the same maths.
+
+def angle_deviation(angle: float, ideal: float) -> float:
+    """Measures how far a posture angle deviates from a calibrated 'ideal' reference"""
+    return abs(float(angle) - float(ideal))
+
+
+def clamp01(x: float) -> float:
+    """
+    Clamps values into [0, 1] so penalties
+    remain bounded and composable.
+    """
+    return max(0.0, min(1.0, float(x)))
+
+
+def safe_div(a: float, b: float, default: float = 0.0) -> float:
+    """
+    Safe division helper used for coverage and duration
+    to avoid runtime errors on edge cases
+    """
+    return float(a) / float(b) if b != 0 else float(default)
+
+
+def score_aggregates(agg: dict) -> dict:
+    """
+    Metrics, score, weak label and ML feature vector from aggregates
+
+    `agg` holds fps, total_frames, sampled_frames, frames_with_pose and
+    the <series>_mean / <series>_var values of every series (see
+    PostureAccumulator.moments).
+    """
+    fps = agg["fps"]
+    total_frames = agg["total_frames"]
+    sampled_frames = agg["sampled_frames"]
+    frames_with_pose = agg["frames_with_pose"]
+
+    # Coverage tells us how much of the video contained a usable pose
+    pose_coverage = safe_div(frames_with_pose, total_frames)
+    pose_coverage_sampled = safe_div(frames_with_pose, sampled_frames)
+    #Session duration inferred from frame count
+    duration_sec = safe_div(total_frames, fps) if fps > 0 else 0.0
+
+    #Mean posture angles across the session
+    head_mean = agg["head_mean"]
+    head_var = agg["head_var"]
+    torso_mean = agg["torso_mean"]
+
+    # Deviations from calibrated ideals
+    head_dev = angle_deviation(head_mean, IDEAL_HEAD_ANGLE)
+    torso_dev = angle_deviation(torso_mean, IDEAL_TORSO_ANGLE)
+
+    # Stability captures how consistent posture is over time
+    # (low varience = stable posture)
+    stability_std = float(np.sqrt(agg["head_dev_var"]))
+
+    # ------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------
+    
+    #Normalize penalties so they can be weighted together
+    head_penalty = clamp01(head_dev / 25.0)
+    torso_penalty = clamp01(torso_dev / 20.0)
+    stability_penalty = clamp01(stability_std / 10.0)
+    #Weighted quality score (domain-informed weights)
+    quality = 1.0 - (
+        0.40 * head_penalty +
+        0.35 * torso_penalty +
+        0.25 * stability_penalty
+    )
+    quality = clamp01(quality)
+    #Reduce score if pose detection was poor
+    coverage_mult = clamp01((pose_coverage_sampled - 0.30) / 0.50)
+    #Final score in [0, 100]
+    overall_score = int(round(
+        100.0 * quality * (0.60 + 0.40 * coverage_mult)
+    ))
+    overall_score = max(0, min(100, overall_score))
+
+    # ------------------------------------------------------------
+    # Weak label
+    # ------------------------------------------------------------
+
+    #Heuristic bucket used for quick user feedback and baseline interpretation
+    if pose_coverage_sampled < 0.25:
+        weak_label = "Unknown"
+    elif overall_score >= 85:
+        weak_label = "Excellent"
+    elif overall_score >= 70:
+        weak_label = "Good"
+    elif overall_score >= 55:
+        weak_label = "Okay"
+    else:
+        weak_label = "Risky"
+
+    # ------------------------------------------------------------
+    # Feature vector (for ML)
+    # ------------------------------------------------------------
+
+    #Raw, un-normalized metrics used as ML inputs. 
+    # ML interprets these signals, does not replace them
+    feature_vector = {
+        "head_angle_mean_deg": head_mean,
+        "head_angle_var": head_var,
+        "torso_angle_mean_deg": torso_mean,
+        "head_dev_deg": head_dev,
+        "torso_dev_deg": torso_dev,
+        "stability_std_dev_deg": stability_std,
+        "pose_coverage": pose_coverage,
+        "pose_coverage_sampled": pose_coverage_sampled,
+        "session_duration_sec": duration_sec,
+        "sampled_frames": float(sampled_frames),
+        "frames_with_pose": float(frames_with_pose),
+    }
+
+    return {
+        "head_mean": head_mean,
+        "head_var": head_var,
+        "torso_mean": torso_mean,
+        "head_dev": head_dev,
+        "torso_dev": torso_dev,
+        "stability_std": stability_std,
+        "pose_coverage": pose_coverage,
+        "pose_coverage_sampled": pose_coverage_sampled,
+        "duration_sec": duration_sec,
+        "quality": quality,
+        "coverage_mult": coverage_mult,
+        "overall_score": overall_score,
+        "weak_label": weak_label,
+        "feature_vector": feature_vector,
+    }
+
+
+def rounded_metrics(scored: dict) -> dict:
+    """The `metrics` block of an analysis, as returned to the frontend"""
+    return {
+        "head_angle_mean_deg": round(scored["head_mean"], 2),
+        "torso_angle_mean_deg": round(scored["torso_mean"], 2),
+        "head_dev_deg": round(scored["head_dev"], 2),
+        "torso_dev_deg": round(scored["torso_dev"], 2),
+        "stability_std_dev_deg": round(scored["stability_std"], 3),
+        "pose_coverage": round(scored["pose_coverage"], 3),
+        "pose_coverage_sampled": round(scored["pose_coverage_sampled"], 3),
+    }
@@ -0,0 +1,71 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Allow running as a script (python analysis/recompute.py ...)
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analysis.accumulator import PostureAccumulator
+from analysis.timeseries import load_series
+
+
+def recompute_analysis(series_path: str, instrument: str = "unknown") -> dict:
+    """
+    Re-derives metrics and scores from a landmark series artifact
+
+    No video decoding or pose inference happens, so this runs in
+    milliseconds and picks up any change to scoring or SERIES metrics.
+    """
+    from analysis.analyze_video import build_analysis
+
+    series = load_series(series_path)
+    meta = series["meta"]
+    lms = np.asarray(series["landmarks"], dtype=np.float32)
+
+    posture = PostureAccumulator(meta["fps"])
+    posture.add_batch(lms)
+    posture.total_frames = meta["total_frames"]
+    posture.sampled_frames = meta["sampled_frames"]
+
+    partial = {
+        "posture": posture.snapshot(),
+        "sampler": meta.get("sampler", {}),
+        "decode": meta.get("decode", {}),
+        "processing_sec": 0.0,
+    }
+    analysis = build_analysis(partial, series_path, instrument)
+    analysis["metadata"]["recomputed_from"] = os.path.basename(series_path)
+    analysis["metadata"]["source_analysis_version"] = meta.get("analysis_version")
+    return analysis
+
+
+def main():
+    # Usage:
+    # python recompute.py <series_path> [<instrument>] [<output_json_path>]
+
+    if len(sys.argv) not in (2, 3, 4):
+        print("Invalid arguments", file=sys.stderr)
+        sys.exit(1)
+
+    series_path = sys.argv[1]
+    instrument = sys.argv[2] if len(sys.argv) > 2 else "unknown"
+
+    started = time.perf_counter()
+    analysis = recompute_analysis(series_path, instrument)
+    elapsed_ms = (time.perf_counter() - started) * 1000.0
+
+    if len(sys.argv) == 4:
+        with open(sys.argv[3], "w") as f:
+            json.dump(analysis, f, indent=2)
+    else:
+        print(json.dumps(analysis, indent=2))
+
+    print(f"Recomputed in {elapsed_ms:.1f} ms", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
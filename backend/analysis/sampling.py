@@ -0,0 +1,165 @@
+import cv2
+import numpy as np
+
+
+# ============================================================
+# Frame samplers
+# ============================================================
+#
+# A sampler decides, frame by frame, whether pose inference should run.
+# Frame sources first ask `wants(frame_index)` (1-based) whether the
+# sampler needs to see the pixels at all; frames it does not want are
+# skipped without decoding. Wanted frames are decoded and passed to
+# `decide(frame_index, frame)`, and only converted / inferred when it
+# returns True.
+
+class FixedSampler:
+    """Analyzes every `rate`-th frame (the original behaviour)"""
+
+    def __init__(self, rate: int):
+        self.rate = max(1, int(rate))
+        self.sampled = 0
+
+    def wants(self, frame_index: int) -> bool:
+        return frame_index % self.rate == 0
+
+    def next_wanted(self, frame_index: int):
+        return frame_index + (-frame_index) % self.rate
+
+    def decide(self, frame_index: int, frame) -> bool:
+        if not self.wants(frame_index):
+            return False
+        self.sampled += 1
+        return True
+
+    def summary(self) -> dict:
+        return {
+            "mode": "fixed",
+            "frame_sample_rate": self.rate,
+        }
+
+
+class AdaptiveSampler:
+    """
+    Motion-driven sampler with an inference budget
+
+    - Measures mean absolute difference between a tiny grayscale copy of
+      the frame and the last analyzed frame (cheap, no pose inference)
+    - While the scene is static, only a heartbeat frame every
+      `max_interval` frames is analyzed
+    - When motion exceeds `motion_threshold`, frames are analyzed as often
+      as every `min_interval` frames
+    - A token bucket caps inferences at `budget_per_min` per minute of
+      video (bursting up to 10 seconds' worth)
+    """
+
+    def __init__(
+        self,
+        fps: float,
+        min_interval: int = 2,
+        max_interval_sec: float = 1.0,
+        motion_threshold: float = 4.0,
+        budget_per_min: int = 600,
+        thumb_size=(64, 36),
+    ):
+        self.fps = fps if fps > 0 else 30.0
+        self.min_interval = max(1, int(min_interval))
+        self.max_interval = max(self.min_interval, int(round(self.fps * max_interval_sec)))
+        self.motion_threshold = float(motion_threshold)
+        self.budget_per_min = int(budget_per_min)
+        self.thumb_size = thumb_size
+
+        # Token bucket refilled in video time, not wall time
+        self._refill_per_frame = self.budget_per_min / 60.0 / self.fps
+        self._capacity = max(1.0, self.budget_per_min / 6.0)
+        self._tokens = self._capacity
+        self._refilled_at = 0
+
+        self._ref = None
+        self._last_sampled = 0
+        self.sampled = 0
+
+        # Decision counters recorded in the analysis metadata
+        self.decisions = {
+            "motion": 0,
+            "heartbeat": 0,
+            "static_skipped": 0,
+            "budget_skipped": 0,
+        }
+        # Inferences per minute of video, for spotting budget pressure
+        self.per_minute = []
+
+    def _thumb(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(gray, self.thumb_size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+    def wants(self, frame_index: int) -> bool:
+        # Nothing can be sampled within min_interval of the last inference
+        return self._ref is None or frame_index - self._last_sampled >= self.min_interval
+
+    def next_wanted(self, frame_index: int):
+        # Motion can't be predicted, so never seek past unseen frames
+        return None
+
+    def decide(self, frame_index: int, frame) -> bool:
+        # Refill for every frame since the last decision, including grabbed ones
+        elapsed = frame_index - self._refilled_at
+        self._refilled_at = frame_index
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._refill_per_frame)
+
+        if not self.wants(frame_index):
+            return False
+        since_last = frame_index - self._last_sampled
+
+        thumb = self._thumb(frame)
+        if self._ref is None:
+            reason = "heartbeat"
+        else:
+            motion = float(np.mean(np.abs(thumb - self._ref)))
+            if motion >= self.motion_threshold:
+                reason = "motion"
+            elif since_last >= self.max_interval:
+                reason = "heartbeat"
+            else:
+                self.decisions["static_skipped"] += 1
+                return False
+
+        if self._tokens < 1.0:
+            self.decisions["budget_skipped"] += 1
+            return False
+
+        self._tokens -= 1.0
+        self._ref = thumb
+        self._last_sampled = frame_index
+        self.sampled += 1
+        self.decisions[reason] += 1
+
+        minute = int((frame_index - 1) / self.fps // 60)
+        while len(self.per_minute) <= minute:
+            self.per_minute.append(0)
+        self.per_minute[minute] += 1
+        return True
+
+    def summary(self) -> dict:
+        return {
+            "mode": "adaptive",
+            "min_interval": self.min_interval,
+            "max_interval": self.max_interval,
+            "motion_threshold": self.motion_threshold,
+            "budget_per_min": self.budget_per_min,
+            "decisions": dict(self.decisions),
+            "inferences_per_minute": list(self.per_minute),
+        }
+
+
+def make_sampler(mode: str, fps: float, frame_sample_rate: int, budget_per_min: int):
+    """Builds the sampler for the configured sampling mode"""
+    if mode == "adaptive":
+        return AdaptiveSampler(
+            fps,
+            min_interval=frame_sample_rate,
+            budget_per_min=budget_per_min,
+        )
+    if mode == "fixed":
+        return FixedSampler(frame_sample_rate)
+    raise ValueError(f"Unknown sampling mode: {mode}")
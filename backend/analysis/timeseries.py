@@ -0,0 +1,115 @@
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+
+from analysis.landmarks import LANDMARK_FIELDS, NUM_LANDMARKS
+
+# ============================================================
+# Landmark time-series artifact
+# ============================================================
+#
+# Stored as an uncompressed .npz next to the analysis JSON:
+#
+#   frame_index  int32   (frames,)           1-based video frame index
+#   t            float32 (frames,)           (frame_index - 1) / fps, seconds
+#   landmarks    float16 (frames, 33, 4)     x, y, z, visibility
+#   meta         JSON string                 fps, frame counts, sampler...
+#
+# Landmarks are normalized to [0, 1], so float16 (~5e-4 resolution) is
+# plenty for posture angles and halves the artifact. Scores recomputed
+# from it are close to, not identical with, the original run: angle
+# means, deviations and stability move by under 0.05 degree, angle
+# variance by under 1% and quality by under 1e-3, so overall_score
+# (0-100) matches or, at a rounding boundary, is off by one
+# (tests/test_timeseries.py).
+#
+# Members are stored, not deflated, so load_series() memory-maps them
+# straight out of the archive without unpacking anything.
+
+# 2: t starts at 0 for the first frame (version 1 was shifted by one frame)
+SERIES_VERSION = 2
+
+
+def write_series(
+    path: str,
+    frame_index: np.ndarray,
+    landmarks: np.ndarray,
+    fps: float,
+    meta: dict = None,
+    dtype=np.float16,
+):
+    """Writes the per-frame landmark series for one video"""
+    frame_index = np.asarray(frame_index, dtype=np.int32)
+    t = _timestamps(frame_index, fps)
+    header = {
+        "version": SERIES_VERSION,
+        "fps": float(fps),
+        "num_landmarks": NUM_LANDMARKS,
+        "fields": list(LANDMARK_FIELDS),
+        **(meta or {}),
+    }
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            frame_index=frame_index,
+            t=t,
+            landmarks=np.asarray(landmarks).astype(dtype, copy=False),
+            meta=np.array(json.dumps(header)),
+        )
+
+
+def _timestamps(frame_index: np.ndarray, fps: float) -> np.ndarray:
+    """Seconds from the start of the video for 1-based frame indices"""
+    if fps <= 0:
+        return np.zeros(len(frame_index), np.float32)
+    return (frame_index.astype(np.float32) - 1) / np.float32(fps)
+
+
+def _mmap_member(path: str, info: zipfile.ZipInfo) -> np.ndarray:
+    """Read-only memory map of one stored .npy member of an .npz"""
+    with open(path, "rb") as f:
+        # Local file header: 30 fixed bytes, then name and extra field
+        f.seek(info.header_offset)
+        local = f.read(30)
+        name_len, extra_len = struct.unpack("<HH", local[26:30])
+        f.seek(info.header_offset + 30 + name_len + extra_len)
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+        offset = f.tell()
+    if not shape or 0 in shape:
+        return np.zeros(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape, order="F" if fortran else "C", offset=offset)
+
+
+def load_series(path: str, mmap: bool = True) -> dict:
+    """
+    Loads a landmark series artifact
+
+    With mmap=True the arrays of an uncompressed artifact are memory
+    mapped in place; compressed (older) artifacts are read into memory.
+    Version 1 timestamps are shifted back to start at 0.
+    """
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        with zipfile.ZipFile(path) as archive:
+            members = {info.filename: info for info in archive.infolist()}
+        out = {}
+        for name in ("frame_index", "t", "landmarks"):
+            info = members[f"{name}.npy"]
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                out[name] = _mmap_member(path, info)
+            else:
+                out[name] = data[name]
+    out["meta"] = meta
+
+    if meta.get("version", 1) < 2:
+        out["t"] = _timestamps(np.asarray(out["frame_index"]), meta.get("fps", 0.0))
+    return out
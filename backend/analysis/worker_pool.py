@@ -0,0 +1,367 @@
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# Number of warm analysis processes. Pose inference is CPU bound, so by
+# default we leave one core free for the web server and S3 transfers
+ANALYSIS_WORKERS = int(
+    os.getenv("ANALYSIS_WORKERS", max(1, (os.cpu_count() or 2) - 1))
+)
+
+# Videos at least this long are split into time ranges analyzed in parallel
+CHUNK_MIN_SEC = float(os.getenv("CHUNK_MIN_SEC", "300"))
+
+# Frames before each chunk run through Pose only to prime its tracking
+CHUNK_WARMUP_SEC = 1.0
+
+# When a worker dies (segfault, OOM kill, failed Pose init) the executor
+# is replaced and the jobs it took down are resubmitted this many times
+ANALYSIS_CRASH_RETRIES = int(os.getenv("ANALYSIS_CRASH_RETRIES", "1"))
+
+# Recycle each worker after this many jobs to bound memory leaked by
+# MediaPipe graphs (0 = never). Needs Python 3.11+ and makes workers
+# start with "spawn" instead of "fork"
+ANALYSIS_MAX_TASKS_PER_CHILD = int(os.getenv("ANALYSIS_MAX_TASKS_PER_CHILD", "0"))
+
+
+# ============================================================
+# Worker process side
+# ============================================================
+
+# Each worker process holds its own Pose graph for its whole lifetime
+_pose = None
+
+# Queue shared with the parent for progress reports
+_progress_queue = None
+
+
+def _init_worker(progress_queue=None):
+    """
+    Runs once per worker process
+
+    Imports cv2 / mediapipe and builds the Pose graph up front so
+    jobs never pay interpreter or graph startup cost
+    """
+    global _pose, _progress_queue
+    from analysis.analyze_video import create_pose
+    _pose = create_pose()
+    _progress_queue = progress_queue
+
+
+def _reporter(token: str, part: int):
+    """Progress callback for analyze_range, or None when nobody listens"""
+    if token is None or _progress_queue is None:
+        return None
+    # multiprocessing.Queue.put hands off to a feeder thread, so the
+    # frame loop never waits on the parent
+    return lambda report: _progress_queue.put((token, part, report))
+
+
+def _run_job(
+    video_path: str,
+    instrument: str,
+    series_path: str = None,
+    token: str = None,
+) -> dict:
+    from analysis.analyze_video import analyze_video
+    return analyze_video(
+        video_path,
+        instrument,
+        pose=_pose,
+        series_path=series_path,
+        progress=_reporter(token, 0),
+    )
+
+
+def _run_range(
+    video_path: str,
+    start: int,
+    end: int,
+    warmup: int,
+    keep_landmarks: bool = False,
+    token: str = None,
+    part: int = 0,
+) -> dict:
+    from analysis.analyze_video import analyze_range
+    return analyze_range(
+        video_path,
+        pose=_pose,
+        start_frame=start,
+        end_frame=end,
+        warmup_frames=warmup,
+        keep_landmarks=keep_landmarks,
+        progress=_reporter(token, part),
+    )
+
+
+def probe_video(video_path: str):
+    """Returns (frame_count, fps) without decoding any frames"""
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return 0, 0.0
+        return int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0), cap.get(cv2.CAP_PROP_FPS) or 0.0
+    finally:
+        cap.release()
+
+
+def plan_chunks(frame_count: int, chunks: int):
+    """Splits frames 1..frame_count into `chunks` contiguous [start, end) ranges"""
+    bounds = [1 + (frame_count * i) // chunks for i in range(chunks + 1)]
+    # The last range is open-ended in case the container under-reports frames
+    ranges = [(bounds[i], bounds[i + 1]) for i in range(chunks)]
+    ranges[-1] = (ranges[-1][0], None)
+    return ranges
+
+
+# ============================================================
+# Progress
+# ============================================================
+
+class JobProgress:
+    """
+    Combines progress reports from every range of one job
+
+    Chunks report independently; their counters add up and their posture
+    snapshots merge exactly, so the provisional score covers everything
+    analyzed so far. `callback` receives a progress dict and is called on
+    the pool's listener thread, so it must not block.
+    """
+
+    def __init__(self, callback):
+        self.callback = callback
+        self.parts = {}
+        self.started = time.perf_counter()
+
+    def update(self, part: int, report: dict):
+        from analysis.accumulator import PostureAccumulator
+        from analysis.posture_metrics import rounded_metrics
+
+        self.parts[part] = report
+        reports = list(self.parts.values())
+        posture = PostureAccumulator.from_snapshot(reports[0]["posture"])
+        for r in reports[1:]:
+            posture.merge(PostureAccumulator.from_snapshot(r["posture"]))
+
+        decoded = sum(r["frames_decoded"] for r in reports)
+        # Expected frames are only known once every chunk has reported
+        known = all(r["frame_count"] for r in reports)
+        frame_count = sum(r["frame_count"] for r in reports) if known else 0
+        elapsed = time.perf_counter() - self.started
+        fps = decoded / elapsed if elapsed > 0 else 0.0
+        eta = (frame_count - decoded) / fps if frame_count and fps > 0 else None
+
+        scored = posture.score()
+        self.callback({
+            "frames_decoded": decoded,
+            "frames_analyzed": sum(r["frames_analyzed"] for r in reports),
+            "frames_with_pose": posture.frames_with_pose,
+            "frame_count": frame_count,
+            "fps": round(fps, 2),
+            "eta_sec": None if eta is None else round(max(0.0, eta), 1),
+            "provisional": {
+                "overall_score": scored["overall_score"],
+                "weak_label": scored["weak_label"],
+                "metrics": rounded_metrics(scored),
+            },
+        })
+
+
+# ============================================================
+# Pool
+# ============================================================
+
+class AnalysisPool:
+    """
+    Long-lived pool of warm pose-analysis processes
+
+    Jobs are queued to the executor and the analysis dict is returned
+    directly, so there is no JSON round-trip through a temp file.
+    A crashed worker breaks the whole executor, so it is replaced with a
+    fresh one and only the jobs that were running are retried or failed.
+    """
+
+    def __init__(self, workers: int = ANALYSIS_WORKERS):
+        self.workers = max(1, int(workers))
+        # Recycled workers can't be forked, and the queue must come from the same context
+        self._mp = multiprocessing.get_context("spawn" if ANALYSIS_MAX_TASKS_PER_CHILD > 0 else None)
+        self._progress = self._mp.Queue()
+        self._listeners = {}
+        self._listeners_lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+        self._executor = self._new_executor()
+        self.restarts = 0
+        threading.Thread(target=self._dispatch_progress, daemon=True).start()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        kwargs = {}
+        if ANALYSIS_MAX_TASKS_PER_CHILD > 0:
+            kwargs["max_tasks_per_child"] = ANALYSIS_MAX_TASKS_PER_CHILD
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self._progress,),
+            mp_context=self._mp,
+            **kwargs,
+        )
+
+    def _replace_executor(self, broken: ProcessPoolExecutor):
+        """Swaps out a broken executor (once, however many jobs noticed)"""
+        with self._executor_lock:
+            if self._executor is not broken:
+                return
+            print("[pool] Analysis worker died; starting a new pool")
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            self.restarts += 1
+
+    def _run_all(self, calls: list) -> list:
+        """
+        Runs [(fn, *args), ...] on the workers and returns their results
+
+        On BrokenProcessPool the executor is replaced and the calls are
+        resubmitted, up to ANALYSIS_CRASH_RETRIES times, then re-raised.
+        """
+        for attempt in range(ANALYSIS_CRASH_RETRIES + 1):
+            executor = self._executor
+            try:
+                futures = [executor.submit(*call) for call in calls]
+                return [f.result() for f in futures]
+            except BrokenProcessPool:
+                self._replace_executor(executor)
+                if attempt == ANALYSIS_CRASH_RETRIES:
+                    raise
+
+    # ---------- Progress ----------
+    def _dispatch_progress(self):
+        while True:
+            item = self._progress.get()
+            if item is None:
+                return
+            token, part, report = item
+            with self._listeners_lock:
+                listener = self._listeners.get(token)
+            if listener is None:
+                continue
+            try:
+                listener.update(part, report)
+            except Exception as e:
+                print("[progress] listener failed:", e)
+
+    def _listen(self, on_progress):
+        if on_progress is None:
+            return None
+        token = str(uuid.uuid4())
+        with self._listeners_lock:
+            self._listeners[token] = JobProgress(on_progress)
+        return token
+
+    def _unlisten(self, token):
+        if token is not None:
+            with self._listeners_lock:
+                self._listeners.pop(token, None)
+
+    # ---------- Jobs ----------
+    def submit(self, video_path: str, instrument: str, series_path: str = None, token: str = None):
+        """Queues a video and returns a Future resolving to the analysis dict"""
+        return self._executor.submit(_run_job, video_path, instrument, series_path, token)
+
+    def analyze(
+        self,
+        video_path: str,
+        instrument: str,
+        series_path: str = None,
+        streaming: bool = False,
+        on_progress=None,
+    ) -> dict:
+        """
+        Blocking helper used by background jobs
+
+        Long recordings are split across workers (see analyze_chunked).
+        With `series_path` the landmark time series is written there too.
+        `streaming` sources (FIFOs) can't be probed or seeked, so they are
+        always analyzed in a single pass. `on_progress` receives combined
+        JobProgress dicts while the job runs.
+        """
+        if self.workers > 1 and not streaming:
+            frame_count, fps = probe_video(video_path)
+            if fps > 0 and frame_count / fps >= CHUNK_MIN_SEC:
+                return self.analyze_chunked(
+                    video_path, instrument, frame_count, fps,
+                    series_path=series_path, on_progress=on_progress,
+                )
+        token = self._listen(on_progress)
+        try:
+            return self._run_all([(_run_job, video_path, instrument, series_path, token)])[0]
+        finally:
+            self._unlisten(token)
+
+    def analyze_chunked(
+        self,
+        video_path: str,
+        instrument: str,
+        frame_count: int = None,
+        fps: float = None,
+        chunks: int = None,
+        series_path: str = None,
+        on_progress=None,
+    ) -> dict:
+        """
+        Analyzes time ranges of one video in parallel and merges them
+
+        Each range runs on its own warm worker with a short warm-up overlap,
+        and returns count / sum / sum-of-squares aggregates that merge
+        exactly, so the scores match a single-process run.
+        """
+        from analysis.analyze_video import build_analysis, merge_partials, save_series
+
+        if frame_count is None or fps is None:
+            frame_count, fps = probe_video(video_path)
+        chunks = max(1, min(chunks or self.workers, frame_count or 1))
+        warmup = int(round(CHUNK_WARMUP_SEC * fps))
+
+        started = time.perf_counter()
+        token = self._listen(on_progress)
+        try:
+            partial = merge_partials(self._run_all([
+                (_run_range, video_path, start, end, warmup, series_path is not None, token, part)
+                for part, (start, end) in enumerate(plan_chunks(frame_count, chunks))
+            ]))
+        finally:
+            self._unlisten(token)
+        if series_path is not None:
+            save_series(partial, series_path)
+        # Report wall time of the whole job, not the slowest chunk
+        partial["processing_sec"] = time.perf_counter() - started
+
+        analysis = build_analysis(partial, video_path, instrument)
+        analysis["metadata"]["chunks"] = chunks
+        analysis["metadata"]["chunk_warmup_frames"] = warmup
+        return analysis
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+        self._progress.put(None)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> AnalysisPool:
+    """Returns the process-wide pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AnalysisPool()
+        return _pool
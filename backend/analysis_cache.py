@@ -0,0 +1,226 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# "local" (directory), "s3" (bucket prefix) or "off"
+ANALYSIS_CACHE = os.getenv("ANALYSIS_CACHE", "local")
+ANALYSIS_CACHE_DIR = os.getenv(
+    "ANALYSIS_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "posture_analysis_cache"),
+)
+ANALYSIS_CACHE_PREFIX = os.getenv("ANALYSIS_CACHE_PREFIX", "cache/analysis/")
+
+# Total size of cached analyses before least recently used entries are evicted
+ANALYSIS_CACHE_MAX_BYTES = int(os.getenv("ANALYSIS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+HASH_CHUNK_BYTES = 1024 * 1024
+
+
+# ============================================================
+# Keys
+# ============================================================
+
+def file_md5(path: str) -> str:
+    """
+    Streaming MD5 of a file's bytes
+
+    MD5 is what S3 reports as the ETag of a single-part upload, so a local
+    hash and the ETag of the same presigned PUT produce the same key.
+    """
+    h = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def analysis_params() -> dict:
+    """Pipeline settings that change analysis output, folded into every key"""
+    from analysis import analyze_video as av
+    from analysis import worker_pool as wp
+
+    return {
+        "analysis_version": av.ANALYSIS_VERSION,
+        "pose_confidence": av.POSE_CONFIDENCE,
+        "frame_sample_rate": av.FRAME_SAMPLE_RATE,
+        "sampling_mode": av.SAMPLING_MODE,
+        "max_inferences_per_min": av.MAX_INFERENCES_PER_MIN,
+        "decode_max_side": av.DECODE_MAX_SIDE,
+        "seek_min_gap": av.SEEK_MIN_GAP,
+        # Long videos are split into one range per worker, each primed
+        # with its own warm-up, so tracking (and the scores) can differ
+        "chunk_min_sec": wp.CHUNK_MIN_SEC,
+        "chunk_warmup_sec": wp.CHUNK_WARMUP_SEC,
+        "analysis_workers": wp.ANALYSIS_WORKERS,
+    }
+
+
+def cache_key(content_hash: str) -> str:
+    """Combines a video content hash with the analysis settings"""
+    blob = json.dumps({"content": content_hash, **analysis_params()}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# ============================================================
+# Backends
+# ============================================================
+
+class _Counters:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.puts = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def bump(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def to_dict(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "puts": self.puts,
+            "evictions": self.evictions,
+            "hitRate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class LocalAnalysisCache:
+    """
+    Analyses stored as JSON files in a local directory
+
+    File mtime is bumped on every hit, so eviction removes the least
+    recently used entries until the directory is under `max_bytes`.
+    """
+
+    def __init__(self, root: str = ANALYSIS_CACHE_DIR, max_bytes: int = ANALYSIS_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.counters = _Counters()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                analysis = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.counters.bump("misses")
+            return None
+        self.counters.bump("hits")
+        return analysis
+
+    def put(self, key: str, analysis: dict):
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(analysis, f)
+        os.replace(tmp, path)
+        self.counters.bump("puts")
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                if not name.endswith(".json"):
+                    continue
+                try:
+                    st = os.stat(os.path.join(self.root, name))
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, name))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.root, name))
+                except OSError:
+                    continue
+                total -= size
+                self.counters.bump("evictions")
+
+
+class S3AnalysisCache:
+    """
+    Analyses stored under an S3 prefix shared by every server
+
+    S3 has no access time, so eviction drops the oldest written entries
+    once the prefix grows past `max_bytes` (checked every `evict_every` puts).
+    """
+
+    def __init__(
+        self,
+        s3,
+        bucket: str,
+        prefix: str = ANALYSIS_CACHE_PREFIX,
+        max_bytes: int = ANALYSIS_CACHE_MAX_BYTES,
+        evict_every: int = 50,
+    ):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.evict_every = evict_every
+        self.counters = _Counters()
+
+    def get(self, key: str):
+        try:
+            body = self.s3.get_object(Bucket=self.bucket, Key=f"{self.prefix}{key}.json")["Body"]
+            analysis = json.loads(body.read())
+        except Exception:
+            self.counters.bump("misses")
+            return None
+        self.counters.bump("hits")
+        return analysis
+
+    def put(self, key: str, analysis: dict):
+        self.s3.put_object(
+            Bucket=self.bucket,
+            Key=f"{self.prefix}{key}.json",
+            Body=json.dumps(analysis).encode(),
+            ContentType="application/json",
+        )
+        self.counters.bump("puts")
+        if self.counters.puts % self.evict_every == 0:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                entries.append((obj["LastModified"], obj["Size"], obj["Key"]))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.s3.delete_object(Bucket=self.bucket, Key=key)
+            total -= size
+            self.counters.bump("evictions")
+
+
+def create_cache(s3=None, bucket: str = None):
+    """Builds the configured cache backend, or None when caching is off"""
+    if ANALYSIS_CACHE == "local":
+        return LocalAnalysisCache()
+    if ANALYSIS_CACHE == "s3":
+        return S3AnalysisCache(s3, bucket)
+    return None
@@ -1,19 +1,48 @@
 from flask import Flask, request, jsonify, Response
-from queue import Queue
-import requests
 import os
 from dotenv import load_dotenv
 from flask_cors import CORS
-import boto3
 import uuid
+import time
 import tempfile
-import subprocess
 import sys
 import json
-import threading
+from contextlib import ExitStack
 from datetime import datetime
 from advice import generate_advice
-from ml.inference import predict_posture
+from analysis.worker_pool import get_pool
+from analysis_cache import cache_key, create_cache, file_md5
+from chat import (
+    CHAT_TIMEOUT_SEC,
+    GROQ_API_URL,
+    STREAM_HEADERS,
+    ChatError,
+    chat_reply,
+    chat_request,
+    create_chat_session,
+    replay_events,
+    sse_event,
+    stream_delta,
+    upstream_failed,
+)
+from chat_cache import chat_cache_key, create_chat_cache
+from events import create_event_log, parse_event_id
+from history_index import HistoryIndex, page_args, summarize
+from lazy import Lazy
+from live_sessions import LiveSessions
+from metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    StageTimer,
+    analysis_job_seconds,
+    analysis_jobs,
+    chat_upstream_errors,
+    chat_upstream_seconds,
+    registry as metrics_registry,
+    s3_bytes,
+)
+from s3_client import PRESIGN_EXPIRES_SEC, PresignedUrlCache, create_s3_client
+from s3_stream import STREAMING_INGEST, VideoIngest
+from scheduler import ANALYSIS_RETRY_AFTER_SEC, JobScheduler, QueueFull
 
 sys.stdout.reconfigure(line_buffering=True)
 load_dotenv()
@@ -25,9 +54,39 @@ CORS(app, origins=["http://localhost:5173"], supports_credentials=True)
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 AWS_BUCKET = os.getenv("AWS_BUCKET_NAME")
 
-s3 = boto3.client("s3", region_name=os.getenv("AWS_REGION"))
+# Shared by every route and background thread (pool, timeouts, retries).
+# Built on first use, so importing the app doesn't import boto3
+s3 = Lazy(create_s3_client)
 
-analysis_events = {}
+# Presigned download URLs reused until close to expiry
+presigned_urls = PresignedUrlCache(s3, AWS_BUCKET)
+
+# Keys one /api/download-urls request may sign
+PRESIGN_BATCH_MAX = int(os.getenv("PRESIGN_BATCH_MAX", "200"))
+
+# Keep-alive connection pool to the Groq API (built on the first chat)
+chat_http = Lazy(create_chat_session)
+
+# Exact-match cache of chat replies (None when disabled)
+chat_cache = create_chat_cache()
+
+# SSE event broker: per-user fan-out, bounded, resumable with Last-Event-ID
+analysis_events = create_event_log()
+
+# Seconds between SSE heartbeats on an idle stream
+SSE_KEEPALIVE_SEC = float(os.getenv("SSE_KEEPALIVE_SEC", "15"))
+
+# Content-addressed cache of pose analyses (None when disabled)
+analysis_cache = create_cache(s3, AWS_BUCKET)
+
+# Per-user history manifests maintained by the analysis worker
+history_index = HistoryIndex(s3, AWS_BUCKET)
+
+# Live posture sessions scored from browser landmark frames
+live_sessions = LiveSessions()
+
+# Landmark time series (analysis/timeseries.py) stored beside each analysis JSON
+SERIES_SUFFIX = ".landmarks.npz"
 
 # ---------- CHAT (Groq) ----------
 # Communication between frontend and Groq API
@@ -38,41 +97,104 @@ def chat():
     if request.method == "OPTIONS":
         return "", 200
     
-    # Validate API Key
-    if not GROQ_API_KEY:
-        return jsonify({"error": "Missing GROQ_API_KEY in backend .env"}), 500
-    data = request.get_json(silent=True) or {}
-    messages = data.get("messages")
-
-    if not isinstance(messages, list) or len(messages) == 0:
-        return jsonify({"error": "messages must be a non-empty list"}), 400
-    # External API config (Groq-compatible OpenAI endpoint)
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json",
-    }
-
-    payload = {
-        "model": os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),
-        "messages": messages,
-        "temperature": 0.4,
-    }
-
     try:
-        # synch API call, with protection for timeout
-        r = requests.post(url, headers=headers, json=payload, timeout=30)
-        if not r.ok:
-            return jsonify({"error": "Groq request failed", "details": r.text}), 500
-        # Extract generated response from LLM
-        out = r.json()
-        reply = out["choices"][0]["message"]["content"]
-        return jsonify({"reply": reply})
+        headers, payload = chat_request(GROQ_API_KEY, request.get_json(silent=True) or {})
+    except ChatError as e:
+        return jsonify(e.body), e.status
 
+    try:
+        if payload.get("stream"):
+            return stream_chat(headers, payload)
+
+        def load():
+            # synch API call, with protection for timeout
+            t0 = time.perf_counter()
+            try:
+                r = chat_http.post(GROQ_API_URL, headers=headers, json=payload, timeout=CHAT_TIMEOUT_SEC)
+                if not r.ok:
+                    raise upstream_failed(r.text)
+                reply = chat_reply(r.json())["reply"]
+            except Exception:
+                chat_upstream_errors.inc(mode="complete")
+                raise
+            chat_upstream_seconds.observe(time.perf_counter() - t0, mode="complete")
+            return reply
+
+        # Identical prompts in flight share one upstream call
+        if chat_cache is None:
+            reply, source = load(), "off"
+        else:
+            reply, source = chat_cache.fetch(chat_cache_key(payload), load)
+
+        resp = jsonify({"reply": reply})
+        resp.headers["X-Chat-Cache"] = source
+        return resp
+
+    except ChatError as e:
+        return jsonify(e.body), e.status
     except Exception as e:
         return jsonify({"error": "Chat server error", "details": str(e)}), 500
 
 
+def stream_chat(headers, payload):
+    """Streams a cached reply at once, or relays the upstream and caches it"""
+    key = chat_cache_key(payload) if chat_cache is not None else None
+    reply = chat_cache.get(key) if key else None
+    if reply is not None:
+        body, source = replay_events(reply), "hit"
+    else:
+        t0 = time.perf_counter()
+        try:
+            r = chat_http.post(GROQ_API_URL, headers=headers, json=payload, timeout=CHAT_TIMEOUT_SEC, stream=True)
+            if not r.ok:
+                raise upstream_failed(r.text)
+        except Exception:
+            chat_upstream_errors.inc(mode="stream")
+            raise
+        chat_upstream_seconds.observe(time.perf_counter() - t0, mode="stream")
+
+        on_complete = None
+        if key:
+            on_complete = lambda text: chat_cache.put(key, text, time.perf_counter() - t0)
+        body, source = relay_chat_stream(r, on_complete), "miss" if key else "off"
+
+    return Response(
+        body,
+        mimetype="text/event-stream",
+        headers={**STREAM_HEADERS, "X-Chat-Cache": source},
+    )
+
+
+def relay_chat_stream(r, on_complete=None):
+    """
+    Relays upstream tokens to the browser as they arrive
+
+    When the client disconnects the server closes this generator, which
+    closes the upstream response; the half-read connection is dropped
+    rather than returned to the pool, so generation stops upstream too.
+    on_complete(reply) is called only for a stream that reached [DONE].
+    """
+    try:
+        done = False
+        parts = []
+        # Reads to the end of the body even after [DONE] so the
+        # connection goes back to the pool
+        for line in r.iter_lines():
+            delta = None if done else stream_delta(line)
+            if delta is None:
+                done = True
+            elif delta:
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+        if done and on_complete is not None:
+            on_complete("".join(parts))
+        yield sse_event({"done": True})
+    except Exception as e:
+        yield sse_event({"error": "Chat stream failed", "details": str(e)})
+    finally:
+        r.close()
+
+
 # ---------- DOWNLOAD URL ----------
 @app.route("/api/download-url", methods=["POST", "OPTIONS"])
 def create_download_url():
@@ -94,26 +216,54 @@ def create_download_url():
     if not user_id or not object_key:
         return jsonify({"error": "Missing userId or key"}), 400
 
-    allowed_prefixes = [
-        f"videos/{user_id}/",
-        f"analysis/{user_id}/",
-    ]
-
-    if not any(object_key.startswith(p) for p in allowed_prefixes):
+    if not owns_key(user_id, object_key):
         return jsonify({"error": "Unauthorized"}), 403
 
-    download_url = s3.generate_presigned_url(
-        "get_object",
-        Params={
-            "Bucket": AWS_BUCKET,
-            "Key": object_key,
-        },
-        ExpiresIn=600,
-    )
+    download_url = presigned_urls.download_url(user_id, object_key)
 
     return jsonify({ "downloadUrl": download_url })
 
 
+@app.route("/api/download-urls", methods=["POST", "OPTIONS"])
+def create_download_urls():
+    """
+    Presigned download URLs for many keys in one round-trip
+
+    For pages that show a whole history grid. Returns
+    {"urls": {key: url}, "errors": {key: reason}}; keys outside the
+    user's namespaces are reported in errors, not signed.
+    """
+    if request.method == "OPTIONS":
+        return "", 200
+
+    data = request.json or {}
+    user_id = data.get("userId")
+    keys = data.get("keys")
+
+    if not user_id or not isinstance(keys, list) or not keys:
+        return jsonify({"error": "Missing userId or keys"}), 400
+    if len(keys) > PRESIGN_BATCH_MAX:
+        return jsonify({"error": f"At most {PRESIGN_BATCH_MAX} keys per request"}), 400
+
+    urls, errors = {}, {}
+    for key in dict.fromkeys(keys):
+        if not isinstance(key, str) or not owns_key(user_id, key):
+            errors[str(key)] = "Unauthorized"
+            continue
+        urls[key] = presigned_urls.download_url(user_id, key)
+
+    return jsonify({"urls": urls, "errors": errors})
+
+
+def owns_key(user_id, object_key):
+    """Users can only read objects under their own videos/ and analysis/ prefixes"""
+    allowed_prefixes = [
+        f"videos/{user_id}/",
+        f"analysis/{user_id}/",
+    ]
+    return any(object_key.startswith(p) for p in allowed_prefixes)
+
+
 # ---------- UPLOAD URL ----------
 @app.route("/api/upload-url", methods=["POST"])
 def create_upload_url():
@@ -144,7 +294,7 @@ def create_upload_url():
             "Key": object_key,
             "ContentType": content_type,
         },
-        ExpiresIn=600,
+        ExpiresIn=PRESIGN_EXPIRES_SEC,
     )
 
     return jsonify({
@@ -154,44 +304,151 @@ def create_upload_url():
 
 
 # ---------- BACKGROUND ANALYSIS ----------
+def publish_progress(user_id, s3_key, progress):
+    """Forwards worker progress to the user's SSE stream (latest one wins)"""
+    provisional = progress["provisional"]
+    analysis_events.publish(user_id, {
+        "type": "analysis_progress",
+        "videoKey": s3_key,
+        "framesDecoded": progress["frames_decoded"],
+        "framesAnalyzed": progress["frames_analyzed"],
+        "framesWithPose": progress["frames_with_pose"],
+        "frameCount": progress["frame_count"],
+        "fps": progress["fps"],
+        "etaSec": progress["eta_sec"],
+        "provisionalScore": provisional["overall_score"],
+        "provisionalLabel": provisional["weak_label"],
+        "provisionalMetrics": provisional["metrics"],
+    }, coalesce_key=f"progress:{s3_key}")
+
+
+def copy_cached_series(analysis, series_key):
+    """
+    Copies the landmark series of a cached analysis to `series_key`
+
+    Cache entries point at the series stored by the job that filled
+    them. Returns False when there is none (older entries) or it is gone
+    (that video was deleted); the caller then analyzes the video again
+    rather than storing an analysis without its series.
+    """
+    source = analysis.get("seriesKey")
+    if not source:
+        return False
+    if source != series_key:
+        try:
+            s3.copy_object(
+                Bucket=AWS_BUCKET,
+                Key=series_key,
+                CopySource={"Bucket": AWS_BUCKET, "Key": source},
+            )
+        except Exception as e:
+            print("[cache] Cached series unavailable, re-analyzing:", e)
+            return False
+    analysis["seriesKey"] = series_key
+    return True
+
+
 def run_analysis_async(user_id, s3_key, instrument, title):
     """
     Background worker that 
-    - Downloads video from S3
+    - Streams / downloads video from S3
     - Runs pose + ML analysis
     - Stores results back in S3
+
+    Each step is a StageTimer stage: its duration and errors go to
+    /metrics, and the per-job timings to metadata["stage_timings_sec"].
     """
+    # Temporary local paths for processing, always removed when the job ends
+    local_json = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.json")
+    local_series = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}{SERIES_SUFFIX}")
+    timer = StageTimer()
+    outcome = "failed"
+
     try:
-        # Create temporary local paths for processing
-        local_video = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.mp4")
-        local_json = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.json")
-
-        # Download uploaded video from S3
-        s3.download_file(AWS_BUCKET, s3_key, local_video)
-
-        # Run analysis script (pose extraction)
-        script_path = os.path.join(
-            os.path.dirname(__file__),
-            "analysis",
-            "analyze_video.py",
-        )
-
-        subprocess.run(
-            [sys.executable, script_path, local_video, instrument, local_json],
-            check=True,
-        )
-
-        # Derive analysis storage key
+        # Derive analysis storage keys
         video_id = s3_key.split("/")[-1].split("_")[0]
         analysis_key = f"analysis/{user_id}/{video_id}.json"
+        series_key = f"analysis/{user_id}/{video_id}{SERIES_SUFFIX}"
+
+        # ---- Cache lookup (skips download + analysis on a hit) ----
+        # Single-part uploads have the content MD5 as their ETag
+        analysis = None
+        key = None
+        if analysis_cache is not None:
+            with timer.stage("cache_lookup"):
+                etag = s3.head_object(Bucket=AWS_BUCKET, Key=s3_key)["ETag"].strip('"')
+                if "-" not in etag:
+                    key = cache_key(etag)
+                    analysis = analysis_cache.get(key)
+                    if analysis is not None and not copy_cached_series(analysis, series_key):
+                        analysis = None
+        cache_hit = analysis is not None
+
+        if analysis is None:
+            # Multipart ETags aren't content hashes, so the bytes must be
+            # hashed (and therefore fully downloaded) before analysis
+            need_hash = analysis_cache is not None and key is None
+
+            # Parallel ranged GETs; streamable containers are piped into the
+            # decoder as they arrive instead of waiting for the whole file.
+            # "ingest" is the full download, or only the first part when streaming
+            with ExitStack() as stack:
+                with timer.stage("ingest"):
+                    source = stack.enter_context(VideoIngest(
+                        s3,
+                        AWS_BUCKET,
+                        s3_key,
+                        allow_streaming=STREAMING_INGEST and not need_hash,
+                    ))
+
+                if need_hash:
+                    with timer.stage("cache_lookup"):
+                        key = cache_key(file_md5(source.path))
+                        analysis = analysis_cache.get(key)
+                        if analysis is not None and not copy_cached_series(analysis, series_key):
+                            analysis = None
+                    cache_hit = analysis is not None
+
+                if analysis is None:
+                    # Run pose extraction on a warm worker (no per-job interpreter startup)
+                    with timer.stage("analysis"):
+                        analysis = get_pool().analyze(
+                            source.path,
+                            instrument,
+                            series_path=local_series,
+                            streaming=source.streaming,
+                            on_progress=lambda p: publish_progress(user_id, s3_key, p),
+                        )
+            s3_bytes.inc(source.download.bytes_read, direction="download")
+
+            if not cache_hit:
+                analysis["metadata"]["ingest"] = "streaming" if source.streaming else "download"
+
+                # ---- Upload per-frame landmark series ----
+                # Before the cache store, so the entry can point at it
+                with timer.stage("upload_series"):
+                    s3.upload_file(
+                        local_series,
+                        AWS_BUCKET,
+                        series_key,
+                        ExtraArgs={"ContentType": "application/octet-stream"},
+                    )
+                s3_bytes.inc(os.path.getsize(local_series), direction="upload")
+                analysis["seriesKey"] = series_key
+
+                if analysis_cache is not None:
+                    with timer.stage("cache_store"):
+                        analysis_cache.put(key, analysis)
+
+        if cache_hit:
+            analysis["metadata"]["cache"] = "hit"
 
-        # Load analysis output
-        with open(local_json, "r") as f:
-            analysis = json.load(f)
-        
         # ---- ML prediction (supplementary) ----
         try:
-            analysis["ml"] = predict_posture(analysis["feature_vector"])
+            with timer.stage("predict"):
+                from ml.inference import predict_posture
+
+                analysis["ml"] = predict_posture(analysis["feature_vector"])
         except Exception as e:
             print("[ML] Prediction failed:", e)
             analysis["ml"] = {
@@ -200,8 +457,9 @@ def run_analysis_async(user_id, s3_key, instrument, title):
 
 
         # ---- Generate personalized advice (CORRECT ORDER) ----
-        metrics = analysis.get("metrics", {})
-        analysis["advice"] = generate_advice(metrics)
+        with timer.stage("advice"):
+            metrics = analysis.get("metrics", {})
+            analysis["advice"] = generate_advice(metrics)
 
         # Attach metadata for downstream use
         analysis.update({
@@ -212,32 +470,74 @@ def run_analysis_async(user_id, s3_key, instrument, title):
             "created_at": datetime.utcnow().isoformat(),
         })
 
+        # Stages up to here; the upload and index update below only go to /metrics
+        analysis["metadata"]["stage_timings_sec"] = timer.timings()
+
         # ---- Save updated JSON ----
-        with open(local_json, "w") as f:
-            json.dump(analysis, f, indent=2)
-
-        # ---- Upload analysis ----
-        s3.upload_file(
-            local_json,
-            AWS_BUCKET,
-            analysis_key,
-            ExtraArgs={"ContentType": "application/json"},
-        )
-
-        # ---- Notify SSE listeners ----
-        q = analysis_events.setdefault(user_id, Queue())
-        q.put({
+        with timer.stage("upload_analysis"):
+            with open(local_json, "w") as f:
+                json.dump(analysis, f, indent=2)
+
+            # ---- Upload analysis ----
+            s3.upload_file(
+                local_json,
+                AWS_BUCKET,
+                analysis_key,
+                ExtraArgs={"ContentType": "application/json"},
+            )
+        s3_bytes.inc(os.path.getsize(local_json), direction="upload")
+
+        # ---- Update history index ----
+        # The analysis is already stored, so a failed manifest update must
+        # not fail the job; dropping the manifest makes the next read rebuild it
+        try:
+            with timer.stage("history_index"):
+                history_index.upsert(user_id, summarize(analysis, analysis_key))
+        except Exception as e:
+            print("[history] Index update failed, rebuilding on next read:", e)
+            try:
+                history_index.invalidate(user_id)
+            except Exception as e:
+                print("[history] Could not drop the manifest:", e)
+
+        # ---- Notify SSE listeners (replaces any pending progress event) ----
+        analysis_events.publish(user_id, {
             "type": "analysis_complete",
             "videoKey": s3_key,
             "analysisKey": analysis_key,
             "title": analysis["title"],
-        })
+        }, coalesce_key=f"progress:{s3_key}")
 
+        outcome = "done"
         print("✅ Analysis complete:", analysis_key)
+        return {"analysisKey": analysis_key}
 
     except Exception as e:
         print("❌ Background analysis failed:", e)
+        raise
+
+    finally:
+        analysis_jobs.inc(outcome=outcome)
+        analysis_job_seconds.observe(timer.elapsed(), outcome=outcome)
+        for path in (local_json, local_series):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# Bounded, per-user fair queue in front of the analysis workers
+scheduler = JobScheduler(run_analysis_async)
 
+# Read from the scheduler when /metrics is scraped
+metrics_registry.gauge(
+    "analysis_queue_depth", "Analysis jobs waiting for a worker",
+    fn=lambda: scheduler.stats()["queued"],
+)
+metrics_registry.gauge(
+    "analysis_jobs_running", "Analysis jobs currently running",
+    fn=lambda: scheduler.stats()["running"],
+)
 
 
 # ---------- START ANALYSIS ----------
@@ -248,8 +548,9 @@ def analyze_after_upload():
 
     This endpoint: 
     - Records metadata (no video data)
-    - Launches analysis asynchronously
-    - Returns immediately, to not block frontend
+    - Queues analysis on the bounded job scheduler
+    - Returns immediately with a job id, to not block frontend
+    - Responds 429 when the queue is full
     """
     data = request.json or {}
     user_id = data.get("userId")
@@ -259,14 +560,39 @@ def analyze_after_upload():
 
     if not user_id or not s3_key:
         return jsonify({"error": "Missing fields"}), 400
-    # Run analysis in a background thread
-    threading.Thread(
-        target=run_analysis_async,
-        args=(user_id, s3_key, instrument, title),
-        daemon=True,
-    ).start()
+    # Queue analysis; rejected when the scheduler is at capacity
+    try:
+        job = scheduler.submit(user_id, s3_key, instrument, title)
+    except QueueFull as e:
+        resp = jsonify({"error": str(e), "retryAfterSec": ANALYSIS_RETRY_AFTER_SEC, **scheduler.stats()})
+        resp.headers["Retry-After"] = str(ANALYSIS_RETRY_AFTER_SEC)
+        return resp, 429
+
     # Respond immediately so frontend remains responsive
-    return jsonify({"status": "analysis_started"}), 202
+    status = scheduler.get(job.id)
+    return jsonify({
+        "status": "analysis_started",
+        "jobId": job.id,
+        "position": status.get("position"),
+    }), 202
+
+
+# ---------- JOB STATUS ----------
+@app.route("/api/analysis-jobs/<job_id>", methods=["GET"])
+def analysis_job_status(job_id):
+    """
+    Polling endpoint for a queued / running analysis job
+
+    Only the user who submitted the job (?userId=...) can see it; any
+    other caller gets the same 404 as for an unknown id.
+    """
+    user_id = request.args.get("userId")
+    if not user_id:
+        return jsonify({"error": "Missing userId"}), 400
+    status = scheduler.get(job_id, user_id)
+    if status is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(status)
 
 
 # ---------- HISTORY ----------
@@ -275,8 +601,8 @@ def history():
     """
     Returns a user's analysis hsitory
 
-    - Lists analysis JSON file in S3
-    - Extracts lightweight metadata only
+    - Reads the user's summary manifest (one S3 GET)
+    - Optional offset / limit pagination and createdAt order
     - Avoids sending large files to the client
     """
     data = request.json or {}
@@ -284,47 +610,87 @@ def history():
     if not user_id:
         return jsonify({"error": "Missing userId"}), 400
 
-    resp = s3.list_objects_v2(
-        Bucket=AWS_BUCKET,
-        Prefix=f"analysis/{user_id}/",
-    )
+    try:
+        offset, limit, order = page_args(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
-    rows = []
-    for obj in resp.get("Contents", []):
-        key = obj["Key"]
-        if not key.endswith(".json"):
-            continue
+    rows, total = history_index.page(user_id, offset=offset, limit=limit, order=order)
 
-        analysis = json.loads(
-            s3.get_object(Bucket=AWS_BUCKET, Key=key)["Body"].read()
-        )
-
-        rows.append({
-            "title": analysis.get("title"),
-            "videoKey": analysis.get("videoKey"),
-            "analysisKey": key,
-            "createdAt": analysis.get("created_at"),
-            "instrument": analysis.get("instrument"),
-            "overallScore": analysis.get("overall_score"),
-            "poseCoverage": (analysis.get("metrics") or {}).get("pose_coverage"),
-            "mlLabel": analysis.get("ml", {}).get("label"),
-            "mlConfidence": analysis.get("ml", {}).get("confidence"),
+    resp = jsonify(rows)
+    resp.headers["X-Total-Count"] = str(total)
+    return resp
+
+
+# ---------- ANALYSIS CACHE STATS ----------
+@app.route("/api/analysis-cache/stats", methods=["GET"])
+def analysis_cache_stats():
+    if analysis_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **analysis_cache.counters.to_dict()})
+
+
+# ---------- PRESIGNED URL CACHE STATS ----------
+@app.route("/api/presigned-urls/stats", methods=["GET"])
+def presigned_url_stats():
+    return jsonify(presigned_urls.stats())
+
+
+# ---------- MODEL REGISTRY STATS ----------
+@app.route("/api/model/stats", methods=["GET"])
+def model_stats():
+    """Serving and shadow model versions, reloads and shadow disagreement"""
+    from ml.inference import registry as model_registry
+
+    model_registry.refresh()
+    return jsonify(model_registry.stats())
 
-        })
 
-    rows.sort(key=lambda r: r["createdAt"] or "", reverse=True)
-    return jsonify(rows)
+# ---------- CHAT CACHE STATS ----------
+@app.route("/api/chat-cache/stats", methods=["GET"])
+def chat_cache_stats():
+    if chat_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True, **chat_cache.stats()})
 
 
 # ---------- SSE STREAM ----------
 @app.route("/api/analysis-events/<user_id>")
 def analysis_events_stream(user_id):
-    q = analysis_events.setdefault(user_id, Queue())
+    """
+    Server-sent analysis events for one user
+
+    Emits analysis_progress (coalesced, at most one pending per video)
+    and analysis_complete events to every open tab of the user.
+    Reconnecting clients send Last-Event-ID and get everything they
+    missed that is still in the ring buffer; a new connection without
+    one only sees events published after it opened.
+    """
+    sub = analysis_events.subscribe(
+        user_id,
+        after=parse_event_id(
+            request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+        ),
+    )
 
     def stream():
-        while True:
-            event = q.get()
-            yield f"data: {json.dumps(event)}\n\n"
+        try:
+            # Flushes headers right away and sets the reconnect delay
+            yield "retry: 3000\n\n"
+            while True:
+                events = sub.next(timeout=SSE_KEEPALIVE_SEC)
+                if events is None:
+                    # Evicted (too many open streams for this user)
+                    return
+                if not events:
+                    # Heartbeat comment; writing it is also how a
+                    # disconnected client is noticed
+                    yield ": keep-alive\n\n"
+                    continue
+                for event_id, event in events:
+                    yield f"id: {event_id}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            sub.close()
 
     return Response(
         stream(),
@@ -335,6 +701,80 @@ def analysis_events_stream(user_id):
         },
     )
 
+
+# ---------- LIVE SESSIONS ----------
+@app.route("/api/live/sessions", methods=["POST"])
+def create_live_session():
+    """
+    Starts a live posture session
+
+    The browser runs MediaPipe itself and streams landmark frames to
+    /api/live/sessions/<id>/frames; each batch returns the rolling score.
+    """
+    data = request.json or {}
+    user_id = data.get("userId")
+    if not user_id:
+        return jsonify({"error": "Missing userId"}), 400
+    try:
+        window_sec = data.get("windowSec")
+        window_sec = None if window_sec is None else float(window_sec)
+    except (TypeError, ValueError):
+        return jsonify({"error": "windowSec must be a number"}), 400
+
+    session = live_sessions.create(user_id, window_sec)
+    return jsonify({
+        "sessionId": session.id,
+        "windowSec": session.window.window_sec,
+    }), 201
+
+
+@app.route("/api/live/sessions/<session_id>/frames", methods=["POST"])
+def push_live_frames(session_id):
+    """
+    Adds a batch of {t, landmarks} frames to a live session
+
+    Returns the score, weak label and metrics over the rolling window.
+    """
+    data = request.json or {}
+    session = live_sessions.get(session_id, data.get("userId"))
+    if session is None:
+        return jsonify({"error": "Unknown session"}), 404
+    try:
+        result = live_sessions.push(session, data.get("frames"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result)
+
+
+@app.route("/api/live/sessions/<session_id>", methods=["DELETE"])
+def close_live_session(session_id):
+    """Ends a live session and returns the whole-session summary"""
+    data = request.get_json(silent=True) or {}
+    user_id = data.get("userId") or request.args.get("userId")
+    summary = live_sessions.close(session_id, user_id)
+    if summary is None:
+        return jsonify({"error": "Unknown session"}), 404
+    return jsonify(summary)
+
+
+@app.route("/api/live/stats", methods=["GET"])
+def live_stats():
+    return jsonify(live_sessions.stats())
+
+
+# ---------- EVENT BROKER STATS ----------
+@app.route("/api/stats/analysis-events", methods=["GET"])
+def analysis_events_stats():
+    return jsonify(analysis_events.stats())
+
+
+# ---------- PROMETHEUS METRICS ----------
+@app.route("/metrics", methods=["GET"])
+def prometheus_metrics():
+    """Pipeline stage timings, job outcomes, queue depth, S3 bytes, chat latency"""
+    return Response(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+
+
 # ---------- DELETE VIDEO + ANALYSIS ----------
 @app.route("/api/delete-video", methods=["POST"])
 def delete_video():
@@ -345,18 +785,32 @@ def delete_video():
     if not user_id or not video_id:
         return jsonify({"error": "Missing userId or videoId"}), 400
 
-    s3 = boto3.client("s3")
-
     video_key = f"videos/{user_id}/{video_id}.mp4"
     analysis_key = f"analysis/{user_id}/{video_id}.json"
+    series_key = f"analysis/{user_id}/{video_id}{SERIES_SUFFIX}"
 
     try:
         s3.delete_object(Bucket=AWS_BUCKET, Key=video_key)
         s3.delete_object(Bucket=AWS_BUCKET, Key=analysis_key)
-        return jsonify({"success": True})
+        s3.delete_object(Bucket=AWS_BUCKET, Key=series_key)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+    presigned_urls.forget(user_id, [video_key, analysis_key, series_key])
+
+    # The objects are gone: a failed index update must not turn this into an
+    # error the client would retry, so drop the manifest and let it rebuild
+    try:
+        history_index.remove(user_id, analysis_key)
+    except Exception as e:
+        print("[history] Index update failed, rebuilding on next read:", e)
+        try:
+            history_index.invalidate(user_id)
+        except Exception as e:
+            print("[history] Could not drop the manifest:", e)
+
+    return jsonify({"success": True})
+
 
 if __name__ == "__main__":
     app.run(debug=True)
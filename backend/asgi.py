@@ -0,0 +1,273 @@
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as wsgi
+from chat import (
+    CHAT_MAX_CONNECTIONS,
+    CHAT_TIMEOUT_SEC,
+    GROQ_API_URL,
+    STREAM_HEADERS,
+    ChatError,
+    chat_reply,
+    chat_request,
+    replay_events,
+    sse_event,
+    stream_delta,
+    upstream_failed,
+)
+from chat_cache import chat_cache_key
+from events import parse_event_id
+from history_index import page_args
+from metrics import chat_upstream_errors, chat_upstream_seconds
+
+# ============================================================
+# Async serving path
+# ============================================================
+#
+# Run with:  uvicorn asgi:app --host 0.0.0.0 --port 5000
+#
+# The I/O-bound routes (chat proxy, history, SSE) are served natively on
+# the event loop, so a slow LLM call or an idle event stream costs a
+# coroutine instead of a worker thread. Every other route is the Flask
+# app, mounted unchanged and run on a bounded thread pool.
+
+# Idle time before a pooled upstream connection is closed
+CHAT_KEEPALIVE_SEC = float(os.getenv("CHAT_KEEPALIVE_SEC", "30"))
+
+# Threads available to the mounted Flask routes
+WSGI_THREADS = int(os.getenv("WSGI_THREADS", "16"))
+
+http = None
+
+
+@asynccontextmanager
+async def lifespan(_app):
+    global http
+    http = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=CHAT_MAX_CONNECTIONS,
+            keepalive_timeout=CHAT_KEEPALIVE_SEC,
+        ),
+        # Per connect / per read, like requests' timeout on the Flask path:
+        # a streamed reply may run longer than CHAT_TIMEOUT_SEC in total
+        timeout=aiohttp.ClientTimeout(
+            total=None,
+            sock_connect=CHAT_TIMEOUT_SEC,
+            sock_read=CHAT_TIMEOUT_SEC,
+        ),
+    )
+    try:
+        yield
+    finally:
+        await http.close()
+
+
+async def _json_body(request: Request) -> dict:
+    try:
+        data = await request.json()
+    except ValueError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+# ---------- CHAT ----------
+async def chat(request: Request):
+    """Same contract as the Flask /api/chat, without holding a thread"""
+    if request.method == "OPTIONS":
+        return Response("", 200)
+
+    try:
+        headers, payload = chat_request(wsgi.GROQ_API_KEY, await _json_body(request))
+        if payload.get("stream"):
+            return await stream_chat(headers, payload)
+
+        async def load():
+            t0 = time.perf_counter()
+            try:
+                async with http.post(GROQ_API_URL, headers=headers, json=payload) as r:
+                    if r.status >= 400:
+                        raise upstream_failed(await r.text())
+                    reply = chat_reply(await r.json(content_type=None))["reply"]
+            except Exception:
+                chat_upstream_errors.inc(mode="complete")
+                raise
+            chat_upstream_seconds.observe(time.perf_counter() - t0, mode="complete")
+            return reply
+
+        # Shares the Flask app's cache, so in-flight calls coalesce across both
+        cache = wsgi.chat_cache
+        if cache is None:
+            reply, source = await load(), "off"
+        else:
+            reply, source = await cache.fetch_async(chat_cache_key(payload), load)
+        return JSONResponse({"reply": reply}, headers={"X-Chat-Cache": source})
+
+    except ChatError as e:
+        return JSONResponse(e.body, e.status)
+    except Exception as e:
+        return JSONResponse({"error": "Chat server error", "details": str(e)}, 500)
+
+
+async def stream_chat(headers, payload):
+    """Async twin of app.stream_chat"""
+    cache = wsgi.chat_cache
+    key = chat_cache_key(payload) if cache is not None else None
+    reply = cache.get(key) if key else None
+    if reply is not None:
+        body, source = replay_events(reply), "hit"
+    else:
+        t0 = time.perf_counter()
+        try:
+            r = await http.post(GROQ_API_URL, headers=headers, json=payload)
+        except Exception:
+            chat_upstream_errors.inc(mode="stream")
+            raise
+        if r.status >= 400:
+            chat_upstream_errors.inc(mode="stream")
+            text = await r.text()
+            r.release()
+            raise upstream_failed(text)
+        chat_upstream_seconds.observe(time.perf_counter() - t0, mode="stream")
+
+        on_complete = None
+        if key:
+            on_complete = lambda text: cache.put(key, text, time.perf_counter() - t0)
+        body, source = relay_chat_stream(r, on_complete), "miss" if key else "off"
+
+    return StreamingResponse(
+        body,
+        media_type="text/event-stream",
+        headers={**STREAM_HEADERS, "X-Chat-Cache": source},
+    )
+
+
+async def relay_chat_stream(r, on_complete=None):
+    """
+    Async twin of app.relay_chat_stream
+
+    A client disconnect cancels this generator; releasing the upstream
+    response mid-body drops its connection, which stops generation.
+    """
+    try:
+        done = False
+        parts = []
+        # Reads to the end of the body even after [DONE] so the
+        # connection goes back to the pool
+        async for line in r.content:
+            delta = None if done else stream_delta(line)
+            if delta is None:
+                done = True
+            elif delta:
+                parts.append(delta)
+                yield sse_event({"delta": delta})
+        if done and on_complete is not None:
+            on_complete("".join(parts))
+        yield sse_event({"done": True})
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        yield sse_event({"error": "Chat stream failed", "details": str(e)})
+    finally:
+        # Pools the connection if the body was fully read, drops it otherwise
+        r.release()
+
+
+# ---------- HISTORY ----------
+async def history(request: Request):
+    """Same contract as the Flask /api/history"""
+    data = await _json_body(request)
+    user_id = data.get("userId")
+    if not user_id:
+        return JSONResponse({"error": "Missing userId"}, 400)
+
+    try:
+        offset, limit, order = page_args(data)
+    except ValueError as e:
+        return JSONResponse({"error": str(e)}, 400)
+
+    # boto3 is blocking; a manifest rebuild fans out over its own threads
+    rows, total = await asyncio.to_thread(
+        wsgi.history_index.page, user_id, offset=offset, limit=limit, order=order,
+    )
+    return JSONResponse(rows, headers={"X-Total-Count": str(total)})
+
+
+# ---------- SSE STREAM ----------
+async def analysis_events_stream(request: Request):
+    """Same events as the Flask stream; idle connections cost no thread"""
+    sub = wsgi.analysis_events.subscribe(
+        request.path_params["user_id"],
+        after=parse_event_id(
+            request.headers.get("Last-Event-ID") or request.query_params.get("lastEventId")
+        ),
+    )
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                events = await sub.next_async(timeout=wsgi.SSE_KEEPALIVE_SEC)
+                if events is None:
+                    return
+                if not events:
+                    yield ": keep-alive\n\n"
+                    continue
+                for event_id, event in events:
+                    yield f"id: {event_id}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            sub.close()
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        },
+    )
+
+
+async def analysis_events_stats(request: Request):
+    return JSONResponse(wsgi.analysis_events.stats())
+
+
+# Flask-CORS only covers the mounted app, so the native routes get the same policy
+_cors = [
+    Middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+]
+
+app = Starlette(
+    routes=[
+        Route("/chat", chat, methods=["POST", "OPTIONS"], middleware=_cors),
+        Route("/api/chat", chat, methods=["POST", "OPTIONS"], middleware=_cors),
+        Route("/api/history", history, methods=["POST", "OPTIONS"], middleware=_cors),
+        Route("/api/stats/analysis-events", analysis_events_stats, methods=["GET"], middleware=_cors),
+        Route("/api/analysis-events/{user_id}", analysis_events_stream, methods=["GET"], middleware=_cors),
+        Mount("/", WSGIMiddleware(wsgi.app, workers=WSGI_THREADS)),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "5000")))
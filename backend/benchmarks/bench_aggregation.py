@@ -0,0 +1,106 @@
+"""
+Aggregation cost: per-frame Python loop vs. vectorized and online accumulation
+
+Runs on a synthetic landmark array, so no video or mediapipe is needed.
+
+Usage:
+python benchmarks/bench_aggregation.py [--frames 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from analysis.analyze_video import (  # noqa: E402
+    build_analysis,
+    compute_angle_vertical,
+)
+from analysis.landmarks import (  # noqa: E402
+    LEFT_EAR,
+    LEFT_HIP,
+    LEFT_SHOULDER,
+    NUM_LANDMARKS,
+    RIGHT_HIP,
+    RIGHT_SHOULDER,
+)
+from analysis.accumulator import PostureAccumulator  # noqa: E402
+from analysis.posture_metrics import IDEAL_HEAD_ANGLE, angle_deviation  # noqa: E402
+
+
+def loop_aggregate(lms):
+    """The original per-frame loop + list comprehension"""
+    head_angles = []
+    torso_angles = []
+    for frame in lms.tolist():
+        ear, l_sh, r_sh = frame[LEFT_EAR], frame[LEFT_SHOULDER], frame[RIGHT_SHOULDER]
+        l_hip, r_hip = frame[LEFT_HIP], frame[RIGHT_HIP]
+        head_angles.append(compute_angle_vertical((ear[0], ear[1]), (l_sh[0], l_sh[1])))
+        shoulder_mid = ((l_sh[0] + r_sh[0]) / 2.0, (l_sh[1] + r_sh[1]) / 2.0)
+        hip_mid = ((l_hip[0] + r_hip[0]) / 2.0, (l_hip[1] + r_hip[1]) / 2.0)
+        torso_angles.append(compute_angle_vertical(shoulder_mid, hip_mid))
+
+    devs = [angle_deviation(a, IDEAL_HEAD_ANGLE) for a in head_angles]
+    return {
+        "head_mean": float(np.mean(head_angles)),
+        "head_var": float(np.var(head_angles)),
+        "torso_mean": float(np.mean(torso_angles)),
+        "stability_std": float(np.std(devs)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    lms = rng.random((args.frames, NUM_LANDMARKS, 4), dtype=np.float32)
+
+    t0 = time.perf_counter()
+    ref = loop_aggregate(lms)
+    loop_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    posture = PostureAccumulator(30.0)
+    posture.add_batch(lms)
+    vec_sec = time.perf_counter() - t0
+
+    # One frame at a time, as the analysis frame loop feeds it
+    t0 = time.perf_counter()
+    online = PostureAccumulator(30.0)
+    for frame in lms:
+        online.add(frame)
+    online.flush()
+    online_sec = time.perf_counter() - t0
+
+    posture.total_frames = posture.sampled_frames = args.frames
+    partial = {
+        "posture": posture.snapshot(),
+        "sampler": {},
+        "decode": {},
+        "processing_sec": 0.0,
+    }
+    fv = build_analysis(partial, "synthetic", "bench")["feature_vector"]
+    online_fv = online.score()["feature_vector"]
+
+    print(f"frames        {args.frames}")
+    print(f"python loop   {loop_sec * 1000:9.1f} ms")
+    print(f"vectorized    {vec_sec * 1000:9.1f} ms  ({loop_sec / vec_sec:.0f}x)")
+    print(f"online add()  {online_sec * 1000:9.1f} ms  ({loop_sec / online_sec:.0f}x)")
+    for label, out in (("batch", fv), ("online", online_fv)):
+        diff = max(
+            abs(ref["head_mean"] - out["head_angle_mean_deg"]),
+            abs(ref["head_var"] - out["head_angle_var"]),
+            abs(ref["torso_mean"] - out["torso_angle_mean_deg"]),
+            abs(ref["stability_std"] - out["stability_std_dev_deg"]),
+        )
+        print(f"max |Δ| {label:6s}{diff:.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Repeated chat prompts with the reply cache off vs. on
+
+Sends --requests chat requests drawn (Zipf-skewed, with whitespace
+variations) from --questions distinct posture questions at
+--concurrency, through the Flask app and asgi:app against the mock LLM
+of bench_chat_stream.py. Reports throughput, latency, how many calls
+reached the upstream and the cache's own metrics.
+
+Usage:
+python benchmarks/bench_chat_cache.py [--requests 1000] [--questions 20] [--concurrency 100]
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import numpy as np
+
+from bench_chat_stream import free_port, mock_stats, start
+
+QUESTIONS = [
+    "How should I sit at the piano?",
+    "Why does my neck hurt after practice?",
+    "What does a head deviation of 15 degrees mean?",
+    "How far should my wrists be from the keys?",
+    "Is leaning forward bad for my back?",
+    "How often should I take breaks?",
+    "What bench height is right for me?",
+    "How do I relax my shoulders while playing?",
+]
+
+
+def make_prompts(n: int, questions: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    pool = [QUESTIONS[i % len(QUESTIONS)] + f" (#{i})" * (i >= len(QUESTIONS)) for i in range(questions)]
+    weights = [1.0 / (rank + 1) for rank in range(questions)]
+    prompts = []
+    for q in rng.choices(pool, weights=weights, k=n):
+        # Same prompt, different spacing: still one cache entry
+        if rng.random() < 0.3:
+            q = "  " + q.replace(" ", "  ") + "\n"
+        prompts.append({"messages": [{"role": "user", "content": q}]})
+    return prompts
+
+
+async def drive(port: int, mock_port: int, prompts: list, concurrency: int):
+    import aiohttp
+
+    latencies = []
+    sources = {}
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency)) as client:
+        before = (await mock_stats(client, mock_port))["completed"]
+
+        async def one(body):
+            t0 = time.perf_counter()
+            async with client.post(f"http://127.0.0.1:{port}/api/chat", json=body) as r:
+                assert "reply" in await r.json()
+                source = r.headers.get("X-Chat-Cache", "?")
+            latencies.append(time.perf_counter() - t0)
+            sources[source] = sources.get(source, 0) + 1
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one(body) for body in prompts))
+        wall = time.perf_counter() - t0
+
+        upstream = (await mock_stats(client, mock_port))["completed"] - before
+        async with client.get(f"http://127.0.0.1:{port}/api/chat-cache/stats") as r:
+            cache = await r.json()
+
+    lat = np.asarray(latencies) * 1000.0
+    return {
+        "rps": len(prompts) / wall,
+        "p50": np.percentile(lat, 50),
+        "p95": np.percentile(lat, 95),
+        "upstream": upstream,
+        "sources": sources,
+        "cache": cache,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--tokens", type=int, default=25)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    prompts = make_prompts(args.requests, args.questions)
+    mock_port = free_port()
+    base_env = {
+        "GROQ_API_KEY": "bench",
+        "GROQ_API_URL": f"http://127.0.0.1:{mock_port}/v1/chat/completions",
+        "ANALYSIS_CACHE": "off",
+    }
+    procs = [start("mock", mock_port, base_env, "--tokens", str(args.tokens),
+                   "--token-delay", str(args.token_delay))]
+    try:
+        print(f"{args.requests} requests over {args.questions} questions, concurrency "
+              f"{args.concurrency}, upstream {args.tokens * args.token_delay * 1000:.0f} ms")
+        for role in ("wsgi", "asgi"):
+            for mode in ("off", "memory"):
+                port = free_port()
+                procs.append(start(role, port, {**base_env, "CHAT_CACHE": mode}))
+                r = asyncio.run(drive(port, mock_port, prompts, args.concurrency))
+                line = (f"{role:5s} cache {mode:6s}  {r['rps']:7.1f} req/s   p50 {r['p50']:6.0f} ms   "
+                        f"p95 {r['p95']:6.0f} ms   upstream calls {r['upstream']:5d}")
+                if r["cache"].get("enabled"):
+                    c = r["cache"]
+                    line += (f"   hit rate {c['hitRate']:.2f} ({c['hits']} hits, "
+                             f"{c['coalesced']} coalesced)   saved {c['latencySavedSec']:.0f}s")
+                print(line)
+                procs.pop().kill()
+    finally:
+        for proc in procs:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+/api/chat streaming: time-to-first-token, connection reuse, cancellation
+
+Starts a local mock LLM that emits --tokens tokens, one every
+--token-delay seconds (OpenAI-style SSE when asked to stream), and
+drives the Flask app (threaded WSGI server) and asgi:app (uvicorn)
+against it. For each it reports
+  - full-reply latency with stream off vs. first-token latency with it on
+  - upstream TCP connections opened for all those requests (pooling)
+  - whether closing the browser side mid-stream aborts the upstream
+
+Usage:
+python benchmarks/bench_chat_stream.py [--requests 20] [--tokens 40] [--token-delay 0.02]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+# ============================================================
+# Servers (each runs in its own process)
+# ============================================================
+
+def serve_mock_llm(port: int, tokens: int, delay: float):
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, StreamingResponse
+    from starlette.routing import Route
+
+    stats = {"connections": set(), "completed": 0, "aborted": 0}
+
+    async def completions(request):
+        stats["connections"].add(tuple(request.scope["client"]))
+        body = await request.json()
+
+        if not body.get("stream"):
+            await asyncio.sleep(delay * tokens)
+            stats["completed"] += 1
+            return JSONResponse({
+                "choices": [{"message": {"role": "assistant", "content": "tok " * tokens}}],
+            })
+
+        async def stream():
+            done = False
+            try:
+                yield 'data: {"choices":[{"delta":{"role":"assistant"}}]}\n\n'
+                for _ in range(tokens):
+                    await asyncio.sleep(delay)
+                    yield f"data: {json.dumps({'choices': [{'delta': {'content': 'tok '}}]})}\n\n"
+                yield "data: [DONE]\n\n"
+                done = True
+            finally:
+                stats["completed" if done else "aborted"] += 1
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    async def get_stats(request):
+        return JSONResponse({
+            "connections": len(stats["connections"]),
+            "completed": stats["completed"],
+            "aborted": stats["aborted"],
+        })
+
+    app = Starlette(routes=[
+        Route("/v1/chat/completions", completions, methods=["POST"]),
+        Route("/stats", get_stats),
+    ])
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error")
+
+
+def serve_wsgi(port: int):
+    import logging
+
+    from werkzeug.serving import make_server
+
+    import app as wsgi
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    make_server("127.0.0.1", port, wsgi.app, threaded=True).serve_forever()
+
+
+def serve_asgi(port: int):
+    import uvicorn
+
+    uvicorn.run("asgi:app", host="127.0.0.1", port=port, log_level="error")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(role: str, port: int, env: dict, *extra) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", role, "--port", str(port), *extra],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{role} server did not start")
+
+
+# ============================================================
+# Client
+# ============================================================
+
+BODY = {"messages": [{"role": "user", "content": "How should I sit at the piano?"}]}
+
+
+async def mock_stats(client, mock_port: int) -> dict:
+    async with client.get(f"http://127.0.0.1:{mock_port}/stats") as r:
+        return await r.json()
+
+
+async def full_reply(client, url: str) -> float:
+    t0 = time.perf_counter()
+    async with client.post(url, json=BODY) as r:
+        assert "reply" in await r.json()
+    return time.perf_counter() - t0
+
+
+async def first_token(client, url: str) -> float:
+    """Latency to the first delta; the rest of the stream is read out"""
+    t0 = time.perf_counter()
+    ttft = None
+    text = ""
+    async with client.post(url, json={**BODY, "stream": True}) as r:
+        async for line in r.content:
+            if not line.startswith(b"data: "):
+                continue
+            event = json.loads(line[6:])
+            if "delta" in event:
+                ttft = ttft or time.perf_counter() - t0
+                text += event["delta"]
+            if event.get("done") or event.get("error"):
+                break
+    assert text and ttft is not None
+    return ttft
+
+
+async def disconnect_mid_stream(port: int):
+    """Reads the first delta over a raw socket, then hangs up"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = json.dumps({**BODY, "stream": True}).encode()
+    writer.write(
+        b"POST /api/chat HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+        + f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    await reader.readuntil(b'"delta"')
+    writer.close()
+
+
+async def run(role: str, port: int, mock_port: int, args):
+    import aiohttp
+
+    url = f"http://127.0.0.1:{port}/api/chat"
+    async with aiohttp.ClientSession() as client:
+        before = await mock_stats(client, mock_port)
+
+        full = [await full_reply(client, url) for _ in range(args.requests)]
+        ttft = [await first_token(client, url) for _ in range(args.requests)]
+        after = await mock_stats(client, mock_port)
+
+        await disconnect_mid_stream(port)
+        deadline = time.time() + args.tokens * args.token_delay + 5
+        while time.time() < deadline:
+            aborted = (await mock_stats(client, mock_port))["aborted"] - after["aborted"]
+            if aborted:
+                break
+            await asyncio.sleep(0.05)
+
+    print(f"{role:5s}  full reply p50 {np.median(full) * 1000:6.0f} ms   "
+          f"first token p50 {np.median(ttft) * 1000:5.0f} ms   "
+          f"upstream connections {after['connections'] - before['connections']:3d} "
+          f"for {2 * args.requests} requests   "
+          f"disconnect {'aborts upstream' if aborted else 'NOT propagated'}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--tokens", type=int, default=40)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--serve", choices=["mock", "wsgi", "asgi"])
+    parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+
+    if args.serve == "mock":
+        return serve_mock_llm(args.port, args.tokens, args.token_delay)
+    if args.serve == "wsgi":
+        return serve_wsgi(args.port)
+    if args.serve == "asgi":
+        return serve_asgi(args.port)
+
+    mock_port = free_port()
+    env = {
+        "GROQ_API_KEY": "bench",
+        "GROQ_API_URL": f"http://127.0.0.1:{mock_port}/v1/chat/completions",
+        "ANALYSIS_CACHE": "off",
+        # Every request must reach the upstream
+        "CHAT_CACHE": "off",
+    }
+    procs = [start("mock", mock_port, env, "--tokens", str(args.tokens),
+                   "--token-delay", str(args.token_delay))]
+    try:
+        print(f"{args.tokens} tokens, {args.token_delay * 1000:.0f} ms apart")
+        for role in ("wsgi", "asgi"):
+            port = free_port()
+            procs.append(start(role, port, env))
+            asyncio.run(run(role, port, mock_port, args))
+    finally:
+        for proc in procs:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    main()
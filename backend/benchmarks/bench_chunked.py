@@ -0,0 +1,58 @@
+"""
+Single-process vs. chunked parallel analysis of one long recording
+
+Checks that the merged metrics match the single pass and reports the
+speedup for each worker count.
+
+Usage:
+python benchmarks/bench_chunked.py <video_path> [--workers 2 4 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from analysis.worker_pool import AnalysisPool  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video_path")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    args = parser.parse_args()
+
+    single_pool = AnalysisPool(1)
+    try:
+        single_pool.analyze(args.video_path, "bench")  # warm-up
+        t0 = time.perf_counter()
+        single = single_pool.analyze(args.video_path, "bench")
+        single_sec = time.perf_counter() - t0
+    finally:
+        single_pool.shutdown()
+    print(f"single      {single_sec:8.2f}s  score={single['overall_score']}")
+
+    for workers in args.workers:
+        pool = AnalysisPool(workers)
+        try:
+            pool.analyze_chunked(args.video_path, "bench")  # warm-up
+            t0 = time.perf_counter()
+            chunked = pool.analyze_chunked(args.video_path, "bench")
+            elapsed = time.perf_counter() - t0
+        finally:
+            pool.shutdown()
+
+        worst = max(
+            abs(single["feature_vector"][k] - chunked["feature_vector"][k])
+            for k in single["feature_vector"]
+        )
+        print(
+            f"{workers:2d} workers  {elapsed:8.2f}s  speedup={single_sec / elapsed:5.2f}x  "
+            f"score={chunked['overall_score']}  max |Δfeature|={worst:.6f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Compiled (NumPy-only) model vs. the joblib pipeline
+
+Parity: predict_proba of the shipped compiled export must match the
+shipped scikit-learn pipeline on the training rows and --rows random
+feature vectors (probabilities and labels); exits non-zero otherwise.
+tests/test_compiled_model.py checks the same for freshly fitted binary,
+multinomial and liblinear one-vs-rest pipelines.
+
+Cost: each backend is measured in a fresh process (MODEL_BACKEND=joblib
+vs. compiled): time and RSS to import ml.inference and load the model,
+then per-prediction latency for single rows and a 10k batch.
+
+Usage:
+python benchmarks/bench_compiled_model.py [--rows 100000] [--seconds 1.0]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+MODEL = os.path.join(BACKEND_DIR, "models", "posture_model.joblib")
+COMPILED = os.path.join(BACKEND_DIR, "models", "posture_model.npz")
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+def parity(rows: int) -> bool:
+    import warnings
+
+    import joblib
+
+    from ml.build_dataset import load_dataset
+    from ml.compiled import CompiledModel
+
+    pipeline = joblib.load(MODEL)
+    compiled = CompiledModel.load(COMPILED)
+
+    rng = np.random.default_rng(0)
+    df = load_dataset()
+    X = np.vstack([
+        df[compiled.feature_columns].to_numpy(dtype=np.float64),
+        np.column_stack([rng.uniform(0, 90, rows), rng.uniform(0, 45, rows)]),
+        # Far outside the training range, where softmax saturates
+        rng.normal(0, 1e3, (1000, 2)),
+    ])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected = pipeline.predict_proba(X)
+        expected_labels = pipeline.predict(X)
+
+    got = compiled.predict_proba(X)
+    max_diff = float(np.abs(got - expected).max())
+    labels_ok = bool((compiled.predict(X) == expected_labels).all())
+    exact = float((got == expected).mean())
+    print(f"parity        {len(X)} rows: max |dp| {max_diff:.2e}, "
+          f"{exact * 100:.2f}% bit-identical, labels {'match' if labels_ok else 'DIFFER'}")
+    return labels_ok and max_diff <= 1e-12
+
+
+def child(seconds: float):
+    """One measurement in a clean process (backend chosen by MODEL_BACKEND)"""
+    base = rss_mb()
+    t0 = time.perf_counter()
+    from ml.inference import predict_posture, predict_posture_batch, registry
+
+    predict_posture({"head_dev_deg": 10.0, "torso_dev_deg": 2.0})
+    load_ms = (time.perf_counter() - t0) * 1000
+    loaded_rss = rss_mb() - base
+
+    def per_call_us(fn):
+        calls = 0
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 < seconds:
+            fn()
+            calls += 1
+        return (time.perf_counter() - t0) / calls * 1e6
+
+    fv = {"head_dev_deg": 12.0, "torso_dev_deg": 3.0}
+    X = np.random.default_rng(0).uniform(0, 45, (10000, 2))
+    print(json.dumps({
+        "backend": registry.stats()["backend"],
+        "load_ms": load_ms,
+        "rss_mb": loaded_rss,
+        "single_us": per_call_us(lambda: predict_posture(fv)),
+        "batch_us": per_call_us(lambda: predict_posture_batch(X)) / len(X),
+        "modules": [m for m in ("sklearn", "joblib", "pandas", "scipy") if m in sys.modules],
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--child", action="store_true")
+    args = parser.parse_args()
+
+    if args.child:
+        return child(args.seconds)
+
+    ok = parity(args.rows)
+
+    for backend in ("joblib", "compiled"):
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", "--seconds", str(args.seconds)],
+            env={**os.environ, "MODEL_BACKEND": backend},
+            cwd=BACKEND_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{r['backend']:9s} import+load {r['load_ms']:7.0f} ms   +{r['rss_mb']:5.1f} MB RSS   "
+              f"single {r['single_us']:7.1f} us   batch {r['batch_us']:6.3f} us/row   "
+              f"imports {', '.join(r['modules']) or 'numpy only'}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
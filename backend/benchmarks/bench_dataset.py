@@ -0,0 +1,127 @@
+"""
+Dataset builder: full scan vs. incremental rebuild
+
+Seeds a local S3 stand-in (moto) with --analyses analysis JSONs spread
+over --users users, then times
+  - the old approach: one serial GET and parse per analysis
+  - the first (full) incremental build
+  - a rebuild after --new new sessions and a rebuild with no changes
+
+moto handles one request at a time, so the parallel first build does not
+beat the serial scan here the way it does against S3.
+
+Usage:
+python benchmarks/bench_dataset.py [--analyses 5000] [--users 50] [--new 100]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BUCKET = "posture-dataset-bench"
+
+
+def fake_analysis(i: int) -> dict:
+    return {
+        "weak_label": ["Good", "Okay", "Bad"][i % 3],
+        "overall_score": i % 100,
+        "feature_vector": {
+            "head_dev_deg": (i * 7) % 45,
+            "torso_dev_deg": (i * 3) % 20,
+            "stability_std_dev_deg": 2.5,
+            "pose_coverage_sampled": 0.95,
+            "session_duration_sec": 60.0,
+        },
+        # Real analyses carry far more than the features
+        "metadata": {"padding": "x" * 2000},
+    }
+
+
+def put_analyses(s3, start: int, count: int, users: int):
+    def put(i):
+        s3.put_object(
+            Bucket=BUCKET,
+            Key=f"analysis/user{i % users}/{i:06d}.json",
+            Body=json.dumps(fake_analysis(i)).encode(),
+        )
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(put, range(start, start + count)))
+
+
+def serial_scan(s3, source) -> int:
+    """The old flow: every analysis fetched and parsed one after another"""
+    from ml.build_dataset import analysis_row
+
+    rows = 0
+    for key in source.list():
+        rows += analysis_row(source.read(key), key) is not None
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--analyses", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--new", type=int, default=100)
+    parser.add_argument("--port", type=int, default=5058)
+    args = parser.parse_args()
+
+    import logging
+
+    import boto3
+    from botocore.config import Config
+    from moto.server import ThreadedMotoServer
+
+    from ml.build_dataset import S3Analyses, build_dataset
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(port=args.port)
+    server.start()
+    try:
+        s3 = boto3.client(
+            "s3",
+            endpoint_url=f"http://127.0.0.1:{args.port}",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            config=Config(max_pool_connections=64),
+        )
+        s3.create_bucket(Bucket=BUCKET)
+        put_analyses(s3, 0, args.analyses, args.users)
+        source = S3Analyses(s3, BUCKET)
+
+        out = tempfile.mkdtemp(prefix="posture_dataset_")
+        paths = dict(
+            dataset_path=os.path.join(out, "dataset"),
+            manifest_path=os.path.join(out, "manifest.json"),
+        )
+
+        t0 = time.perf_counter()
+        rows = serial_scan(s3, source)
+        print(f"serial scan              {time.perf_counter() - t0:7.2f}s   {rows} rows")
+
+        stats = build_dataset(source, **paths)
+        print(f"first build (parallel)   {stats['total_sec']:7.2f}s   fetched {stats['fetched']}, "
+              f"{stats['rows']} rows")
+
+        put_analyses(s3, args.analyses, args.new, args.users)
+        stats = build_dataset(source, **paths)
+        print(f"+{args.new} new sessions        {stats['total_sec']:7.2f}s   fetched {stats['fetched']}, "
+              f"{stats['rows']} rows (listing {stats['list_sec']:.2f}s)")
+
+        stats = build_dataset(source, **paths)
+        print(f"no changes               {stats['total_sec']:7.2f}s   fetched {stats['fetched']}, "
+              f"{stats['rows']} rows")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
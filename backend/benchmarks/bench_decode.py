@@ -0,0 +1,95 @@
+"""
+Decode time per analyzed frame: full decode vs. sparse (grab / seek / downscale)
+
+Synthesizes 30/60 fps clips at 720p/1080p with cv2.VideoWriter and times
+the frame sources without pose inference, so only decode cost is measured.
+The seek variant only seeks when --rate leaves gaps of 2 or more frames.
+
+Usage:
+python benchmarks/bench_decode.py [--seconds 10] [--rate 2]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from analysis.frames import SerialFrames  # noqa: E402
+from analysis.sampling import FixedSampler  # noqa: E402
+
+
+def make_clip(path, width, height, fps, seconds):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    for i in range(int(fps * seconds)):
+        # Moving band so the encoder produces real inter frames
+        frame = np.roll(base, i * 4, axis=1)
+        writer.write(frame)
+    writer.release()
+
+
+def time_baseline(path, rate):
+    """Old path: cap.read() every frame, convert the sampled ones"""
+    cap = cv2.VideoCapture(path)
+    analyzed = 0
+    index = 0
+    t0 = time.perf_counter()
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        index += 1
+        if index % rate != 0:
+            continue
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        analyzed += 1
+    elapsed = time.perf_counter() - t0
+    cap.release()
+    return elapsed, analyzed
+
+
+def time_sparse(path, rate, max_side=0, seek_gap=0):
+    cap = cv2.VideoCapture(path)
+    frames = SerialFrames(cap, FixedSampler(rate), max_side=max_side, seek_gap=seek_gap)
+    t0 = time.perf_counter()
+    analyzed = sum(1 for _ in frames)
+    elapsed = time.perf_counter() - t0
+    cap.release()
+    return elapsed, analyzed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--rate", type=int, default=2)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="bench_decode_")
+    configs = [(1280, 720, 30), (1280, 720, 60), (1920, 1080, 30), (1920, 1080, 60)]
+    variants = [
+        ("read all (old)", lambda p: time_baseline(p, args.rate)),
+        ("grab skipped", lambda p: time_sparse(p, args.rate)),
+        ("grab + 640px", lambda p: time_sparse(p, args.rate, max_side=640)),
+        ("grab + 256px", lambda p: time_sparse(p, args.rate, max_side=256)),
+        ("seek gaps >= 2", lambda p: time_sparse(p, args.rate, seek_gap=2)),
+    ]
+
+    for width, height, fps in configs:
+        path = os.path.join(tmp, f"clip_{height}p{fps}.mp4")
+        make_clip(path, width, height, fps, args.seconds)
+        print(f"\n{height}p @ {fps} fps (every {args.rate} frames analyzed)")
+        for name, run in variants:
+            elapsed, analyzed = run(path)
+            per_frame_ms = 1000.0 * elapsed / max(1, analyzed)
+            print(f"  {name:16s} {per_frame_ms:7.2f} ms / analyzed frame  ({analyzed} frames)")
+
+
+if __name__ == "__main__":
+    main()
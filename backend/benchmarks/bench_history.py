@@ -0,0 +1,97 @@
+"""
+/api/history latency: serial listing + one GET per analysis vs. the index
+
+Seeds a local S3 stand-in (moto) with thousands of analyses for one
+user and times both paths.
+
+Usage:
+python benchmarks/bench_history.py [--analyses 3000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BUCKET = "posture-history-bench"
+USER = "bench-user"
+
+
+def legacy_history(s3):
+    """The old handler: first listing page only, one GET per analysis"""
+    resp = s3.list_objects_v2(Bucket=BUCKET, Prefix=f"analysis/{USER}/")
+    rows = []
+    for obj in resp.get("Contents", []):
+        analysis = json.loads(s3.get_object(Bucket=BUCKET, Key=obj["Key"])["Body"].read())
+        rows.append({"analysisKey": obj["Key"], "createdAt": analysis.get("created_at")})
+    rows.sort(key=lambda r: r["createdAt"] or "", reverse=True)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--analyses", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--port", type=int, default=5056)
+    args = parser.parse_args()
+
+    import boto3
+    from moto.server import ThreadedMotoServer
+
+    from history_index import HistoryIndex, summarize
+
+    server = ThreadedMotoServer(port=args.port)
+    server.start()
+    try:
+        s3 = boto3.client(
+            "s3",
+            endpoint_url=f"http://127.0.0.1:{args.port}",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        s3.create_bucket(Bucket=BUCKET)
+
+        index = HistoryIndex(s3, BUCKET)
+        rows = []
+        for i in range(args.analyses):
+            key = f"analysis/{USER}/{i:06d}.json"
+            analysis = {
+                "title": f"Session {i}",
+                "created_at": f"2026-01-01T00:00:{i % 60:02d}.{i:06d}",
+                "overall_score": i % 100,
+                "metrics": {"pose_coverage": 0.9},
+                "ml": {"label": "Good", "confidence": 0.8},
+            }
+            s3.put_object(Bucket=BUCKET, Key=key, Body=json.dumps(analysis).encode())
+            rows.append(summarize(analysis, key))
+
+        t0 = time.perf_counter()
+        index.rebuild(USER)
+        print(f"index rebuild (parallel GETs)   {time.perf_counter() - t0:8.3f}s")
+
+        t0 = time.perf_counter()
+        index.upsert(USER, rows[-1])
+        print(f"index upsert (one analysis)     {time.perf_counter() - t0:8.3f}s")
+
+        for name, fn in [
+            ("legacy N+1 (first page only)", lambda: legacy_history(s3)),
+            ("index, all rows", lambda: index.page(USER)),
+            ("index, page of 50", lambda: index.page(USER, limit=50)),
+        ]:
+            best = float("inf")
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                result = fn()
+                best = min(best, time.perf_counter() - t0)
+            count = len(result) if isinstance(result, list) else len(result[0])
+            print(f"{name:31s} {best:8.3f}s  ({count} rows)")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
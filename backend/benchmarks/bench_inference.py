@@ -0,0 +1,81 @@
+"""
+Per-prediction latency of the posture model
+
+Compares the old predict_posture (one-row DataFrame, predict and
+predict_proba separately) with the current single-row call and
+predict_posture_batch at several batch sizes, and checks they agree.
+
+Usage:
+python benchmarks/bench_inference.py [--sizes 1 100 10000] [--seconds 1.0]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def legacy_predict(model, feature_vector: dict):
+    """The old predict_posture body"""
+    import pandas as pd
+
+    columns = ["head_dev_deg", "torso_dev_deg"]
+    row = {col: feature_vector.get(col, 0.0) for col in columns}
+    features = pd.DataFrame([row], columns=columns)
+    label = model.predict(features)[0]
+    probs = model.predict_proba(features)[0]
+    return label, probs
+
+
+def per_call_us(fn, seconds: float) -> float:
+    """Mean wall time of fn() in microseconds, run for about `seconds`"""
+    fn()
+    calls = 0
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        fn()
+        calls += 1
+    return (time.perf_counter() - t0) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    import joblib
+
+    from ml.inference import predict_posture, predict_posture_batch
+
+    # The old path always ran the scikit-learn pipeline
+    model = joblib.load(os.path.join(BACKEND_DIR, "models", "posture_model.joblib"))
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(0, 45, max(args.sizes)), rng.uniform(0, 30, max(args.sizes))])
+    vectors = [{"head_dev_deg": h, "torso_dev_deg": t} for h, t in X[:200]]
+
+    # Same answers on every path
+    batch = predict_posture_batch(X[:200])
+    for i, fv in enumerate(vectors):
+        label, probs = legacy_predict(model, fv)
+        assert label == batch["labels"][i] == predict_posture(fv)["label"]
+        assert np.allclose(probs, batch["probabilities"][i])
+    print("parity        200 vectors agree with the old path")
+
+    legacy = per_call_us(lambda: legacy_predict(model, vectors[0]), args.seconds)
+    single = per_call_us(lambda: predict_posture(vectors[0]), args.seconds)
+    print(f"{'old predict_posture':28s} {legacy:9.1f} us / prediction")
+    print(f"{'predict_posture':28s} {single:9.1f} us / prediction   ({legacy / single:.1f}x)")
+
+    for n in args.sizes:
+        rows = X[:n]
+        us = per_call_us(lambda: predict_posture_batch(rows), args.seconds) / n
+        print(f"{f'predict_posture_batch n={n}':28s} {us:9.3f} us / prediction   ({legacy / us:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
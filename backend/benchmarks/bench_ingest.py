@@ -0,0 +1,107 @@
+"""
+Time-to-first-frame and job latency: full download vs. streaming ingest
+
+Uploads a recording to a local S3 stand-in (moto) and decodes it through
+both ingest paths. By default the "job" is a full decode of every frame
+so the numbers isolate ingest; pass --analyze to run the pose pipeline.
+
+Usage:
+python benchmarks/bench_ingest.py <video_path> [--analyze] [--part-mb 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BUCKET = "posture-ingest-bench"
+
+
+def decode_job(path):
+    """Returns (seconds to first frame, frames) for a plain decode pass"""
+    import cv2
+
+    t0 = time.perf_counter()
+    cap = cv2.VideoCapture(path)
+    first = None
+    frames = 0
+    while True:
+        ret, _ = cap.read()
+        if not ret:
+            break
+        if first is None:
+            first = time.perf_counter() - t0
+        frames += 1
+    cap.release()
+    return first or 0.0, frames
+
+
+def analyze_job(path):
+    from analysis.analyze_video import analyze_video
+
+    meta = analyze_video(path, "bench")["metadata"]
+    return meta["time_to_first_frame_sec"], meta["total_frames"]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video_path")
+    parser.add_argument("--analyze", action="store_true")
+    parser.add_argument("--part-mb", type=int, default=8)
+    parser.add_argument("--port", type=int, default=5057)
+    args = parser.parse_args()
+
+    import boto3
+    from moto.server import ThreadedMotoServer
+
+    import s3_stream
+    from s3_stream import VideoIngest
+
+    s3_stream.S3_DOWNLOAD_PART_BYTES = args.part_mb * 1024 * 1024
+
+    server = ThreadedMotoServer(port=args.port)
+    server.start()
+    try:
+        s3 = boto3.client(
+            "s3",
+            endpoint_url=f"http://127.0.0.1:{args.port}",
+            region_name="us-east-1",
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+        )
+        s3.create_bucket(Bucket=BUCKET)
+        key = "videos/bench/recording"
+        s3.upload_file(args.video_path, BUCKET, key)
+        size_mb = os.path.getsize(args.video_path) / 1e6
+
+        def job(path):
+            return analyze_job(path) if args.analyze else decode_job(path)
+
+        # Old path: download_file to a temp file, then analyze
+        local = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.video")
+        t0 = time.perf_counter()
+        s3.download_file(BUCKET, key, local)
+        downloaded = time.perf_counter() - t0
+        first, frames = job(local)
+        total = time.perf_counter() - t0
+        os.remove(local)
+        print(f"download then analyze  first frame {downloaded + first:7.3f}s  total {total:7.3f}s  ({frames} frames, {size_mb:.1f} MB)")
+
+        # New path: ranged parallel GETs, piped when the container allows it
+        t0 = time.perf_counter()
+        with VideoIngest(s3, BUCKET, key) as source:
+            ready = time.perf_counter() - t0
+            first, frames = job(source.path)
+        total = time.perf_counter() - t0
+        mode = "streaming" if source.streaming else "ranged download"
+        print(f"{mode:22s} first frame {ready + first:7.3f}s  total {total:7.3f}s  ({frames} frames)")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Live session update latency, and live vs. batch score agreement
+
+Streams synthetic landmark frames into a live session in small batches
+(as the browser would), reports per-update latency, then scores the
+final window through the batch aggregation and compares.
+
+Usage:
+python benchmarks/bench_live.py [--seconds 60] [--fps 30] [--batch 5] [--window 10]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from analysis.landmarks import (  # noqa: E402
+    LEFT_EAR,
+    LEFT_HIP,
+    LEFT_SHOULDER,
+    NUM_LANDMARKS,
+    RIGHT_HIP,
+    RIGHT_SHOULDER,
+)
+from analysis.posture_metrics import aggregate_landmarks, score_aggregates  # noqa: E402
+from live_sessions import LiveSessions  # noqa: E402
+
+
+def synthetic_frames(n, fps, seed=0):
+    """Seated player swaying slightly; ~10% of frames without a pose"""
+    rng = np.random.default_rng(seed)
+    lms = np.zeros((n, NUM_LANDMARKS, 4), dtype=np.float32)
+    lms[:, :, 3] = 1.0
+    sway = 0.01 * np.sin(np.arange(n) / fps)
+    lms[:, LEFT_EAR, :2] = np.column_stack([0.47 + sway, np.full(n, 0.30)])
+    lms[:, LEFT_SHOULDER, :2] = np.column_stack([0.45 + sway, np.full(n, 0.45)])
+    lms[:, RIGHT_SHOULDER, :2] = np.column_stack([0.55 + sway, np.full(n, 0.45)])
+    lms[:, LEFT_HIP, :2] = [0.46, 0.80]
+    lms[:, RIGHT_HIP, :2] = [0.54, 0.80]
+    lms[:, :, :2] += rng.normal(0, 0.002, (n, NUM_LANDMARKS, 2))
+    detected = rng.random(n) > 0.1
+    return lms, detected
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--fps", type=float, default=30)
+    parser.add_argument("--batch", type=int, default=5)
+    parser.add_argument("--window", type=float, default=10)
+    args = parser.parse_args()
+
+    n = int(args.seconds * args.fps)
+    lms, detected = synthetic_frames(n, args.fps)
+    frames = [
+        {"t": i / args.fps, "landmarks": lms[i].tolist() if detected[i] else None}
+        for i in range(n)
+    ]
+
+    sessions = LiveSessions()
+    session = sessions.create("bench-user", args.window)
+    latencies = []
+    for i in range(0, n, args.batch):
+        result = sessions.push(session, frames[i:i + args.batch])
+        latencies.append(result["latency_ms"])
+
+    # Batch path over exactly the frames in the final window
+    in_window = [i for i in range(n) if i / args.fps >= (n - 1) / args.fps - args.window]
+    window_lms = lms[[i for i in in_window if detected[i]]]
+    span = (in_window[-1] - in_window[0]) / args.fps
+    batch = score_aggregates({
+        **aggregate_landmarks(window_lms),
+        "fps": (len(in_window) - 1) / span,
+        "total_frames": len(in_window),
+        "sampled_frames": len(in_window),
+    })
+
+    lat = np.asarray(latencies)
+    print(f"frames        {n} in {len(lat)} updates of {args.batch}")
+    print(f"latency p50   {np.percentile(lat, 50):.3f} ms")
+    print(f"latency p99   {np.percentile(lat, 99):.3f} ms")
+    print(f"latency max   {lat.max():.3f} ms")
+    print(f"live score    {result['overall_score']} ({result['weak_label']})")
+    print(f"batch score   {batch['overall_score']} ({batch['weak_label']})")
+    print(f"summary       {sessions.close(session.id, 'bench-user')['overall_score']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Cost of the /metrics instrumentation
+
+Times, per call, Counter.inc, Histogram.observe and one StageTimer stage
+(the unit an analysis job pays ~10 times), single-threaded and with
+--threads threads recording into the same series, and the time to
+render a registry as large as the app's for one /metrics scrape.
+
+Usage:
+python benchmarks/bench_metrics.py [--seconds 1.0] [--threads 8]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from metrics import MetricsRegistry, StageTimer  # noqa: E402
+
+
+def per_call_ns(fn, seconds: float, threads: int = 1) -> float:
+    """Mean wall time per fn() call across `threads` threads, in ns"""
+    stop = threading.Event()
+    calls = [0] * threads
+
+    def worker(i):
+        n = 0
+        while not stop.is_set():
+            for _ in range(100):
+                fn()
+            n += 100
+        calls[i] = n
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    t0 = time.perf_counter()
+    for t in pool:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in pool:
+        t.join()
+    return (time.perf_counter() - t0) / sum(calls) * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    registry = MetricsRegistry()
+    counter = registry.counter("bench_total", "bench", ["stage"])
+    histogram = registry.histogram("bench_seconds", "bench", ["stage"])
+    timer = StageTimer()
+
+    def stage():
+        with timer.stage("bench"):
+            pass
+
+    cases = [
+        ("Counter.inc", lambda: counter.inc(stage="x")),
+        ("Histogram.observe", lambda: histogram.observe(0.3, stage="x")),
+        ("StageTimer.stage", stage),
+    ]
+    for name, fn in cases:
+        single = per_call_ns(fn, args.seconds)
+        contended = per_call_ns(fn, args.seconds, args.threads)
+        print(f"{name:20s} {single:7.0f} ns / call   {contended:7.0f} ns / call with {args.threads} threads")
+
+    # About what the app exposes: 10 stages, 2 outcomes, chat modes
+    for i in range(10):
+        histogram.observe(1.0, stage=f"s{i}")
+        counter.inc(stage=f"s{i}")
+    t0 = time.perf_counter()
+    for _ in range(100):
+        text = registry.render()
+    ms = (time.perf_counter() - t0) / 100 * 1000
+    print(f"{'render':20s} {ms:7.3f} ms / scrape ({len(text.splitlines())} lines)")
+
+
+if __name__ == "__main__":
+    main()
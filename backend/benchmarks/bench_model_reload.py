@@ -0,0 +1,123 @@
+"""
+Hot model swap under load
+
+Runs --threads threads calling predict_posture in a loop against a
+temporary model directory, publishes a new version and then a shadow
+version mid-run, and reports
+  - prediction latency percentiles before and around the swaps
+  - how long after publishing the new version was serving
+  - failed predictions (should be 0) and shadow disagreement stats
+
+Usage:
+python benchmarks/bench_model_reload.py [--threads 8] [--seconds 6] [--check-sec 0.5]
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def train(seed: int):
+    """A small stand-in model on jittered copies of the shipped dataset"""
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    from ml.build_dataset import load_dataset
+
+    df = load_dataset()
+    rng = np.random.default_rng(seed)
+    X = df[["head_dev_deg", "torso_dev_deg"]]
+    X = X + rng.normal(0, 4.0, X.shape)
+    model = Pipeline([("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=2000))])
+    model.fit(X, df["label"])
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=6.0)
+    parser.add_argument("--check-sec", type=float, default=0.5)
+    args = parser.parse_args()
+
+    models_dir = tempfile.mkdtemp(prefix="posture_models_")
+    shutil.copy(os.path.join(BACKEND_DIR, "models", "posture_model.joblib"), models_dir)
+    os.environ["MODEL_DIR"] = models_dir
+    os.environ["MODEL_RELOAD_SEC"] = str(args.check_sec)
+
+    from ml import inference
+    from ml.registry import publish
+
+    rng = np.random.default_rng(0)
+    vectors = [
+        {"head_dev_deg": float(h), "torso_dev_deg": float(t)}
+        for h, t in zip(rng.uniform(0, 45, 1000), rng.uniform(0, 20, 1000))
+    ]
+
+    # First load (and sklearn import) outside the measurement
+    inference.predict_posture(vectors[0])
+
+    samples = []  # (t, latency, version)
+    failures = []
+    stop = threading.Event()
+
+    def worker(offset):
+        i = offset
+        while not stop.is_set():
+            t0 = time.perf_counter()
+            try:
+                out = inference.predict_posture(vectors[i % len(vectors)])
+            except Exception as e:
+                failures.append(repr(e))
+                continue
+            samples.append((t0, time.perf_counter() - t0, out["model_version"]))
+            i += 1
+
+    threads = [threading.Thread(target=worker, args=(k * 97,)) for k in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+
+    third = args.seconds / 3
+    time.sleep(third)
+    published_at = time.perf_counter()
+    version = publish(train(1), ["head_dev_deg", "torso_dev_deg"], "0" * 64, {"bench": True})
+    time.sleep(third)
+    shadow = publish(train(2), ["head_dev_deg", "torso_dev_deg"], "1" * 64, {"bench": True}, role="shadow")
+    time.sleep(third)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    def pct(rows):
+        lat = np.asarray([r[1] for r in rows]) * 1e6
+        return f"p50 {np.percentile(lat, 50):7.0f} us   p99 {np.percentile(lat, 99):7.0f} us   n={len(lat)}"
+
+    before = [s for s in samples if s[0] < published_at]
+    around = [s for s in samples if published_at <= s[0] < published_at + args.check_sec + 0.5]
+    first_new = min((s[0] for s in samples if s[2] == version), default=None)
+
+    print(f"{args.threads} threads, reload check every {args.check_sec}s")
+    print(f"before swap    {pct(before)}")
+    print(f"around swap    {pct(around)}")
+    if first_new is not None:
+        print(f"new version    {version} serving {first_new - published_at:.2f}s after publish")
+    print(f"failures       {len(failures)}")
+    stats = inference.registry.stats()
+    print(f"shadow         {shadow}: {stats['shadow_scored']} scored, "
+          f"disagreement rate {stats['shadow_disagreement_rate']:.3f}")
+    print(f"reloads        {stats['reloads']} (wall {time.perf_counter() - start:.1f}s)")
+    shutil.rmtree(models_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
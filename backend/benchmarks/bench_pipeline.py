@@ -0,0 +1,42 @@
+"""
+Frames per second of the serial vs. pipelined analysis modes on one clip
+
+Usage:
+python benchmarks/bench_pipeline.py <video_path> [--repeat 3]
+"""
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from analysis.analyze_video import analyze_video, create_pose  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video_path")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    pose = create_pose()
+    try:
+        for mode in ("serial", "pipelined"):
+            # Warm-up run so both modes see a hot file cache and graph
+            analyze_video(args.video_path, "bench", pose=pose, mode=mode)
+            best = None
+            for _ in range(args.repeat):
+                meta = analyze_video(args.video_path, "bench", pose=pose, mode=mode)["metadata"]
+                if best is None or meta["processing_fps"] > best["processing_fps"]:
+                    best = meta
+            print(
+                f"{mode:10s} {best['processing_fps']:8.2f} fps  "
+                f"({best['total_frames']} frames in {best['processing_sec']:.2f}s)"
+            )
+    finally:
+        pose.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Presigned URLs and S3 client reuse
+
+Against a local S3 stand-in (moto), times
+  - building a boto3 client per request (the old delete_video) vs. the
+    shared client
+  - rendering a history grid: one /api/download-url per key, cold and
+    warm (URL cache), vs. a single /api/download-urls batch
+
+Every /api/download-url call is also a browser round-trip, which this
+in-process test client does not pay; the request counts show that part.
+
+Usage:
+python benchmarks/bench_presign.py [--items 60] [--repeat 20]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+BUCKET = "posture-presign-bench"
+USER = "bench-user"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--port", type=int, default=5057)
+    args = parser.parse_args()
+
+    from moto.server import ThreadedMotoServer
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = ThreadedMotoServer(port=args.port)
+    server.start()
+
+    # Point boto3 (and therefore app.py) at the local stand-in
+    os.environ["AWS_ENDPOINT_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ["AWS_BUCKET_NAME"] = BUCKET
+
+    import boto3
+
+    import app as app_module
+
+    try:
+        app_module.s3.create_bucket(Bucket=BUCKET)
+        client = app_module.app.test_client()
+
+        # ---------- client construction ----------
+        t0 = time.perf_counter()
+        for _ in range(args.repeat):
+            boto3.client("s3")
+        per_client = (time.perf_counter() - t0) / args.repeat * 1000
+        print(f"boto3.client per request        {per_client:8.2f} ms (now paid once per process)")
+
+        for i in range(args.repeat):
+            app_module.s3.put_object(Bucket=BUCKET, Key=f"videos/{USER}/v{i}.mp4", Body=b"x")
+        t0 = time.perf_counter()
+        for i in range(args.repeat):
+            resp = client.post("/api/delete-video", json={"userId": USER, "videoId": f"v{i}"})
+            assert resp.status_code == 200, resp.get_json()
+        print(f"/api/delete-video (shared)      {(time.perf_counter() - t0) / args.repeat * 1000:8.2f} ms")
+
+        # ---------- history grid ----------
+        keys = []
+        for i in range(args.items // 2):
+            keys += [f"videos/{USER}/{i:04d}_clip.mp4", f"analysis/{USER}/{i:04d}.json"]
+
+        def per_key():
+            for key in keys:
+                resp = client.post("/api/download-url", json={"userId": USER, "key": key})
+                assert "downloadUrl" in resp.get_json()
+
+        def batch():
+            resp = client.post("/api/download-urls", json={"userId": USER, "keys": keys})
+            assert len(resp.get_json()["urls"]) == len(keys)
+
+        app_module.presigned_urls.entries.clear()
+        for name, fn, requests in [
+            ("per-key, cold cache", per_key, len(keys)),
+            ("per-key, warm cache", per_key, len(keys)),
+            ("batch, warm cache", batch, 1),
+        ]:
+            t0 = time.perf_counter()
+            fn()
+            print(f"grid {name:22s}    {(time.perf_counter() - t0) * 1000:8.2f} ms   "
+                  f"{requests:3d} requests for {len(keys)} URLs")
+
+        app_module.presigned_urls.entries.clear()
+        t0 = time.perf_counter()
+        batch()
+        print(f"grid {'batch, cold cache':22s}    {(time.perf_counter() - t0) * 1000:8.2f} ms   "
+              f"  1 requests for {len(keys)} URLs")
+        print(f"url cache                       {app_module.presigned_urls.stats()}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Accuracy vs. speed of adaptive sampling against the fixed-rate baseline
+
+The stored sample analyses in data/analyses only keep aggregates, so
+this runs on the source recordings: each clip is analyzed with both
+samplers and the adaptive metrics are compared to the fixed-rate ones.
+
+Usage:
+python benchmarks/bench_sampling.py <video_path> [<video_path> ...]
+"""
+import argparse
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from analysis.analyze_video import analyze_video, create_pose  # noqa: E402
+
+COMPARED_METRICS = [
+    "head_dev_deg",
+    "torso_dev_deg",
+    "stability_std_dev_deg",
+    "pose_coverage_sampled",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video_paths", nargs="+")
+    args = parser.parse_args()
+
+    pose = create_pose()
+    try:
+        for path in args.video_paths:
+            fixed = analyze_video(path, "bench", pose=pose, sampling="fixed")
+            adaptive = analyze_video(path, "bench", pose=pose, sampling="adaptive")
+
+            f_meta, a_meta = fixed["metadata"], adaptive["metadata"]
+            print(f"\n{os.path.basename(path)}")
+            print(
+                f"  inferences  fixed={f_meta['sampled_frames']:6d}  "
+                f"adaptive={a_meta['sampled_frames']:6d}  "
+                f"({a_meta['sampled_frames'] / max(1, f_meta['sampled_frames']):.0%})"
+            )
+            print(
+                f"  time        fixed={f_meta['processing_sec']:6.2f}s "
+                f"adaptive={a_meta['processing_sec']:6.2f}s"
+            )
+            print(
+                f"  score       fixed={fixed['overall_score']:6d}  "
+                f"adaptive={adaptive['overall_score']:6d}  "
+                f"label {fixed['weak_label']} -> {adaptive['weak_label']}"
+            )
+            for key in COMPARED_METRICS:
+                f_val, a_val = fixed["metrics"][key], adaptive["metrics"][key]
+                print(f"  {key:24s} {f_val:8.3f} -> {a_val:8.3f}  (|Δ|={abs(f_val - a_val):.3f})")
+            print(f"  decisions   {a_meta['sampler']['decisions']}")
+    finally:
+        pose.close()
+
+
+if __name__ == "__main__":
+    main()
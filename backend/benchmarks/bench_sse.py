@@ -0,0 +1,114 @@
+"""
+Holds thousands of idle SSE connections against /api/analysis-events
+
+Serves the real Flask app from a threaded WSGI server in this process,
+opens --connections streams spread over users (several tabs each),
+then reports memory per connection, fan-out latency of one event per
+user to every tab, and how quickly closed streams are cleaned up.
+
+Usage:
+python benchmarks/bench_sse.py [--connections 5000] [--tabs 4] [--keepalive 15]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024.0
+    return 0.0
+
+
+async def open_stream(port: int, user: str):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /api/analysis-events/{user} HTTP/1.1\r\nHost: bench\r\n"
+        "Accept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    # Headers plus the initial "retry:" line
+    await reader.readuntil(b"retry: 3000\n\n")
+    return reader, writer
+
+
+async def wait_for_event(reader):
+    await reader.readuntil(b"data: ")
+    await reader.readuntil(b"\n\n")
+
+
+async def run(args, port, app_module):
+    users = [f"bench-{i}" for i in range((args.connections + args.tabs - 1) // args.tabs)]
+    base_rss = rss_mb()
+
+    t0 = time.perf_counter()
+    streams = []
+    for start in range(0, args.connections, 200):
+        batch = [
+            open_stream(port, users[i // args.tabs])
+            for i in range(start, min(start + 200, args.connections))
+        ]
+        streams.extend(await asyncio.gather(*batch))
+    connect_sec = time.perf_counter() - t0
+
+    await asyncio.sleep(1)
+    held_rss = rss_mb()
+    stats = app_module.analysis_events.stats()
+    print(f"connections   {len(streams)} ({len(users)} users x {args.tabs} tabs) in {connect_sec:.1f}s")
+    print(f"threads       {threading.active_count()}")
+    print(f"rss           {base_rss:.0f} MB -> {held_rss:.0f} MB "
+          f"({(held_rss - base_rss) * 1024 / len(streams):.1f} KB per connection)")
+    print(f"subscribers   {stats['subscribers']}")
+
+    # One event per user, must reach every tab
+    t0 = time.perf_counter()
+    for user in users:
+        app_module.analysis_events.publish(user, {"type": "bench"})
+    await asyncio.gather(*(wait_for_event(r) for r, _ in streams))
+    print(f"fan-out       {len(users)} events to {len(streams)} streams in "
+          f"{(time.perf_counter() - t0) * 1000:.0f} ms")
+
+    # Heartbeats keep idle streams alive and surface closed ones
+    for _, writer in streams:
+        writer.close()
+    t0 = time.perf_counter()
+    while app_module.analysis_events.stats()["subscribers"] and time.perf_counter() - t0 < args.keepalive * 5:
+        await asyncio.sleep(0.2)
+    left = app_module.analysis_events.stats()["subscribers"]
+    print(f"cleanup       {left} subscribers left {time.perf_counter() - t0:.1f}s after disconnect")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--tabs", type=int, default=4)
+    parser.add_argument("--keepalive", type=float, default=15.0)
+    args = parser.parse_args()
+
+    os.environ["SSE_KEEPALIVE_SEC"] = str(args.keepalive)
+    # Idle SSE threads only need a small stack
+    threading.stack_size(256 * 1024)
+
+    import app as app_module
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    from werkzeug.serving import make_server
+
+    server = make_server("127.0.0.1", 0, app_module.app, threaded=True)
+    server.socket.listen(1024)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    asyncio.run(run(args, server.port, app_module))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
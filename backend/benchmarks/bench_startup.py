@@ -0,0 +1,89 @@
+"""
+Cold-start import cost of the serving entry points
+
+Imports each module in a fresh interpreter with `python -X importtime`
+and reports
+  - the module's cumulative import time (median of --runs processes)
+  - its most expensive direct imports
+  - which heavy dependencies got imported at all (they should only load
+    on first use: boto3 with the first S3 call, requests with the first
+    chat, NumPy with the first prediction or live session, cv2 and
+    mediapipe in analysis workers)
+
+Usage:
+python benchmarks/bench_startup.py [--modules app analysis.analyze_video] [--runs 5] [--top 12]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["boto3", "botocore", "requests", "numpy", "pandas", "sklearn", "joblib", "cv2", "mediapipe"]
+
+
+def import_profile(module: str) -> list:
+    """
+    (self_us, cumulative_us, depth, name) for every import done by `import module`
+
+    Depth 0 is the module itself; interpreter startup (site, encodings)
+    is not included.
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(self_us), int(cum_us), depth, name.strip()))
+
+    # Rows are printed as imports finish, so the module's own row follows
+    # everything it imported
+    end = max(i for i, r in enumerate(rows) if r[2] == 0 and r[3] == module)
+    begin = end
+    while begin > 0 and rows[begin - 1][2] > 0:
+        begin -= 1
+    return rows[begin:end + 1]
+
+
+def import_ms(rows: list) -> float:
+    """Cumulative import time of the profiled module, in ms"""
+    return rows[-1][1] / 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--modules", nargs="+", default=["app", "analysis.analyze_video"])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        totals = sorted(import_ms(p) for p in profiles)
+        rows = profiles[-1]
+        names = {r[3] for r in rows}
+
+        print(f"import {module}: median {statistics.median(totals):.0f} ms "
+              f"(min {totals[0]:.0f}, max {totals[-1]:.0f}, {args.runs} runs)")
+
+        direct = sorted((r for r in rows if r[2] == 1), key=lambda r: -r[1])[:args.top]
+        for _, cum, _, name in direct:
+            print(f"  {cum / 1000.0:8.1f} ms  {name}")
+
+        loaded = [m for m in HEAVY_MODULES if m in names]
+        print(f"  heavy deps imported: {', '.join(loaded) or 'none'}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-job wall time: one subprocess per video vs. the warm AnalysisPool
+
+Usage:
+python benchmarks/bench_worker_pool.py <video_path> [--jobs 5] [--workers 2]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from analysis.worker_pool import AnalysisPool  # noqa: E402
+
+
+def bench_subprocess(video_path, jobs):
+    script_path = os.path.join(BACKEND_DIR, "analysis", "analyze_video.py")
+    out_json = os.path.join(tempfile.gettempdir(), "bench_worker_pool.json")
+    times = []
+    for _ in range(jobs):
+        t0 = time.perf_counter()
+        subprocess.run(
+            [sys.executable, script_path, video_path, "bench", out_json],
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def bench_pool(video_path, jobs, workers):
+    pool = AnalysisPool(workers)
+    try:
+        # Warm-up: spawns the workers and builds their Pose graphs
+        pool.analyze(video_path, "bench")
+        times = []
+        for _ in range(jobs):
+            t0 = time.perf_counter()
+            pool.analyze(video_path, "bench")
+            times.append(time.perf_counter() - t0)
+        return times
+    finally:
+        pool.shutdown()
+
+
+def report(name, times):
+    times = sorted(times)
+    mean = sum(times) / len(times)
+    print(f"{name:12s} mean={mean:.3f}s  min={times[0]:.3f}s  max={times[-1]:.3f}s")
+    return mean
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video_path")
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    sub = report("subprocess", bench_subprocess(args.video_path, args.jobs))
+    warm = report("warm pool", bench_pool(args.video_path, args.jobs, args.workers))
+    print(f"saved per job: {sub - warm:.3f}s ({sub / warm:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Startup regression check for `import app`
+
+Fails (exit 1) when
+  - the median cumulative import time of `app` over --runs fresh
+    interpreters exceeds the budget (--budget-ms, or APP_IMPORT_BUDGET_MS)
+  - any of the deferred heavy dependencies is imported by `import app`
+    (those should only load on first use, see lazy.py)
+
+The budget is wall time on the machine running the check, so set it for
+the CI / deploy host; the dependency check holds anywhere and also runs
+with the test suite (tests/test_startup.py).
+
+Usage:
+python benchmarks/check_startup.py [--budget-ms 500] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_startup import HEAVY_MODULES, import_ms, import_profile  # noqa: E402
+
+APP_IMPORT_BUDGET_MS = float(os.getenv("APP_IMPORT_BUDGET_MS", "500"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=APP_IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    profiles = [import_profile("app") for _ in range(args.runs)]
+    median = statistics.median(import_ms(p) for p in profiles)
+    loaded = sorted({r[3] for p in profiles for r in p if r[3] in HEAVY_MODULES})
+
+    ok = True
+    if median > args.budget_ms:
+        print(f"FAIL  import app: median {median:.0f} ms over the {args.budget_ms:.0f} ms budget")
+        ok = False
+    else:
+        print(f"ok    import app: median {median:.0f} ms (budget {args.budget_ms:.0f} ms)")
+
+    if loaded:
+        print(f"FAIL  import app loads deferred dependencies: {', '.join(loaded)}")
+        ok = False
+    else:
+        print("ok    no deferred dependencies imported")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Load test for /api/analyze-after-upload against a local S3 stand-in (moto)
+
+Fires a burst of uploads from several users, polls job status until
+every job finishes and reports throughput and completion latency.
+
+Usage:
+python benchmarks/load_test_analyze.py <video_path> [--requests 50] [--users 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    idx = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[idx]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("video_path")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--port", type=int, default=5055)
+    args = parser.parse_args()
+
+    from moto.server import ThreadedMotoServer
+
+    server = ThreadedMotoServer(port=args.port)
+    server.start()
+
+    # Point boto3 (and therefore app.py) at the local stand-in
+    os.environ["AWS_ENDPOINT_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+    os.environ.setdefault("AWS_REGION", "us-east-1")
+    os.environ["AWS_BUCKET_NAME"] = "posture-load-test"
+
+    import app as app_module
+
+    s3 = app_module.s3
+    s3.create_bucket(Bucket="posture-load-test")
+
+    keys = []
+    for i in range(args.requests):
+        user_id = f"user{i % args.users}"
+        key = f"videos/{user_id}/job{i}_clip.mp4"
+        s3.upload_file(args.video_path, "posture-load-test", key)
+        keys.append((user_id, key))
+
+    client = app_module.app.test_client()
+    submitted = {}
+    rejected = 0
+    t0 = time.perf_counter()
+    for user_id, key in keys:
+        resp = client.post("/api/analyze-after-upload", json={
+            "userId": user_id,
+            "s3Key": key,
+            "instrument": "Piano",
+        })
+        if resp.status_code == 429:
+            rejected += 1
+            continue
+        submitted[resp.get_json()["jobId"]] = (user_id, time.perf_counter())
+
+    latencies = []
+    failed = 0
+    pending = set(submitted)
+    while pending:
+        time.sleep(0.1)
+        for job_id in list(pending):
+            user_id, started = submitted[job_id]
+            status = client.get(f"/api/analysis-jobs/{job_id}?userId={user_id}").get_json()
+            if status["status"] in ("done", "failed"):
+                pending.discard(job_id)
+                failed += status["status"] == "failed"
+                latencies.append(time.perf_counter() - started)
+    elapsed = time.perf_counter() - t0
+
+    server.stop()
+
+    print(f"submitted={len(submitted)} rejected(429)={rejected} failed={failed}")
+    if latencies:
+        print(f"throughput={len(latencies) / elapsed:.2f} jobs/s")
+        print(f"p50={percentile(latencies, 50):.2f}s p95={percentile(latencies, 95):.2f}s")
+
+
+if __name__ == "__main__":
+    main()
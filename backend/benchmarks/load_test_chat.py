@@ -0,0 +1,194 @@
+"""
+/api/chat under load: sync Flask workers vs. the async (ASGI) path
+
+Starts a local mock LLM that answers after --llm-delay seconds, then
+drives the same chat requests through
+  - the Flask app on a WSGI server with --threads worker threads
+    (like gunicorn --threads), using requests.post per call
+  - asgi:app on uvicorn, using the pooled async HTTP client
+and reports requests/sec and latency percentiles for both.
+
+Usage:
+python benchmarks/load_test_chat.py [--requests 2000] [--concurrency 200] [--threads 16] [--llm-delay 0.5]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+# ============================================================
+# Servers (each runs in its own process)
+# ============================================================
+
+def serve_mock_llm(port: int, delay: float):
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    async def completions(request):
+        body = await request.json()
+        await asyncio.sleep(delay)
+        return JSONResponse({
+            "choices": [{"message": {"role": "assistant", "content": f"echo {len(body['messages'])}"}}],
+        })
+
+    app = Starlette(routes=[Route("/v1/chat/completions", completions, methods=["POST"])])
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="error", backlog=4096)
+
+
+def serve_wsgi(port: int, threads: int):
+    """Flask app on a fixed-size thread pool, like a sync gunicorn worker"""
+    import logging
+    from concurrent.futures import ThreadPoolExecutor
+
+    from werkzeug.serving import BaseWSGIServer
+
+    import app as wsgi
+
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    class PoolServer(BaseWSGIServer):
+        request_queue_size = 4096
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.pool = ThreadPoolExecutor(max_workers=threads)
+
+        def process_request(self, request, client_address):
+            self.pool.submit(self._handle, request, client_address)
+
+        def _handle(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    PoolServer("127.0.0.1", port, wsgi.app).serve_forever()
+
+
+def serve_asgi(port: int):
+    import uvicorn
+
+    uvicorn.run("asgi:app", host="127.0.0.1", port=port, log_level="error", backlog=4096)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(role: str, port: int, env: dict, *extra) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", role, "--port", str(port), *extra],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return proc
+        except OSError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{role} server did not start")
+
+
+# ============================================================
+# Load generator
+# ============================================================
+
+async def drive(port: int, total: int, concurrency: int, timeout: float):
+    import aiohttp
+
+    latencies = []
+    errors = 0
+    body = {"messages": [{"role": "user", "content": "How should I sit at the piano?"}]}
+
+    async with aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=concurrency),
+        timeout=aiohttp.ClientTimeout(total=timeout),
+    ) as client:
+        async def one():
+            nonlocal errors
+            t0 = time.perf_counter()
+            try:
+                async with client.post(f"http://127.0.0.1:{port}/api/chat", json=body) as r:
+                    ok = r.status == 200 and "reply" in await r.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                ok = False
+            latencies.append(time.perf_counter() - t0)
+            errors += not ok
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        wall = time.perf_counter() - t0
+
+    lat = np.asarray(latencies) * 1000.0
+    return {
+        "rps": total / wall,
+        "p50": np.percentile(lat, 50),
+        "p95": np.percentile(lat, 95),
+        "p99": np.percentile(lat, 99),
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--llm-delay", type=float, default=0.5)
+    parser.add_argument("--serve", choices=["mock", "wsgi", "asgi"])
+    parser.add_argument("--port", type=int)
+    args = parser.parse_args()
+
+    if args.serve == "mock":
+        return serve_mock_llm(args.port, args.llm_delay)
+    if args.serve == "wsgi":
+        return serve_wsgi(args.port, args.threads)
+    if args.serve == "asgi":
+        return serve_asgi(args.port)
+
+    mock_port = free_port()
+    env = {
+        "GROQ_API_KEY": "bench",
+        "GROQ_API_URL": f"http://127.0.0.1:{mock_port}/v1/chat/completions",
+        "ANALYSIS_CACHE": "off",
+        # Every request must reach the upstream
+        "CHAT_CACHE": "off",
+        "WSGI_THREADS": str(args.threads),
+    }
+    procs = [start("mock", mock_port, env, "--llm-delay", str(args.llm_delay))]
+    try:
+        print(f"{args.requests} requests, concurrency {args.concurrency}, "
+              f"LLM delay {args.llm_delay * 1000:.0f} ms, {args.threads} WSGI threads")
+        for role in ("wsgi", "asgi"):
+            port = free_port()
+            procs.append(start(role, port, env, "--threads", str(args.threads)))
+            # Warm up connections and imports
+            asyncio.run(drive(port, min(50, args.requests), 10, 60))
+            r = asyncio.run(drive(port, args.requests, args.concurrency, 120))
+            print(f"{role:5s}  {r['rps']:7.1f} req/s   p50 {r['p50']:7.0f} ms   "
+                  f"p95 {r['p95']:7.0f} ms   p99 {r['p99']:7.0f} ms   errors {r['errors']}")
+    finally:
+        for proc in procs:
+            proc.kill()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import json
+import os
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# Groq-compatible OpenAI chat completions endpoint (overridable for
+# self-hosted models and local mocks)
+GROQ_API_URL = os.getenv("GROQ_API_URL", "https://api.groq.com/openai/v1/chat/completions")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+
+# Upstream timeout for one chat completion
+CHAT_TIMEOUT_SEC = float(os.getenv("CHAT_TIMEOUT_SEC", "30"))
+
+# Keep-alive connections held open to the upstream
+CHAT_MAX_CONNECTIONS = int(os.getenv("CHAT_MAX_CONNECTIONS", "100"))
+
+
+class ChatError(Exception):
+    """Chat request that should be answered with `status` and `body`"""
+
+    def __init__(self, status: int, body: dict):
+        super().__init__(body.get("error"))
+        self.status = status
+        self.body = body
+
+
+# ============================================================
+# Request / response (shared by the WSGI and ASGI routes)
+# ============================================================
+
+def chat_request(api_key: str, data: dict):
+    """
+    Validates a /api/chat body and returns (headers, payload) for the upstream call
+
+    Raises ChatError with the response the route should send otherwise.
+    """
+    if not api_key:
+        raise ChatError(500, {"error": "Missing GROQ_API_KEY in backend .env"})
+
+    messages = data.get("messages")
+    if not isinstance(messages, list) or len(messages) == 0:
+        raise ChatError(400, {"error": "messages must be a non-empty list"})
+
+    headers = {
+        "Authorization": f"Bearer {api_key}",
+        "Content-Type": "application/json",
+    }
+    payload = {
+        "model": GROQ_MODEL,
+        "messages": messages,
+        "temperature": 0.4,
+    }
+    if data.get("stream") is True:
+        payload["stream"] = True
+    return headers, payload
+
+
+def upstream_failed(text: str) -> ChatError:
+    """Error for a non-2xx upstream response"""
+    return ChatError(500, {"error": "Groq request failed", "details": text})
+
+
+def chat_reply(out: dict) -> dict:
+    """Extracts the generated message from an upstream completion"""
+    return {"reply": out["choices"][0]["message"]["content"]}
+
+
+def create_chat_session():
+    """
+    Pooled session for the sync route
+
+    Reuses TCP/TLS connections to the upstream across requests instead
+    of a fresh handshake per requests.post.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=CHAT_MAX_CONNECTIONS)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+# ============================================================
+# Streaming (stream: true)
+# ============================================================
+#
+# The upstream answers with OpenAI-style SSE ("data: {chunk}" lines,
+# terminated by "data: [DONE]"). The browser gets one event per token
+# batch, {"delta": "..."}, then {"done": true}, or {"error": ...} if the
+# upstream fails partway.
+
+def stream_delta(line):
+    """
+    Content delta carried by one upstream SSE line
+
+    Returns "" for lines without content (role headers, comments,
+    keep-alives) and None once the stream is done.
+    """
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    line = line.strip()
+    if not line.startswith("data:"):
+        return ""
+    data = line[5:].strip()
+    if data == "[DONE]":
+        return None
+
+    chunk = json.loads(data)
+    choices = chunk.get("choices") or [{}]
+    return choices[0].get("delta", {}).get("content") or ""
+
+
+def sse_event(body: dict) -> str:
+    return f"data: {json.dumps(body)}\n\n"
+
+
+def replay_events(reply: str) -> list:
+    """A complete (e.g. cached) reply as the events of a finished stream"""
+    return [sse_event({"delta": reply}), sse_event({"done": True})]
+
+
+STREAM_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",
+}
@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# "memory" or "off"
+CHAT_CACHE = os.getenv("CHAT_CACHE", "memory")
+
+# How long a cached reply may be served
+CHAT_CACHE_TTL_SEC = float(os.getenv("CHAT_CACHE_TTL_SEC", "3600"))
+
+# Total size of cached replies before least recently used ones are evicted
+CHAT_CACHE_MAX_BYTES = int(os.getenv("CHAT_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Rough per-entry bookkeeping (key, OrderedDict node, tuple) counted
+# against max_bytes on top of the reply itself
+ENTRY_OVERHEAD_BYTES = 256
+
+
+# ============================================================
+# Keys
+# ============================================================
+
+def _normalize(text) -> str:
+    return " ".join(str(text).split())
+
+
+def chat_cache_key(payload: dict) -> str:
+    """
+    Exact-match key for an upstream chat payload
+
+    Whitespace in roles and contents is collapsed so trivially different
+    spellings of the same prompt share an entry; model and temperature
+    are part of the key. Streaming is not: a cached reply can be sent
+    either way.
+    """
+    messages = [
+        {"role": _normalize(m.get("role", "")), "content": _normalize(m.get("content", ""))}
+        if isinstance(m, dict) else _normalize(m)
+        for m in payload.get("messages", [])
+    ]
+    blob = json.dumps(
+        {
+            "model": payload.get("model"),
+            "temperature": payload.get("temperature"),
+            "messages": messages,
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# ============================================================
+# Cache
+# ============================================================
+
+class _Flight:
+    """One upstream call that identical concurrent requests wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.reply = None
+        self.error = None
+        # Requests waiting on this call, and the async ones among them
+        self.joined = 0
+        self.waiters = []  # (loop, future)
+
+
+class ChatCache:
+    """
+    In-memory exact-match cache of chat replies
+
+    Entries expire after `ttl_sec`; past `max_bytes` the least recently
+    used ones are evicted. fetch() / fetch_async() also coalesce
+    identical requests that are already in flight into a single
+    upstream call (singleflight), from threads and the event loop alike.
+    """
+
+    def __init__(self, ttl_sec: float = CHAT_CACHE_TTL_SEC, max_bytes: int = CHAT_CACHE_MAX_BYTES):
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (expires_at, size, reply, fetch_sec)
+        self.bytes = 0
+        self.flights = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.puts = 0
+        self.evictions = 0
+        self.expired = 0
+        self.saved_sec = 0.0
+
+    # ---------- entries ----------
+    def _lookup(self, key: str):
+        """Live entry for key (refreshing its recency), or None. Caller holds the lock."""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            self._drop(key)
+            self.expired += 1
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def _drop(self, key: str):
+        _, size, _, _ = self.entries.pop(key)
+        self.bytes -= size
+
+    def get(self, key: str):
+        """Cached reply or None"""
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.saved_sec += entry[3]
+            return entry[2]
+
+    def put(self, key: str, reply: str, fetch_sec: float = 0.0):
+        """Stores a reply; `fetch_sec` is the upstream time each later hit saves"""
+        size = len(key) + len(reply.encode("utf-8")) + ENTRY_OVERHEAD_BYTES
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self._drop(key)
+            self.entries[key] = (time.time() + self.ttl_sec, size, reply, fetch_sec)
+            self.bytes += size
+            self.puts += 1
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self.entries)))
+                self.evictions += 1
+
+    # ---------- singleflight ----------
+    def _join(self, key: str):
+        """
+        ("hit", reply), ("wait", flight) or ("lead", flight)
+
+        The leader must call _land() whatever happens.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                self.saved_sec += entry[3]
+                return "hit", entry[2]
+            flight = self.flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                flight.joined += 1
+                return "wait", flight
+            self.misses += 1
+            flight = self.flights[key] = _Flight()
+            return "lead", flight
+
+    def _land(self, key: str, flight: _Flight, reply=None, error=None, fetch_sec: float = 0.0):
+        if error is None:
+            self.put(key, reply, fetch_sec)
+        with self._lock:
+            self.flights.pop(key, None)
+            flight.reply = reply
+            flight.error = error
+            flight.done.set()
+            waiters, flight.waiters = flight.waiters, []
+            if error is None:
+                # Every waiter skipped its own upstream call
+                self.saved_sec += fetch_sec * flight.joined
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future, reply, error)
+
+    def fetch(self, key: str, load):
+        """
+        Reply for key from the cache, an in-flight call or load()
+
+        Returns (reply, source) with source "hit", "coalesced" or
+        "miss". An exception from load() is raised in every caller
+        waiting on it and nothing is cached.
+        """
+        role, found = self._join(key)
+        if role == "hit":
+            return found, "hit"
+        if role == "wait":
+            found.done.wait()
+            if found.error is not None:
+                raise found.error
+            return found.reply, "coalesced"
+
+        t0 = time.perf_counter()
+        try:
+            reply = load()
+        except Exception as e:
+            self._land(key, found, error=e)
+            raise
+        self._land(key, found, reply, fetch_sec=time.perf_counter() - t0)
+        return reply, "miss"
+
+    async def fetch_async(self, key: str, load):
+        """fetch() for asyncio; `load` is a coroutine function"""
+        role, found = self._join(key)
+        if role == "hit":
+            return found, "hit"
+        if role == "wait":
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            with self._lock:
+                landed = found.done.is_set()
+                if not landed:
+                    found.waiters.append((loop, future))
+            if landed:
+                _resolve(future, found.reply, found.error)
+            return await future, "coalesced"
+
+        t0 = time.perf_counter()
+        try:
+            reply = await load()
+        except asyncio.CancelledError:
+            # The leading client went away; waiters get an error, not
+            # a cancellation of their own
+            self._land(key, found, error=RuntimeError("Upstream chat call was cancelled"))
+            raise
+        except Exception as e:
+            self._land(key, found, error=e)
+            raise
+        self._land(key, found, reply, fetch_sec=time.perf_counter() - t0)
+        return reply, "miss"
+
+    # ---------- metrics ----------
+    def stats(self) -> dict:
+        with self._lock:
+            served = self.hits + self.coalesced
+            total = served + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.bytes,
+                "maxBytes": self.max_bytes,
+                "ttlSec": self.ttl_sec,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "inFlight": len(self.flights),
+                "puts": self.puts,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "hitRate": round(served / total, 4) if total else 0.0,
+                "latencySavedSec": round(self.saved_sec, 3),
+            }
+
+
+def _resolve(future, reply, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(reply)
+
+
+def create_chat_cache():
+    """Builds the configured chat cache, or None when caching is off"""
+    if CHAT_CACHE == "memory":
+        return ChatCache()
+    return None
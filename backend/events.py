@@ -0,0 +1,361 @@
+import asyncio
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# "memory" (this process only) or "sqlite" (shared by every process that
+# opens the same database file, e.g. several gunicorn workers)
+ANALYSIS_EVENTS_BACKEND = os.getenv("ANALYSIS_EVENTS_BACKEND", "memory")
+ANALYSIS_EVENTS_DB = os.getenv(
+    "ANALYSIS_EVENTS_DB",
+    os.path.join(tempfile.gettempdir(), "posture_events.sqlite3"),
+)
+
+# Events remembered per user for Last-Event-ID resume
+ANALYSIS_EVENTS_BUFFER = int(os.getenv("ANALYSIS_EVENTS_BUFFER", "256"))
+
+# Users whose events are held in memory; idle ones without subscribers
+# are dropped first
+ANALYSIS_EVENTS_MAX_USERS = int(os.getenv("ANALYSIS_EVENTS_MAX_USERS", "10000"))
+
+# Channels with no subscribers and no events for this long are dropped
+ANALYSIS_EVENTS_TTL_SEC = float(os.getenv("ANALYSIS_EVENTS_TTL_SEC", "3600"))
+
+# Open streams per user (tabs); the oldest is closed beyond this
+ANALYSIS_EVENTS_MAX_SUBSCRIBERS = int(os.getenv("ANALYSIS_EVENTS_MAX_SUBSCRIBERS", "16"))
+
+# How often the sqlite backend checks for events from other processes
+ANALYSIS_EVENTS_POLL_SEC = float(os.getenv("ANALYSIS_EVENTS_POLL_SEC", "0.25"))
+
+
+class _Channel:
+    def __init__(self, capacity: int):
+        self.events = deque(maxlen=capacity)  # (id, event, coalesce_key)
+        self.last_id = 0
+        self.cond = threading.Condition()
+        self.subscribers = []
+        # Last publish (or creation); subscribing doesn't extend a channel's life
+        self.touched_at = time.time()
+
+
+class Subscription:
+    """
+    One open event stream (an SSE connection)
+
+    Iterate with next() (blocking, for WSGI threads) or next_async()
+    (for the ASGI event loop); both return None once the subscription
+    has been closed, either by the client going away (close()) or by
+    eviction when the user opened too many streams.
+    """
+
+    def __init__(self, log: "EventLog", user_id: str, channel: _Channel, after: int):
+        self.log = log
+        self.user_id = user_id
+        self.channel = channel
+        self.after = after
+        self.closed = False
+        # Called (from any thread) whenever the channel changes
+        self._wake = None
+
+    def next(self, timeout: float = None):
+        """
+        New events as (id, event) pairs, oldest first
+
+        Blocks up to `timeout` seconds and returns [] if nothing arrived.
+        An `after` id newer than anything published (e.g. from before a
+        server restart) replays the whole buffer.
+        """
+        channel = self.channel
+        with channel.cond:
+            if self.after > channel.last_id:
+                self.after = 0
+            if not self.closed and channel.last_id <= self.after:
+                channel.cond.wait(timeout)
+            if self.closed:
+                return None
+            events = [(eid, event) for eid, event, _ in channel.events if eid > self.after]
+        if events:
+            self.after = events[-1][0]
+        return events
+
+    async def next_async(self, timeout: float = None):
+        """next() for asyncio: waits on the event loop instead of a thread"""
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        self._wake = lambda: loop.call_soon_threadsafe(changed.set)
+        try:
+            events = self.next(0)
+            if events == []:
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                events = self.next(0)
+            return events
+        finally:
+            self._wake = None
+
+    def close(self):
+        self.log._unsubscribe(self)
+
+
+class EventLog:
+    """
+    In-memory per-user event broker
+
+    Each user has a ring buffer of events with increasing ids. Every
+    subscriber keeps its own cursor, so all of a user's tabs receive
+    every event (fan-out), and a reconnecting client resumes from its
+    Last-Event-ID. Publishing only appends and wakes readers, so the
+    analysis side never waits on a slow client. Events published with a
+    `coalesce_key` replace the previous event with the same key (e.g.
+    progress for one video), so lagging readers see only the latest state.
+
+    Memory is bounded: ring buffers have a fixed size, the number of
+    users held is capped, and channels without subscribers are dropped
+    once idle for `ttl_sec`.
+    """
+
+    def __init__(
+        self,
+        capacity: int = ANALYSIS_EVENTS_BUFFER,
+        max_users: int = ANALYSIS_EVENTS_MAX_USERS,
+        ttl_sec: float = ANALYSIS_EVENTS_TTL_SEC,
+        max_subscribers: int = ANALYSIS_EVENTS_MAX_SUBSCRIBERS,
+    ):
+        self.capacity = capacity
+        self.max_users = max_users
+        self.ttl_sec = ttl_sec
+        self.max_subscribers = max_subscribers
+        self._channels = OrderedDict()
+        self._lock = threading.Lock()
+        self._swept_at = time.time()
+        self.published = 0
+        self.evicted_subscribers = 0
+        self.evicted_channels = 0
+
+    # ---------- Channels ----------
+    def _load(self, user_id: str, channel: _Channel):
+        """Hook for persistent backends to fill a new channel"""
+
+    def _channel(self, user_id: str, touch: bool = True) -> _Channel:
+        now = time.time()
+        with self._lock:
+            channel = self._channels.get(user_id)
+            if channel is None:
+                channel = self._channels[user_id] = _Channel(self.capacity)
+                self._load(user_id, channel)
+            if touch:
+                channel.touched_at = now
+            self._channels.move_to_end(user_id)
+            if len(self._channels) > self.max_users or now - self._swept_at > 60:
+                self._sweep(now)
+            return channel
+
+    def _sweep(self, now: float):
+        """Drops idle channels without subscribers (caller holds _lock)"""
+        self._swept_at = now
+        over = len(self._channels) - self.max_users
+        for user_id, channel in list(self._channels.items()):
+            if channel.subscribers:
+                continue
+            if over > 0 or now - channel.touched_at > self.ttl_sec:
+                del self._channels[user_id]
+                self.evicted_channels += 1
+                over -= 1
+
+    def _append(self, channel: _Channel, event_id: int, event: dict, coalesce_key: str = None):
+        with channel.cond:
+            if event_id <= channel.last_id:
+                return
+            if coalesce_key is not None:
+                for entry in channel.events:
+                    if entry[2] == coalesce_key:
+                        channel.events.remove(entry)
+                        break
+            channel.last_id = event_id
+            channel.events.append((event_id, event, coalesce_key))
+            self._notify(channel)
+
+    def _notify(self, channel: _Channel):
+        """Wakes thread and asyncio subscribers (caller holds channel.cond)"""
+        channel.cond.notify_all()
+        for sub in channel.subscribers:
+            wake = sub._wake
+            if wake is not None:
+                wake()
+
+    # ---------- Publish / subscribe ----------
+    def publish(self, user_id: str, event: dict, coalesce_key: str = None) -> int:
+        channel = self._channel(user_id)
+        with channel.cond:
+            event_id = channel.last_id + 1
+            self._append(channel, event_id, event, coalesce_key)
+        self.published += 1
+        return event_id
+
+    def subscribe(self, user_id: str, after: int = None) -> Subscription:
+        """
+        Opens a stream of the user's events
+
+        `after` is the Last-Event-ID the client received; without one
+        the stream starts at the newest event, so a new tab or a page
+        reload doesn't replay what was already delivered.
+        """
+        channel = self._channel(user_id, touch=False)
+        evicted = []
+        with channel.cond:
+            sub = Subscription(self, user_id, channel, channel.last_id if after is None else after)
+            channel.subscribers.append(sub)
+            while len(channel.subscribers) > self.max_subscribers:
+                evicted.append(channel.subscribers.pop(0))
+            for old in evicted:
+                old.closed = True
+                if old._wake is not None:
+                    old._wake()
+            if evicted:
+                channel.cond.notify_all()
+        self.evicted_subscribers += len(evicted)
+        return sub
+
+    def _unsubscribe(self, sub: Subscription):
+        channel = sub.channel
+        with channel.cond:
+            sub.closed = True
+            if sub in channel.subscribers:
+                channel.subscribers.remove(sub)
+            channel.cond.notify_all()
+            if sub._wake is not None:
+                sub._wake()
+
+    def stats(self) -> dict:
+        with self._lock:
+            channels = list(self._channels.values())
+        return {
+            "backend": "memory",
+            "users": len(channels),
+            "subscribers": sum(len(c.subscribers) for c in channels),
+            "bufferedEvents": sum(len(c.events) for c in channels),
+            "published": self.published,
+            "evictedSubscribers": self.evicted_subscribers,
+            "evictedChannels": self.evicted_channels,
+        }
+
+
+class SQLiteEventLog(EventLog):
+    """
+    EventLog shared between processes through a SQLite database
+
+    publish() only writes the row; every process runs one tail thread
+    that polls for new rows and appends them to its in-memory channels,
+    so subscribers still block on a local condition and N idle streams
+    cost one query per poll interval, not N. Ids come from the table, so
+    Last-Event-ID works across processes and restarts.
+    """
+
+    def __init__(self, path: str = ANALYSIS_EVENTS_DB, poll_sec: float = ANALYSIS_EVENTS_POLL_SEC, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.poll_sec = poll_sec
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " user_id TEXT NOT NULL,"
+            " coalesce_key TEXT,"
+            " payload TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS events_user ON events (user_id, id)")
+        self._cursor = self._db.execute("SELECT COALESCE(MAX(id), 0) FROM events").fetchone()[0]
+        threading.Thread(target=self._tail, daemon=True).start()
+
+    def _load(self, user_id: str, channel: _Channel):
+        with self._db_lock:
+            rows = self._db.execute(
+                "SELECT id, payload, coalesce_key FROM events WHERE user_id = ? AND id <= ?"
+                " ORDER BY id DESC LIMIT ?",
+                (user_id, self._cursor, self.capacity),
+            ).fetchall()
+        for event_id, payload, coalesce_key in reversed(rows):
+            self._append(channel, event_id, json.loads(payload), coalesce_key)
+
+    def publish(self, user_id: str, event: dict, coalesce_key: str = None) -> int:
+        now = time.time()
+        with self._db_lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if coalesce_key is not None:
+                    self._db.execute(
+                        "DELETE FROM events WHERE user_id = ? AND coalesce_key = ?",
+                        (user_id, coalesce_key),
+                    )
+                event_id = self._db.execute(
+                    "INSERT INTO events (user_id, coalesce_key, payload, created) VALUES (?, ?, ?, ?)",
+                    (user_id, coalesce_key, json.dumps(event), now),
+                ).lastrowid
+                # Keep at most `capacity` rows per user
+                self._db.execute(
+                    "DELETE FROM events WHERE user_id = ? AND id <= ("
+                    " SELECT id FROM events WHERE user_id = ? ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                    (user_id, user_id, self.capacity),
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        self.published += 1
+        return event_id
+
+    def _tail(self):
+        expired_at = time.time()
+        while True:
+            time.sleep(self.poll_sec)
+            try:
+                with self._db_lock:
+                    rows = self._db.execute(
+                        "SELECT id, user_id, coalesce_key, payload FROM events WHERE id > ? ORDER BY id",
+                        (self._cursor,),
+                    ).fetchall()
+                    if time.time() - expired_at > 60:
+                        expired_at = time.time()
+                        self._db.execute(
+                            "DELETE FROM events WHERE created < ?", (expired_at - self.ttl_sec,)
+                        )
+                for event_id, user_id, coalesce_key, payload in rows:
+                    with self._lock:
+                        channel = self._channels.get(user_id)
+                        self._cursor = event_id
+                    # Users nobody here listens to are loaded on first subscribe
+                    if channel is not None:
+                        self._append(channel, event_id, json.loads(payload), coalesce_key)
+            except sqlite3.Error as e:
+                print("[events] tail failed:", e)
+
+    def stats(self) -> dict:
+        return {**super().stats(), "backend": "sqlite"}
+
+
+def create_event_log() -> EventLog:
+    """Builds the configured event backend"""
+    if ANALYSIS_EVENTS_BACKEND == "sqlite":
+        return SQLiteEventLog()
+    return EventLog()
+
+
+def parse_event_id(value):
+    """Last-Event-ID header / query value as an int (None when missing or invalid)"""
+    try:
+        return max(0, int(value))
+    except (TypeError, ValueError):
+        return None
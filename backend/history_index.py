@@ -0,0 +1,210 @@
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# Per-user manifests live at <prefix><user_id>/history.json
+HISTORY_INDEX_PREFIX = os.getenv("HISTORY_INDEX_PREFIX", "index/")
+
+# Parallel GETs used when a manifest has to be rebuilt from the analyses
+HISTORY_REBUILD_WORKERS = 16
+
+# Manifest writes are conditional on the ETag that was read (S3 returns
+# 412 if another process wrote in between); attempts before giving up
+HISTORY_WRITE_ATTEMPTS = int(os.getenv("HISTORY_WRITE_ATTEMPTS", "8"))
+
+# In-process locks, striped by user, so threads of one process don't
+# race each other into 412s (memory stays fixed however many users)
+HISTORY_LOCK_STRIPES = 64
+
+
+class HistoryConflict(Exception):
+    """A manifest kept changing underneath every write attempt"""
+
+
+def summarize(analysis: dict, analysis_key: str) -> dict:
+    """Lightweight history row for one analysis (what /api/history returns)"""
+    return {
+        "title": analysis.get("title"),
+        "videoKey": analysis.get("videoKey"),
+        "analysisKey": analysis_key,
+        "createdAt": analysis.get("created_at"),
+        "instrument": analysis.get("instrument"),
+        "overallScore": analysis.get("overall_score"),
+        "poseCoverage": (analysis.get("metrics") or {}).get("pose_coverage"),
+        "mlLabel": analysis.get("ml", {}).get("label"),
+        "mlConfidence": analysis.get("ml", {}).get("confidence"),
+    }
+
+
+def page_args(data: dict):
+    """
+    (offset, limit, order) from a /api/history body
+
+    Raises ValueError when offset / limit aren't integers.
+    """
+    try:
+        offset = max(0, int(data.get("offset", 0)))
+        limit = data.get("limit")
+        limit = None if limit is None else max(0, int(limit))
+    except (TypeError, ValueError):
+        raise ValueError("offset and limit must be integers")
+    order = "asc" if data.get("order") == "asc" else "desc"
+    return offset, limit, order
+
+
+def _sort_rows(rows: list):
+    rows.sort(key=lambda r: r["createdAt"] or "", reverse=True)
+
+
+class HistoryIndex:
+    """
+    Per-user summary manifest stored in S3
+
+    The analysis worker upserts a row whenever it writes an analysis, so
+    /api/history is a single GET instead of a listing plus one GET per
+    analysis. Rows are kept sorted by createdAt, newest first. Users
+    without a manifest yet get one rebuilt from their analyses.
+
+    Several processes / hosts may write the same manifest, so every
+    write is a read-modify-write conditioned on the ETag it read
+    (If-None-Match for a new manifest), retried on 412.
+    """
+
+    def __init__(self, s3, bucket: str, prefix: str = HISTORY_INDEX_PREFIX):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+        self._locks = [threading.Lock() for _ in range(HISTORY_LOCK_STRIPES)]
+
+    def _key(self, user_id: str) -> str:
+        return f"{self.prefix}{user_id}/history.json"
+
+    def _lock(self, user_id: str):
+        return self._locks[hash(user_id) % len(self._locks)]
+
+    # ---------- Storage ----------
+    def _load(self, user_id: str):
+        """(rows, etag), or (None, None) when the user has no manifest"""
+        try:
+            obj = self.s3.get_object(Bucket=self.bucket, Key=self._key(user_id))
+        except self.s3.exceptions.NoSuchKey:
+            return None, None
+        return json.loads(obj["Body"].read())["rows"], obj["ETag"]
+
+    def _save(self, user_id: str, rows: list, etag: str = None) -> bool:
+        """
+        Writes the manifest if it is still at `etag` (None: still absent)
+
+        Returns False when another writer got there first.
+        """
+        from botocore.exceptions import ClientError
+
+        condition = {"IfMatch": etag} if etag else {"IfNoneMatch": "*"}
+        try:
+            self.s3.put_object(
+                Bucket=self.bucket,
+                Key=self._key(user_id),
+                Body=json.dumps({"version": 1, "rows": rows}).encode(),
+                ContentType="application/json",
+                **condition,
+            )
+        except ClientError as e:
+            # 409 ConditionalRequestConflict: a concurrent conditional write
+            if e.response["Error"]["Code"] in ("PreconditionFailed", "ConditionalRequestConflict"):
+                return False
+            raise
+        return True
+
+    def _update(self, user_id: str, change):
+        """
+        Applies change(rows) -> rows to the manifest, retrying on conflict
+
+        A missing manifest is rebuilt first (the rebuild already sees the
+        analysis being written, so change() just keeps it unique).
+        """
+        with self._lock(user_id):
+            for attempt in range(HISTORY_WRITE_ATTEMPTS):
+                rows, etag = self._load(user_id)
+                if rows is None:
+                    rows = self._collect(user_id)
+                if self._save(user_id, change(rows), etag):
+                    return
+                # Jittered backoff so competing writers don't collide again
+                time.sleep(random.uniform(0, 0.05 * 2 ** attempt))
+        raise HistoryConflict(f"history manifest for {user_id} kept changing")
+
+    def invalidate(self, user_id: str):
+        """Drops a user's manifest so the next read rebuilds it from S3"""
+        self.s3.delete_object(Bucket=self.bucket, Key=self._key(user_id))
+
+    # ---------- Reads ----------
+    def rows(self, user_id: str) -> list:
+        """All rows for a user, newest first"""
+        rows, _ = self._load(user_id)
+        if rows is None:
+            with self._lock(user_id):
+                rows, _ = self._load(user_id)
+                if rows is None:
+                    rows = self.rebuild(user_id)
+        return rows
+
+    def page(self, user_id: str, offset: int = 0, limit: int = None, order: str = "desc"):
+        """Returns (rows, total) for one page sorted by createdAt"""
+        rows = self.rows(user_id)
+        if order == "asc":
+            rows = rows[::-1]
+        end = None if limit is None else offset + limit
+        return rows[offset:end], len(rows)
+
+    # ---------- Writes ----------
+    def upsert(self, user_id: str, row: dict):
+        def change(rows):
+            rows = [r for r in rows if r["analysisKey"] != row["analysisKey"]]
+            rows.append(row)
+            _sort_rows(rows)
+            return rows
+
+        self._update(user_id, change)
+
+    def remove(self, user_id: str, analysis_key: str):
+        if self._load(user_id)[0] is None:
+            return
+        self._update(user_id, lambda rows: [r for r in rows if r["analysisKey"] != analysis_key])
+
+    def rebuild(self, user_id: str) -> list:
+        """
+        Recreates a user's manifest from their analysis JSONs (all pages)
+
+        Only written if no manifest appeared meanwhile; a concurrent
+        writer's manifest already includes its own row.
+        """
+        rows = self._collect(user_id)
+        self._save(user_id, rows)
+        return rows
+
+    def _collect(self, user_id: str) -> list:
+        """Summary rows read straight from a user's analysis JSONs"""
+        keys = []
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=f"analysis/{user_id}/"):
+            keys.extend(
+                obj["Key"] for obj in page.get("Contents", [])
+                if obj["Key"].endswith(".json")
+            )
+
+        def fetch(key):
+            body = self.s3.get_object(Bucket=self.bucket, Key=key)["Body"]
+            return summarize(json.loads(body.read()), key)
+
+        with ThreadPoolExecutor(max_workers=HISTORY_REBUILD_WORKERS) as pool:
+            rows = list(pool.map(fetch, keys))
+
+        _sort_rows(rows)
+        return rows
@@ -0,0 +1,37 @@
+import threading
+
+# ============================================================
+# Deferred construction
+# ============================================================
+#
+# Building some process-wide objects is slow because of the libraries
+# behind them (boto3 clients, requests sessions), which would make every
+# cold start of an autoscaled worker pay for routes it may never serve.
+# Lazy() stands in for such an object at import time and builds it on
+# first use.
+
+
+class Lazy:
+    """
+    Proxy for the object returned by `factory`, built on first attribute access
+
+    Construction happens once, under a lock, so threads racing on the
+    first request share one instance.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._obj = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        obj = self._obj
+        if obj is None:
+            with self._lock:
+                if self._obj is None:
+                    self._obj = self._factory()
+                obj = self._obj
+        return obj
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
@@ -0,0 +1,130 @@
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# Concurrent live sessions held in memory; the least recently used is
+# dropped when a new one would exceed this
+LIVE_MAX_SESSIONS = int(os.getenv("LIVE_MAX_SESSIONS", "256"))
+
+# Sessions that receive no frames for this long are discarded
+LIVE_SESSION_TTL_SEC = float(os.getenv("LIVE_SESSION_TTL_SEC", "120"))
+
+# Upper bound on frames accepted in a single POST
+LIVE_MAX_FRAMES_PER_BATCH = int(os.getenv("LIVE_MAX_FRAMES_PER_BATCH", "120"))
+
+# Largest rolling window a client may ask for
+LIVE_MAX_WINDOW_SEC = 120.0
+
+
+class LiveSession:
+    def __init__(self, user_id: str, window_sec: float):
+        from analysis.live import LiveWindow
+
+        self.id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.window = LiveWindow(window_sec)
+        self.created_at = time.time()
+        self.touched_at = self.created_at
+        self.lock = threading.Lock()
+
+
+class LiveSessions:
+    """
+    In-memory registry of live posture sessions
+
+    Bounded by `max_sessions` (least recently used evicted first) and by
+    an idle TTL, so abandoned browser tabs don't accumulate.
+    """
+
+    def __init__(self, max_sessions: int = LIVE_MAX_SESSIONS, ttl_sec: float = LIVE_SESSION_TTL_SEC):
+        self.max_sessions = max_sessions
+        self.ttl_sec = ttl_sec
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.touched_at < self.ttl_sec and len(self._sessions) <= self.max_sessions:
+                break
+            self._sessions.popitem(last=False)
+
+    def create(self, user_id: str, window_sec: float = None) -> LiveSession:
+        """New session scoring a rolling `window_sec` (LIVE_WINDOW_SEC by default)"""
+        # analysis.live (and NumPy) is imported with the first session, not the app
+        from analysis.live import LIVE_WINDOW_SEC
+
+        if window_sec is None:
+            window_sec = LIVE_WINDOW_SEC
+        window_sec = min(max(1.0, float(window_sec)), LIVE_MAX_WINDOW_SEC)
+        session = LiveSession(user_id, window_sec)
+        with self._lock:
+            self._sessions[session.id] = session
+            self._expire(session.created_at)
+        return session
+
+    def get(self, session_id: str, user_id: str):
+        """The session, or None if unknown, expired or owned by someone else"""
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is None or session.user_id != user_id:
+                return None
+            session.touched_at = now
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def push(self, session: LiveSession, raw_frames: list) -> dict:
+        """
+        Adds a batch of {t, landmarks} frames and returns the window score
+
+        `landmarks` may be null for frames where no pose was detected.
+        Raises ValueError on malformed input.
+        """
+        if not isinstance(raw_frames, list) or not raw_frames:
+            raise ValueError("frames must be a non-empty list")
+        if len(raw_frames) > LIVE_MAX_FRAMES_PER_BATCH:
+            raise ValueError(f"at most {LIVE_MAX_FRAMES_PER_BATCH} frames per batch")
+
+        from analysis.live import parse_landmarks
+
+        start = time.perf_counter()
+        frames = []
+        for f in raw_frames:
+            t = f.get("t") if isinstance(f, dict) else None
+            # bool is an int, and NaN / Inf would poison the window aggregates
+            if not isinstance(t, (int, float)) or isinstance(t, bool) or not math.isfinite(t):
+                raise ValueError("each frame needs a finite numeric t (seconds)")
+            lms = f.get("landmarks")
+            frames.append((f["t"], None if lms is None else parse_landmarks(lms)))
+
+        with session.lock:
+            accepted = session.window.push(frames)
+            result = session.window.snapshot()
+
+        result["accepted"] = accepted
+        result["latency_ms"] = round((time.perf_counter() - start) * 1000.0, 3)
+        return result
+
+    def close(self, session_id: str, user_id: str):
+        """Removes a session and returns its whole-session summary"""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None or session.user_id != user_id:
+                return None
+            del self._sessions[session_id]
+        with session.lock:
+            return session.window.summary()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire(time.time())
+            return {"sessions": len(self._sessions), "maxSessions": self.max_sessions}
@@ -0,0 +1,253 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# Histogram buckets (seconds): whole analysis jobs and their stages span
+# sub-second cache hits to multi-minute videos; chat calls are shorter
+JOB_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+CHAT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+# ============================================================
+# Metric types (Prometheus text exposition format)
+# ============================================================
+#
+# Values live in this process; with several server processes each one
+# is scraped separately. Recording is a dict lookup and an add under a
+# per-metric lock: a few microseconds, against jobs that take seconds
+# (benchmarks/bench_metrics.py).
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _label_text(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, description: str, labels=()):
+        self.name = name
+        self.help = description
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict):
+        return tuple(str(labels[n]) for n in self.labels)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonic total, e.g. bytes transferred or errors"""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, k)} {_format(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """
+    Current value, either set() explicitly or read from `fn` at scrape time
+
+    A callback gauge (e.g. queue depth from scheduler.stats()) costs
+    nothing between scrapes.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, labels=(), fn=None):
+        super().__init__(name, description, labels)
+        self.fn = fn
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self):
+        if self.fn is not None:
+            try:
+                return [f"{self.name} {_format(self.fn())}"]
+            except Exception:
+                return []
+        with self._lock:
+            items = list(self._values.items())
+        return [f"{self.name}{_label_text(self.labels, k)} {_format(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed upper bounds"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels=(), buckets=JOB_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # per-bucket counts (the last one is +Inf), sum, count
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][i] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def count(self, **labels) -> int:
+        entry = self._values.get(self._key(labels))
+        return entry[2] if entry else 0
+
+    def _samples(self):
+        with self._lock:
+            items = [(k, list(counts), total, n) for k, (counts, total, n) in self._values.items()]
+        lines = []
+        for key, counts, total, n in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = f'le="{_format(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_label_text(self.labels, key)} {_format(total)}")
+            lines.append(f"{self.name}_count{_label_text(self.labels, key)} {n}")
+        return lines
+
+
+class MetricsRegistry:
+    """The metrics a process exposes on /metrics, in registration order"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels=()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def gauge(self, name: str, description: str, labels=(), fn=None) -> Gauge:
+        return self._register(Gauge(name, description, labels, fn))
+
+    def histogram(self, name: str, description: str, labels=(), buckets=JOB_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Content-Type of render()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+registry = MetricsRegistry()
+
+# ============================================================
+# Analysis pipeline and chat proxy
+# ============================================================
+
+analysis_jobs = registry.counter(
+    "analysis_jobs_total", "Finished analysis jobs by outcome (done, failed)", ["outcome"]
+)
+analysis_job_seconds = registry.histogram(
+    "analysis_job_seconds", "Wall time of run_analysis_async by outcome", ["outcome"]
+)
+analysis_stage_seconds = registry.histogram(
+    "analysis_stage_seconds", "Wall time of one analysis job stage", ["stage"]
+)
+analysis_stage_errors = registry.counter(
+    "analysis_stage_errors_total", "Exceptions raised inside an analysis job stage", ["stage"]
+)
+s3_bytes = registry.counter(
+    "s3_bytes_total", "Object bytes moved by the analysis pipeline", ["direction"]
+)
+chat_upstream_seconds = registry.histogram(
+    "chat_upstream_seconds",
+    "Upstream chat latency: full reply (complete) or until the stream starts (stream)",
+    ["mode"],
+    buckets=CHAT_BUCKETS,
+)
+chat_upstream_errors = registry.counter(
+    "chat_upstream_errors_total", "Failed upstream chat calls", ["mode"]
+)
+
+
+class StageTimer:
+    """
+    Per-job stage durations
+
+    Each `with timer.stage(name):` block is observed in
+    analysis_stage_seconds as it finishes (and counted in
+    analysis_stage_errors_total if it raises); timings() returns the
+    totals so far for the job's own metadata. Re-entering a stage adds
+    to its total.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        t0 = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            analysis_stage_errors.inc(stage=name)
+            raise
+        finally:
+            elapsed = time.perf_counter() - t0
+            self.stages[name] = self.stages.get(name, 0.0) + elapsed
+            analysis_stage_seconds.observe(elapsed, stage=name)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def timings(self) -> dict:
+        out = {name: round(sec, 3) for name, sec in self.stages.items()}
+        out["total"] = round(self.elapsed(), 3)
+        return out
@@ -1,10 +1,39 @@
-import os
+import argparse
 import json
-import csv
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Allow running as a script (python ml/build_dataset.py ...)
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# ============================================================
+# Configuration
+# ============================================================
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+
+# Columnar dataset: a directory of append-only shards (one array per
+# column each), and the manifest recording the ETag of every analysis and
+# the shard holding its current row
+DATASET_PATH = os.path.join(DATA_DIR, "posture_dataset")
+MANIFEST_PATH = os.path.join(DATA_DIR, "posture_dataset.manifest.json")
+
+# Compact into a single shard once there are more shards than this, or
+# once superseded rows outnumber live ones
+DATASET_MAX_SHARDS = int(os.getenv("DATASET_MAX_SHARDS", "64"))
+
+# Older exports, still readable by load_dataset()
+LEGACY_CSV = os.path.join(DATA_DIR, "posture_dataset.csv")
+
+ANALYSIS_PREFIX = "analysis/"
 
-# Folder with your downloaded analysis JSONs
-ANALYSIS_DIR = os.path.join("..", "data", "analyses")   # <- you said data/analysis
-OUTPUT_CSV = os.path.join("..", "data", "posture_dataset.csv")
+# Concurrent GETs while fetching new or changed analyses
+BUILD_WORKERS = int(os.getenv("DATASET_BUILD_WORKERS", "32"))
 
 # Use the calibrated, explainable features
 FEATURE_KEYS = [
@@ -15,6 +44,9 @@ FEATURE_KEYS = [
     "session_duration_sec",
 ]
 
+COLUMNS = FEATURE_KEYS + ["label", "source_file", "overall_score"]
+
+
 def normalize_label(raw: str):
     """
     Collapse labels into stable classes.
@@ -31,35 +63,290 @@ def normalize_label(raw: str):
         return "Bad"
     return None  # Unknown or anything else
 
-rows = []
-
-for fname in os.listdir(ANALYSIS_DIR):
-    if not fname.endswith(".json"):
-        continue
 
-    path = os.path.join(ANALYSIS_DIR, fname)
-    with open(path, "r", encoding="utf-8") as f:
-        data = json.load(f)
-
-    fv = data.get("feature_vector", {})
+def analysis_row(data: dict, source: str):
+    """Dataset row for one analysis JSON, or None if its label is unusable"""
     label = normalize_label(data.get("weak_label"))
-
-    # Skip Unknown/invalid labels (shouldn't be any with your 8)
     if label is None:
-        continue
+        return None
 
+    fv = data.get("feature_vector", {})
     row = {k: float(fv.get(k, 0.0)) for k in FEATURE_KEYS}
     row["label"] = label
-    row["source_file"] = fname
+    row["source_file"] = source
     row["overall_score"] = float(data.get("overall_score", 0.0))
-    rows.append(row)
+    return row
+
+
+# ============================================================
+# Sources
+# ============================================================
+
+class S3Analyses:
+    """Every user's analysis/ JSONs in a bucket; ETags identify versions"""
+
+    def __init__(self, s3, bucket: str, prefix: str = ANALYSIS_PREFIX):
+        self.s3 = s3
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def list(self) -> dict:
+        versions = {}
+        paginator = self.s3.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for obj in page.get("Contents", []):
+                if obj["Key"].endswith(".json"):
+                    versions[obj["Key"]] = obj["ETag"].strip('"')
+        return versions
+
+    def read(self, key: str) -> dict:
+        return json.loads(self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read())
+
+
+class LocalAnalyses:
+    """Analysis JSONs downloaded into a directory; mtime and size stand in for ETags"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def list(self) -> dict:
+        versions = {}
+        for name in os.listdir(self.root):
+            if name.endswith(".json"):
+                st = os.stat(os.path.join(self.root, name))
+                versions[name] = f"{st.st_mtime_ns}-{st.st_size}"
+        return versions
+
+    def read(self, name: str) -> dict:
+        with open(os.path.join(self.root, name), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+
+# ============================================================
+# Dataset storage
+# ============================================================
+#
+# A build writes only the rows it fetched, as a new shard, so its I/O is
+# proportional to what changed rather than to the dataset. A changed or
+# deleted analysis leaves its old row behind in an older shard; readers
+# skip rows whose shard isn't the one the manifest points at, and
+# compaction rewrites the live rows once enough of them pile up.
+
+SHARD_MANIFEST_VERSION = 2
+
+
+def _empty_columns() -> dict:
+    columns = {k: np.empty(0, dtype=np.float64) for k in FEATURE_KEYS + ["overall_score"]}
+    columns["label"] = np.empty(0, dtype=str)
+    columns["source_file"] = np.empty(0, dtype=str)
+    return columns
+
+
+def _read_npz(path: str) -> dict:
+    with np.load(path, allow_pickle=False) as npz:
+        return {k: npz[k] for k in COLUMNS}
+
+
+def _live_columns(dataset_path: str, manifest: dict) -> dict:
+    """Concatenated rows of every shard that are still current"""
+    items = manifest.get("items", {})
+    parts = []
+    for shard in sorted(manifest.get("shards", {})):
+        columns = _read_npz(os.path.join(dataset_path, shard))
+        keep = np.array(
+            [items.get(key, (None, None))[1] == shard for key in columns["source_file"].tolist()],
+            dtype=bool,
+        )
+        if keep.any():
+            parts.append({k: v[keep] for k, v in columns.items()})
+    if not parts:
+        return _empty_columns()
+    return {k: np.concatenate([part[k] for part in parts]) for k in COLUMNS}
+
+
+def read_columns(path: str = DATASET_PATH, manifest_path: str = MANIFEST_PATH) -> dict:
+    # Single-file datasets from before sharding
+    if os.path.isfile(path):
+        return _read_npz(path)
+    if not os.path.isdir(path):
+        return _empty_columns()
+    return _live_columns(path, read_manifest(manifest_path))
+
+
+def write_columns(columns: dict, path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp.npz"
+    np.savez(tmp, **columns)
+    os.replace(tmp, path)
+
+
+def load_dataset(path: str = DATASET_PATH, manifest_path: str = MANIFEST_PATH):
+    """The dataset as a DataFrame (falls back to the legacy CSV export)"""
+    import pandas as pd
+
+    if not os.path.exists(path) and os.path.exists(LEGACY_CSV):
+        return pd.read_csv(LEGACY_CSV)
+    return pd.DataFrame(read_columns(path, manifest_path), columns=COLUMNS)
+
+
+def read_manifest(path: str = MANIFEST_PATH) -> dict:
+    """
+    {"items": {key: [etag, shard]}, "shards": {shard: rows}}
+
+    `shard` is None for analyses without a usable label. Manifests from
+    before sharding read as empty, so the next build starts over.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != SHARD_MANIFEST_VERSION:
+        return {}
+    return manifest
+
+
+def write_manifest(manifest: dict, path: str = MANIFEST_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({**manifest, "version": SHARD_MANIFEST_VERSION}, f)
+    os.replace(tmp, path)
+
+
+def _next_shard(shards: dict) -> str:
+    numbers = [int(name[len("shard-"):-len(".npz")]) for name in shards]
+    return f"shard-{max(numbers, default=0) + 1:06d}.npz"
+
+
+def _remove_unreferenced(dataset_path: str, shards: dict):
+    """Deletes shard files the manifest no longer points at (after it was written)"""
+    for name in os.listdir(dataset_path):
+        if name.startswith("shard-") and name not in shards:
+            try:
+                os.remove(os.path.join(dataset_path, name))
+            except OSError:
+                pass
+
+
+# ============================================================
+# Incremental build
+# ============================================================
+
+def build_dataset(
+    source,
+    dataset_path: str = DATASET_PATH,
+    manifest_path: str = MANIFEST_PATH,
+    workers: int = BUILD_WORKERS,
+    full: bool = False,
+) -> dict:
+    """
+    Brings the dataset up to date with `source`
+
+    Only analyses whose ETag is new or changed since the last build are
+    fetched (in parallel), and only their rows are written, as one new
+    shard; rows of changed or deleted analyses are superseded through
+    the manifest. `full` ignores the manifest and re-reads everything.
+    """
+    t0 = time.perf_counter()
+    manifest = read_manifest(manifest_path)
+    items = {} if full else manifest.get("items", {})
+    shards = {} if full else manifest.get("shards", {})
+    # Shard names of the previous manifest are never reused, so a build
+    # that dies before writing its manifest leaves the dataset intact
+    taken = dict(manifest.get("shards", {}))
+
+    versions = source.list()
+    listed_sec = time.perf_counter() - t0
+
+    changed = [key for key, etag in versions.items() if items.get(key, (None,))[0] != etag]
+    removed = [key for key in items if key not in versions]
+
+    def fetch(key):
+        return analysis_row(source.read(key), key)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        rows = [row for row in pool.map(fetch, changed) if row is not None]
+
+    items = {key: entry for key, entry in items.items() if key in versions}
+    for key in changed:
+        items[key] = [versions[key], None]
+    if rows:
+        shard = _next_shard({**taken, **shards})
+        write_columns(
+            {k: np.array([row[k] for row in rows]) for k in COLUMNS},
+            os.path.join(dataset_path, shard),
+        )
+        shards[shard] = len(rows)
+        for row in rows:
+            items[row["source_file"]][1] = shard
+
+    live = sum(1 for _, shard in items.values() if shard is not None)
+    superseded = sum(shards.values()) - live
+    compacted = len(shards) > DATASET_MAX_SHARDS or superseded > live
+    if compacted:
+        columns = _live_columns(dataset_path, {"items": items, "shards": shards})
+        shard = _next_shard({**taken, **shards})
+        shards = {}
+        if live:
+            write_columns(columns, os.path.join(dataset_path, shard))
+            shards[shard] = live
+        items = {key: [etag, shard if held else None] for key, (etag, held) in items.items()}
+
+    if changed or removed or full or compacted:
+        write_manifest({"items": items, "shards": shards}, manifest_path)
+        if os.path.isdir(dataset_path):
+            _remove_unreferenced(dataset_path, shards)
+
+    return {
+        "listed": len(versions),
+        "fetched": len(changed),
+        "added": len(rows),
+        "removed": len(removed),
+        "rows": live,
+        "shards": len(shards),
+        "compacted": compacted,
+        "list_sec": round(listed_sec, 3),
+        "total_sec": round(time.perf_counter() - t0, 3),
+    }
+
+
+def main():
+    # Usage:
+    # python ml/build_dataset.py [--bucket NAME] [--prefix analysis/] [--full]
+    # python ml/build_dataset.py --from-dir data/analyses
+
+    parser = argparse.ArgumentParser(description="Incrementally build the posture training dataset")
+    parser.add_argument("--bucket", default=os.getenv("AWS_BUCKET_NAME"))
+    parser.add_argument("--prefix", default=ANALYSIS_PREFIX)
+    parser.add_argument("--from-dir", help="read downloaded analysis JSONs instead of S3")
+    parser.add_argument("--dataset", default=DATASET_PATH)
+    parser.add_argument("--manifest", default=MANIFEST_PATH)
+    parser.add_argument("--workers", type=int, default=BUILD_WORKERS)
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and rebuild")
+    args = parser.parse_args()
+
+    if args.from_dir:
+        source = LocalAnalyses(args.from_dir)
+    else:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        bucket = args.bucket or os.getenv("AWS_BUCKET_NAME")
+        if not bucket:
+            parser.error("--bucket (or AWS_BUCKET_NAME) is required without --from-dir")
+
+        from s3_client import create_s3_client
+
+        source = S3Analyses(create_s3_client(), bucket, args.prefix)
 
-print(f"Loaded {len(rows)} samples from {ANALYSIS_DIR}")
+    stats = build_dataset(source, args.dataset, args.manifest, args.workers, args.full)
+    print(
+        f"Listed {stats['listed']} analyses, fetched {stats['fetched']} new or changed, "
+        f"removed {stats['removed']}; {stats['rows']} samples in {args.dataset} "
+        f"({stats['total_sec']:.2f}s)"
+    )
 
-os.makedirs(os.path.dirname(OUTPUT_CSV), exist_ok=True)
-with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
-    writer = csv.DictWriter(f, fieldnames=FEATURE_KEYS + ["label", "source_file", "overall_score"])
-    writer.writeheader()
-    writer.writerows(rows)
 
-print(f"Saved dataset to {OUTPUT_CSV}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import sys
+
+import numpy as np
+
+# Allow running as a script (python ml/compiled.py ...)
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# ============================================================
+# Compiled (NumPy-only) posture classifier
+# ============================================================
+#
+# The deployed model is StandardScaler + LogisticRegression, i.e. a few
+# small arrays. Exported to .npz they can be evaluated with NumPy alone,
+# so serving processes never import joblib, scikit-learn or pandas.
+
+
+def export_pipeline(model, feature_columns, path: str):
+    """
+    Writes a fitted StandardScaler + LogisticRegression pipeline as arrays
+
+    Raises ValueError for any other estimator; callers keep the joblib
+    artifact either way.
+    """
+    steps = getattr(model, "named_steps", None) or {}
+    scaler = steps.get("scaler")
+    clf = steps.get("clf")
+    if scaler is None or clf is None or not hasattr(clf, "coef_") or len(steps) != 2:
+        raise ValueError("only StandardScaler + LogisticRegression pipelines can be compiled")
+
+    n = len(feature_columns)
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(n)
+    scale = scaler.scale_ if scaler.with_std else np.ones(n)
+
+    classes = np.asarray([str(c) for c in clf.classes_])
+    multi_class = getattr(clf, "multi_class", "auto")
+    if multi_class in ("auto", "deprecated"):
+        # What scikit-learn resolves the default to: liblinear can only
+        # fit one-vs-rest, every other solver fits a multinomial model
+        multi_class = "ovr" if getattr(clf, "solver", None) == "liblinear" else "multinomial"
+    if len(classes) == 2:
+        kind = "binary"
+    elif multi_class == "ovr":
+        kind = "ovr"
+    else:
+        kind = "multinomial"
+
+    tmp = f"{path}.tmp.npz"
+    np.savez(
+        tmp,
+        mean=np.asarray(mean, dtype=np.float64),
+        scale=np.asarray(scale, dtype=np.float64),
+        coef=np.asarray(clf.coef_, dtype=np.float64),
+        intercept=np.asarray(clf.intercept_, dtype=np.float64),
+        classes=classes,
+        feature_columns=np.asarray(list(feature_columns)),
+        kind=np.asarray(kind),
+    )
+    os.replace(tmp, path)
+
+
+class CompiledModel:
+    """
+    predict_proba of an exported pipeline, in NumPy
+
+    Same arithmetic as scikit-learn (standardize, linear decision,
+    softmax / logistic), so probabilities match predict_proba to
+    floating-point rounding.
+    """
+
+    def __init__(self, mean, scale, coef, intercept, classes, feature_columns, kind):
+        self.mean = mean
+        self.scale = scale
+        self.coef_t = np.ascontiguousarray(coef.T)
+        self.intercept = intercept
+        self.classes_ = classes.astype(object)
+        self.feature_columns = [str(c) for c in feature_columns]
+        self.kind = kind
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledModel":
+        with np.load(path, allow_pickle=False) as npz:
+            return cls(
+                npz["mean"],
+                npz["scale"],
+                npz["coef"],
+                npz["intercept"],
+                npz["classes"],
+                npz["feature_columns"],
+                str(npz["kind"]),
+            )
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float64)
+        return ((X - self.mean) / self.scale) @ self.coef_t + self.intercept
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        scores = self.decision_function(X)
+
+        if self.kind == "binary":
+            p = _expit(scores[:, 0])
+            return np.column_stack([1.0 - p, p])
+
+        if self.kind == "ovr":
+            p = _expit(scores)
+            return p / p.sum(axis=1, keepdims=True)
+
+        scores = scores - scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        # From the decision values, like scikit-learn: saturated
+        # probabilities can tie where the scores don't
+        scores = self.decision_function(X)
+        if self.kind == "binary":
+            return self.classes_[(scores[:, 0] > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+
+def _expit(x: np.ndarray) -> np.ndarray:
+    """Logistic function; exp overflow for very negative x correctly gives 0"""
+    with np.errstate(over="ignore"):
+        return 1.0 / (1.0 + np.exp(-x))
+
+
+def main():
+    # Usage:
+    # python ml/compiled.py <model.joblib> [<output.npz>]
+    # Compiles an already trained model (e.g. the legacy posture_model.joblib)
+
+    if len(sys.argv) not in (2, 3):
+        print("Invalid arguments", file=sys.stderr)
+        sys.exit(1)
+
+    import joblib
+
+    from ml.registry import LEGACY_FEATURE_COLUMNS
+
+    src = sys.argv[1]
+    out = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + ".npz"
+    model = joblib.load(src)
+    columns = list(getattr(model, "feature_names_in_", LEGACY_FEATURE_COLUMNS))
+    export_pipeline(model, columns, out)
+    print(f"Compiled {src} -> {out}")
+
+
+if __name__ == "__main__":
+    main()
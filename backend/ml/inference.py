@@ -1,61 +1,141 @@
-import os
-import joblib
-import pandas as pd
+import warnings
 
-# Load once at import time (important for performance)
-MODEL_PATH = os.path.join(
-    os.path.dirname(__file__),
-    "..",
-    "models",
-    "posture_model.joblib"
-)
+import numpy as np
 
-_model = None
+from ml.compiled import CompiledModel
+from ml.registry import LEGACY_FEATURE_COLUMNS, ModelRegistry
 
+# ---- Posture-quality features ONLY (columns of the legacy model; each
+# registry version records its own) ----
+FEATURE_COLUMNS = LEGACY_FEATURE_COLUMNS
 
-def load_model():
-    global _model
-    if _model is None:
-        _model = joblib.load(MODEL_PATH)
-    return _model
+# Versioned models, hot-swapped when train_model.py publishes a new one
+registry = ModelRegistry()
 
 
-def predict_posture(feature_vector: dict):
+def feature_matrix(feature_vectors, columns=FEATURE_COLUMNS) -> np.ndarray:
+    """Stacks feature_vector dicts into an (n, len(columns)) array"""
+    return np.array(
+        [[fv.get(col, 0.0) for col in columns] for fv in feature_vectors],
+        dtype=np.float64,
+    ).reshape(-1, len(columns))
+
+
+def _predict_proba(model, X: np.ndarray) -> np.ndarray:
     """
-    Runs ML prediction using posture-quality features only.
+    One predict_proba pass over a plain array
 
-    IMPORTANT:
-    - This model classifies posture quality (Good / Okay / Bad)
-    - It does NOT measure confidence or data reliability
+    A CompiledModel is plain NumPy. A scikit-learn pipeline was fit on a
+    DataFrame, so sklearn warns about the missing column names; the
+    columns are in the model's feature order, which is exactly what
+    those names would check.
     """
+    if isinstance(model, CompiledModel):
+        return model.predict_proba(X)
+    with warnings.catch_warnings():
+        warnings.filterwarnings("ignore", message="X does not have valid feature names")
+        return model.predict_proba(X)
 
-    model = load_model()
 
-    # ---- Posture-quality features ONLY ----
-    FEATURE_COLUMNS = [
-        "head_dev_deg",
-        "torso_dev_deg",
-    ]
+def _score(loaded, X: np.ndarray) -> dict:
+    classes = loaded.model.classes_
+    if len(X) == 0:
+        return {
+            "labels": classes[:0],
+            "confidence": np.empty(0),
+            "probabilities": np.empty((0, len(classes))),
+            "classes": classes,
+            "model_version": loaded.version,
+            "feature_columns": loaded.feature_columns,
+        }
 
-    row = {
-        col: feature_vector.get(col, 0.0)
-        for col in FEATURE_COLUMNS
+    probs = _predict_proba(loaded.model, X)
+    best = probs.argmax(axis=1)
+    return {
+        "labels": classes[best],
+        "confidence": probs[np.arange(len(X)), best],
+        "probabilities": probs,
+        "classes": classes,
+        "model_version": loaded.version,
+        "feature_columns": loaded.feature_columns,
     }
 
-    features = pd.DataFrame([row], columns=FEATURE_COLUMNS)
 
-    label = model.predict(features)[0]
-    probs = model.predict_proba(features)[0]
+def predict_posture_batch(features) -> dict:
+    """
+    Posture-quality predictions for many feature vectors at once
+
+    `features` is an (n, k) array in the serving model's feature_columns
+    order, or a list of feature_vector dicts. Labels come from the same
+    predict_proba pass as the probabilities (argmax), so the pipeline
+    runs once.
+
+    Returns arrays: labels (n,), confidence (n,), probabilities (n, k)
+    with columns in `classes` order, plus the model_version and
+    feature_columns used. With
+    a shadow model published, it scores the same rows and "shadow"
+    holds its labels; disagreements are recorded in the registry.
+    """
+    active = registry.current()
+    shadow = registry.shadow()
+
+    if isinstance(features, np.ndarray):
+        X = features.astype(np.float64, copy=False).reshape(-1, len(active.feature_columns))
+        rows = None
+    else:
+        rows = list(features)
+        X = feature_matrix(rows, active.feature_columns)
+
+    result = _score(active, X)
+
+    if shadow is not None and len(X):
+        try:
+            if shadow.feature_columns == active.feature_columns:
+                X_shadow = X
+            elif rows is not None:
+                X_shadow = feature_matrix(rows, shadow.feature_columns)
+            else:
+                # An array only carries the serving model's columns
+                X_shadow = None
+            if X_shadow is not None:
+                shadowed = _score(shadow, X_shadow)
+                registry.record_shadow(active, shadow, result["labels"], shadowed["labels"], X)
+                result["shadow"] = shadowed
+        except Exception as e:
+            # The shadow must never affect served predictions
+            print("[ML] Shadow prediction failed:", e)
+
+    return result
+
+
+def predict_posture(feature_vector: dict):
+    """
+    Runs ML prediction using posture-quality features only.
+
+    IMPORTANT:
+    - This model classifies posture quality (Good / Okay / Bad)
+    - It does NOT measure confidence or data reliability
+    """
+    batch = predict_posture_batch([feature_vector])
+    probs = batch["probabilities"][0]
 
-    classes = list(model.classes_)
     prob_map = {
-        cls: float(prob)
-        for cls, prob in zip(classes, probs)
+        str(cls): float(prob)
+        for cls, prob in zip(batch["classes"], probs)
     }
 
-    return {
-        "label": label,
-        "confidence": float(max(probs)),
+    result = {
+        "label": str(batch["labels"][0]),
+        "confidence": float(batch["confidence"][0]),
         "probabilities": prob_map,
-        "features_used": FEATURE_COLUMNS,
+        "features_used": batch["feature_columns"],
+        "model_version": batch["model_version"],
     }
+    if "shadow" in batch:
+        shadow = batch["shadow"]
+        result["shadow"] = {
+            "model_version": shadow["model_version"],
+            "label": str(shadow["labels"][0]),
+            "confidence": float(shadow["confidence"][0]),
+        }
+    return result
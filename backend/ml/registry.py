@@ -0,0 +1,299 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from ml.compiled import CompiledModel, export_pipeline
+
+# ============================================================
+# Configuration
+# ============================================================
+
+MODEL_DIR = os.getenv(
+    "MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "models"),
+)
+
+# Manifest of published versions: which one serves, which one shadows
+REGISTRY_FILE = "registry.json"
+
+# Served when no model has been published through the registry yet
+LEGACY_MODEL_FILE = "posture_model.joblib"
+LEGACY_COMPILED_FILE = "posture_model.npz"
+LEGACY_FEATURE_COLUMNS = ["head_dev_deg", "torso_dev_deg"]
+
+# "compiled" serves the NumPy-only export of a version when it has one
+# (no joblib / scikit-learn import); "joblib" always loads the pipeline
+MODEL_BACKEND = os.getenv("MODEL_BACKEND", "compiled")
+
+# How often (at most) a serving process checks for a new version
+MODEL_RELOAD_SEC = float(os.getenv("MODEL_RELOAD_SEC", "30"))
+
+# Recent shadow disagreements kept for inspection
+SHADOW_SAMPLES = 100
+
+
+class LoadedModel:
+    """One model version in memory; never mutated once loaded"""
+
+    def __init__(self, version: str, model, meta: dict):
+        self.version = version
+        self.model = model
+        self.meta = meta
+        self.feature_columns = list(meta.get("feature_columns") or LEGACY_FEATURE_COLUMNS)
+        self.backend = "compiled" if isinstance(model, CompiledModel) else "joblib"
+
+
+def _load_file(models_dir: str, joblib_file: str, compiled_file: str = None, backend: str = MODEL_BACKEND):
+    if backend == "compiled" and compiled_file and os.path.exists(os.path.join(models_dir, compiled_file)):
+        return CompiledModel.load(os.path.join(models_dir, compiled_file))
+
+    import joblib
+
+    return joblib.load(os.path.join(models_dir, joblib_file))
+
+
+# ============================================================
+# Publishing (training side)
+# ============================================================
+
+def read_manifest(models_dir: str = MODEL_DIR):
+    try:
+        with open(os.path.join(models_dir, REGISTRY_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_manifest(manifest: dict, models_dir: str):
+    path = os.path.join(models_dir, REGISTRY_FILE)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def publish(
+    model,
+    feature_columns: list,
+    dataset_hash: str,
+    metrics: dict,
+    models_dir: str = MODEL_DIR,
+    role: str = "current",
+) -> str:
+    """
+    Saves a trained model as a new version and points `role` at it
+
+    role is "current" (serve it) or "shadow" (score alongside the
+    current model without affecting results). The model files are fully
+    written before the manifest names them, so a serving process never
+    sees a half-written version. Supported pipelines are also exported
+    as plain arrays (ml.compiled) next to the joblib file.
+    """
+    import joblib
+
+    if role not in ("current", "shadow"):
+        raise ValueError("role must be 'current' or 'shadow'")
+
+    os.makedirs(models_dir, exist_ok=True)
+    manifest = read_manifest(models_dir) or {"current": None, "shadow": None, "versions": {}}
+
+    version = base = time.strftime("%Y%m%dT%H%M%S", time.gmtime()) + "-" + dataset_hash[:8]
+    n = 1
+    while version in manifest["versions"]:
+        n += 1
+        version = f"{base}.{n}"
+    filename = f"posture_model-{version}.joblib"
+
+    tmp = os.path.join(models_dir, f"{filename}.tmp")
+    joblib.dump(model, tmp)
+    os.replace(tmp, os.path.join(models_dir, filename))
+
+    compiled = f"posture_model-{version}.npz"
+    try:
+        export_pipeline(model, feature_columns, os.path.join(models_dir, compiled))
+    except ValueError:
+        compiled = None
+
+    manifest["versions"][version] = {
+        "file": filename,
+        "compiled": compiled,
+        "feature_columns": list(feature_columns),
+        "dataset_sha256": dataset_hash,
+        "metrics": metrics,
+        "classes": [str(c) for c in getattr(model, "classes_", [])],
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    manifest[role] = version
+    _write_manifest(manifest, models_dir)
+    return version
+
+
+# ============================================================
+# Serving side
+# ============================================================
+
+class ModelRegistry:
+    """
+    The model (and optional shadow model) a serving process predicts with
+
+    current() is a plain attribute read, so predictions never wait on a
+    reload: at most once per `check_sec` one caller stats the manifest,
+    and if it changed loads the new version(s) and swaps the reference.
+    Predictions already running keep the LoadedModel they started with.
+    """
+
+    def __init__(self, models_dir: str = MODEL_DIR, check_sec: float = MODEL_RELOAD_SEC):
+        self.models_dir = models_dir
+        self.check_sec = check_sec
+        self._active = None
+        self._shadow = None
+        self._stamp = None
+        self._checked_at = 0.0
+        self._reload_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self.reloads = 0
+        self.reload_errors = 0
+        self.shadow_scored = 0
+        self.shadow_disagreed = 0
+        self.disagreements = deque(maxlen=SHADOW_SAMPLES)
+
+    # ---------- loading ----------
+    def _stat(self, name: str):
+        try:
+            st = os.stat(os.path.join(self.models_dir, name))
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _source_stamp(self):
+        """Changes whenever the manifest (or, without one, either legacy file) is replaced"""
+        manifest = self._stat(REGISTRY_FILE)
+        if manifest is not None:
+            return REGISTRY_FILE, manifest
+        legacy = self._stat(LEGACY_MODEL_FILE), self._stat(LEGACY_COMPILED_FILE)
+        if legacy == (None, None):
+            return None
+        return LEGACY_MODEL_FILE, legacy
+
+    def _load_legacy(self) -> LoadedModel:
+        """
+        The unversioned model files
+
+        The compiled export is only served while it is at least as new
+        as the joblib file; after the joblib is retrained it is exported
+        again (or, if that fails, the joblib pipeline is served).
+        """
+        joblib_stat = self._stat(LEGACY_MODEL_FILE)
+        compiled_stat = self._stat(LEGACY_COMPILED_FILE)
+        compiled = LEGACY_COMPILED_FILE
+        if joblib_stat is not None and (compiled_stat is None or compiled_stat[0] < joblib_stat[0]):
+            compiled = None
+            if MODEL_BACKEND == "compiled":
+                import joblib
+
+                pipeline = joblib.load(os.path.join(self.models_dir, LEGACY_MODEL_FILE))
+                try:
+                    export_pipeline(
+                        pipeline, LEGACY_FEATURE_COLUMNS, os.path.join(self.models_dir, LEGACY_COMPILED_FILE)
+                    )
+                    compiled = LEGACY_COMPILED_FILE
+                except (ValueError, OSError) as e:
+                    print("[ML] Serving the legacy joblib model, compiled export failed:", e)
+                    return LoadedModel("legacy", pipeline, {"file": LEGACY_MODEL_FILE})
+        model = _load_file(self.models_dir, LEGACY_MODEL_FILE, compiled)
+        return LoadedModel("legacy", model, {"file": LEGACY_MODEL_FILE})
+
+    def _load_version(self, manifest: dict, version: str, loaded: dict) -> LoadedModel:
+        if version in loaded:
+            return loaded[version]
+        meta = manifest["versions"][version]
+        model = _load_file(self.models_dir, meta["file"], meta.get("compiled"))
+        return LoadedModel(version, model, meta)
+
+    def _load(self):
+        manifest = read_manifest(self.models_dir)
+        if manifest is None:
+            return self._load_legacy(), None
+
+        # Versions already in memory are reused, not loaded again
+        loaded = {m.version: m for m in (self._active, self._shadow) if m is not None}
+        active = self._load_version(manifest, manifest["current"], loaded)
+        shadow = None
+        if manifest.get("shadow") and manifest["shadow"] != manifest["current"]:
+            shadow = self._load_version(manifest, manifest["shadow"], loaded)
+        return active, shadow
+
+    def refresh(self, force: bool = False):
+        """Swaps in a newly published version if the manifest changed"""
+        now = time.monotonic()
+        if not force and self._active is not None and now - self._checked_at < self.check_sec:
+            return
+        # Only one thread checks; the others carry on with the current model
+        if not self._reload_lock.acquire(blocking=self._active is None):
+            return
+        try:
+            self._checked_at = now
+            stamp = self._source_stamp()
+            if stamp == self._stamp and self._active is not None:
+                return
+            try:
+                active, shadow = self._load()
+            except Exception as e:
+                if self._active is None:
+                    raise
+                # Keep serving the last good model
+                self.reload_errors += 1
+                print("[ML] Model reload failed:", e)
+                return
+            self._active, self._shadow = active, shadow
+            # A legacy load may have just re-exported the compiled file itself
+            self._stamp = self._source_stamp() if active.version == "legacy" else stamp
+            self.reloads += 1
+        finally:
+            self._reload_lock.release()
+
+    def current(self) -> LoadedModel:
+        self.refresh()
+        return self._active
+
+    def shadow(self):
+        """The shadow LoadedModel, or None (call after current())"""
+        return self._shadow
+
+    # ---------- shadow bookkeeping ----------
+    def record_shadow(self, active: LoadedModel, shadow: LoadedModel, labels, shadow_labels, rows):
+        disagree = [i for i, (a, b) in enumerate(zip(labels, shadow_labels)) if a != b]
+        with self._stats_lock:
+            self.shadow_scored += len(labels)
+            self.shadow_disagreed += len(disagree)
+            for i in disagree:
+                self.disagreements.append({
+                    "at": time.time(),
+                    "model_version": active.version,
+                    "shadow_version": shadow.version,
+                    "label": str(labels[i]),
+                    "shadow_label": str(shadow_labels[i]),
+                    "features": [float(x) for x in rows[i]],
+                })
+
+    def stats(self) -> dict:
+        active, shadow = self._active, self._shadow
+        with self._stats_lock:
+            return {
+                "model_version": active.version if active else None,
+                "shadow_version": shadow.version if shadow else None,
+                "backend": active.backend if active else None,
+                "feature_columns": active.feature_columns if active else None,
+                "metrics": active.meta.get("metrics") if active else None,
+                "reloads": self.reloads,
+                "reload_errors": self.reload_errors,
+                "shadow_scored": self.shadow_scored,
+                "shadow_disagreed": self.shadow_disagreed,
+                "shadow_disagreement_rate": (
+                    round(self.shadow_disagreed / self.shadow_scored, 4) if self.shadow_scored else 0.0
+                ),
+                "recent_disagreements": list(self.disagreements)[-10:],
+            }
@@ -1,12 +1,23 @@
+import hashlib
 import os
+import sys
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
 from sklearn.pipeline import Pipeline
 from sklearn.linear_model import LogisticRegression
-import joblib
 
-DATASET = os.path.join("..", "data", "posture_dataset.csv")
-MODEL_OUT = os.path.join("..", "models", "posture_model.joblib")
+# Allow running as a script (python ml/train_model.py)
+if __package__ in (None, ""):
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ml.build_dataset import load_dataset
+from ml.registry import publish
+
+# Usage:
+# python ml/train_model.py [--shadow]
+#   --shadow publishes the model to score alongside the serving one
+#   (disagreements are recorded) instead of replacing it
+ROLE = "shadow" if "--shadow" in sys.argv[1:] else "current"
 
 # ---- Posture-quality features ONLY ----
 FEATURES = [
@@ -16,7 +27,7 @@ FEATURES = [
 
 TARGET = "label"
 
-df = pd.read_csv(DATASET)
+df = load_dataset()
 
 X = df[FEATURES]
 y = df[TARGET]
@@ -51,6 +62,15 @@ for i, c in enumerate(classes):
     for feat, w in weights:
         print(f"  {feat:15s} {w:+.4f}")
 
-os.makedirs(os.path.dirname(MODEL_OUT), exist_ok=True)
-joblib.dump(model, MODEL_OUT)
-print(f"\nSaved model to {MODEL_OUT}")
+# ---- Publish a new registry version (serving processes pick it up) ----
+dataset_hash = hashlib.sha256(
+    pd.util.hash_pandas_object(df[FEATURES + [TARGET]], index=False).values.tobytes()
+).hexdigest()
+metrics = {
+    "n_samples": int(len(df)),
+    "train_accuracy": float(model.score(X_train, y_train)),
+    "class_counts": {str(k): int(v) for k, v in y.value_counts().items()},
+}
+
+version = publish(model, FEATURES, dataset_hash, metrics, role=ROLE)
+print(f"\nPublished model {version} as {ROLE}")
@@ -0,0 +1,114 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ============================================================
+# Configuration
+# ============================================================
+
+AWS_REGION = os.getenv("AWS_REGION")
+
+# One client is shared by request threads, history rebuilds
+# (HISTORY_REBUILD_WORKERS) and ranged downloads (S3_DOWNLOAD_WORKERS),
+# so the pool must be larger than botocore's default of 10
+S3_MAX_POOL_CONNECTIONS = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "64"))
+S3_CONNECT_TIMEOUT_SEC = float(os.getenv("S3_CONNECT_TIMEOUT_SEC", "5"))
+S3_READ_TIMEOUT_SEC = float(os.getenv("S3_READ_TIMEOUT_SEC", "30"))
+S3_MAX_ATTEMPTS = int(os.getenv("S3_MAX_ATTEMPTS", "4"))
+
+# Lifetime of presigned URLs, and how much of it must be left for a
+# cached download URL to be handed out again
+PRESIGN_EXPIRES_SEC = int(os.getenv("PRESIGN_EXPIRES_SEC", "600"))
+PRESIGN_MIN_REMAINING_SEC = int(os.getenv("PRESIGN_MIN_REMAINING_SEC", "120"))
+PRESIGN_CACHE_MAX_ENTRIES = int(os.getenv("PRESIGN_CACHE_MAX_ENTRIES", "10000"))
+
+
+def create_s3_client():
+    """The process-wide S3 client: pooled connections, bounded timeouts, retries"""
+    # boto3 alone takes ~0.1s to import; only processes that touch S3 pay it
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        "s3",
+        region_name=AWS_REGION,
+        config=Config(
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+            connect_timeout=S3_CONNECT_TIMEOUT_SEC,
+            read_timeout=S3_READ_TIMEOUT_SEC,
+            retries={"max_attempts": S3_MAX_ATTEMPTS, "mode": "standard"},
+        ),
+    )
+
+
+# ============================================================
+# Presigned download URLs
+# ============================================================
+
+class PresignedUrlCache:
+    """
+    Presigned GET URLs reused per (user, key) until close to expiry
+
+    A cached URL is only returned while at least `min_remaining_sec` of
+    its lifetime is left, so a client always has time to use it. The
+    least recently used entries are dropped past `max_entries`.
+    """
+
+    def __init__(
+        self,
+        s3,
+        bucket: str,
+        expires_sec: int = PRESIGN_EXPIRES_SEC,
+        min_remaining_sec: int = PRESIGN_MIN_REMAINING_SEC,
+        max_entries: int = PRESIGN_CACHE_MAX_ENTRIES,
+    ):
+        self.s3 = s3
+        self.bucket = bucket
+        self.expires_sec = expires_sec
+        self.min_remaining_sec = min(min_remaining_sec, expires_sec // 2)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # (user_id, key) -> (url, expires_at)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.signed = 0
+
+    def download_url(self, user_id: str, key: str) -> str:
+        now = time.time()
+        with self._lock:
+            entry = self.entries.get((user_id, key))
+            if entry is not None and entry[1] - now >= self.min_remaining_sec:
+                self.entries.move_to_end((user_id, key))
+                self.hits += 1
+                return entry[0]
+
+        # Signing is local (no network call), but keep it outside the lock
+        url = self.s3.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=self.expires_sec,
+        )
+        with self._lock:
+            self.entries[(user_id, key)] = (url, now + self.expires_sec)
+            self.entries.move_to_end((user_id, key))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.signed += 1
+        return url
+
+    def forget(self, user_id: str, keys):
+        """Drops cached URLs for deleted objects"""
+        with self._lock:
+            for key in keys:
+                self.entries.pop((user_id, key), None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.signed
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "signed": self.signed,
+                "hitRate": round(self.hits / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,175 @@
+import os
+import struct
+import tempfile
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# Stream uploads into the decoder while they download (when the container allows it)
+STREAMING_INGEST = os.getenv("STREAMING_INGEST", "1") == "1"
+
+# Ranged GET size and how many ranges are in flight at once
+S3_DOWNLOAD_PART_BYTES = int(os.getenv("S3_DOWNLOAD_PART_BYTES", str(8 * 1024 * 1024)))
+S3_DOWNLOAD_WORKERS = int(os.getenv("S3_DOWNLOAD_WORKERS", "8"))
+
+
+# ============================================================
+# Parallel ranged download
+# ============================================================
+
+class RangedDownload:
+    """
+    Downloads an S3 object as parallel ranged GETs, yielded in order
+
+    At most `workers` ranges are in flight, so memory stays bounded at
+    roughly workers * part_bytes however large the object is.
+    """
+
+    def __init__(
+        self,
+        s3,
+        bucket: str,
+        key: str,
+        part_bytes: int = S3_DOWNLOAD_PART_BYTES,
+        workers: int = S3_DOWNLOAD_WORKERS,
+    ):
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.part_bytes = part_bytes
+        self.workers = max(1, workers)
+        self.size = s3.head_object(Bucket=bucket, Key=key)["ContentLength"]
+        self.bytes_read = 0
+
+    def _get(self, start: int, end: int) -> bytes:
+        resp = self.s3.get_object(Bucket=self.bucket, Key=self.key, Range=f"bytes={start}-{end}")
+        return resp["Body"].read()
+
+    def iter_parts(self):
+        ranges = [
+            (start, min(start + self.part_bytes, self.size) - 1)
+            for start in range(0, self.size, self.part_bytes)
+        ]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            window = [pool.submit(self._get, *r) for r in ranges[:self.workers]]
+            next_range = len(window)
+            while window:
+                data = window.pop(0).result()
+                if next_range < len(ranges):
+                    window.append(pool.submit(self._get, *ranges[next_range]))
+                    next_range += 1
+                self.bytes_read += len(data)
+                yield data
+
+
+# ============================================================
+# Container sniffing
+# ============================================================
+
+def is_streamable(head: bytes) -> bool:
+    """
+    Whether a decoder can start on the first bytes of this container
+
+    WebM/Matroska (what MediaRecorder produces) always can. MP4 only can
+    when the `moov` box comes before `mdat` ("faststart"); otherwise
+    the index sits at the end and the whole file is needed.
+    """
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return True
+
+    offset = 0
+    while offset + 8 <= len(head):
+        size, box = struct.unpack(">I4s", head[offset:offset + 8])
+        if size == 1 and offset + 16 <= len(head):
+            size = struct.unpack(">Q", head[offset + 8:offset + 16])[0]
+        if box == b"moov":
+            return True
+        if box == b"mdat" or size < 8:
+            return False
+        offset += size
+    return False
+
+
+# ============================================================
+# Ingest
+# ============================================================
+
+class VideoIngest:
+    """
+    Makes an uploaded video available to the decoder as a local path
+
+    Streamable containers go through a FIFO fed by a background thread,
+    so decoding starts on the first part. Everything else is written to
+    a temp file first. The temp file / FIFO is always removed on exit.
+
+        with VideoIngest(s3, bucket, key) as source:
+            analyze(source.path, streaming=source.streaming)
+    """
+
+    def __init__(self, s3, bucket: str, key: str, allow_streaming: bool = STREAMING_INGEST):
+        self.download = RangedDownload(s3, bucket, key)
+        self.allow_streaming = allow_streaming and hasattr(os, "mkfifo")
+        self.path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}.video")
+        self.streaming = False
+        self._feeder = None
+        self._feed_error = None
+
+    def __enter__(self):
+        parts = self.download.iter_parts()
+        try:
+            first = next(parts, b"")
+
+            if self.allow_streaming and is_streamable(first):
+                os.mkfifo(self.path)
+                self.streaming = True
+                self._feeder = threading.Thread(target=self._feed, args=(first, parts), daemon=True)
+                self._feeder.start()
+            else:
+                with open(self.path, "wb") as f:
+                    f.write(first)
+                    for data in parts:
+                        f.write(data)
+        except BaseException:
+            self._remove()
+            raise
+        return self
+
+    def _feed(self, first: bytes, parts):
+        try:
+            # Blocks until the decoder opens the FIFO for reading
+            with open(self.path, "wb") as fifo:
+                fifo.write(first)
+                for data in parts:
+                    fifo.write(data)
+        except BrokenPipeError:
+            # Decoder stopped reading early; nothing left to deliver
+            pass
+        except Exception as e:
+            self._feed_error = e
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._feeder is not None:
+            # If the decoder never opened the FIFO, open the read end
+            # ourselves so the feeder's open() returns and it can exit
+            try:
+                fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+                os.close(fd)
+            except OSError:
+                pass
+            self._feeder.join()
+        self._remove()
+
+        # A failed download means the decoder saw a truncated video
+        if exc_type is None and self._feed_error is not None:
+            raise self._feed_error
+        return False
+
+    def _remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
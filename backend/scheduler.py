@@ -0,0 +1,195 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+# ============================================================
+# Configuration
+# ============================================================
+
+# How many analyses may run at the same time (one per warm pose worker)
+ANALYSIS_MAX_CONCURRENCY = int(
+    os.getenv("ANALYSIS_MAX_CONCURRENCY", max(1, (os.cpu_count() or 2) - 1))
+)
+
+# Admission control: total jobs allowed to wait, and per-user share of that
+ANALYSIS_QUEUE_LIMIT = int(os.getenv("ANALYSIS_QUEUE_LIMIT", "32"))
+ANALYSIS_USER_QUEUE_LIMIT = int(os.getenv("ANALYSIS_USER_QUEUE_LIMIT", "8"))
+
+# Finished jobs kept around for status polling
+ANALYSIS_JOB_HISTORY = int(os.getenv("ANALYSIS_JOB_HISTORY", "1000"))
+
+# Seconds a submission rejected by admission control is asked to wait
+# before retrying (Retry-After of the 429)
+ANALYSIS_RETRY_AFTER_SEC = int(os.getenv("ANALYSIS_RETRY_AFTER_SEC", "30"))
+
+
+class QueueFull(Exception):
+    """Raised when a job is rejected by admission control"""
+
+
+class Job:
+    def __init__(self, user_id, args):
+        self.id = str(uuid.uuid4())
+        self.user_id = user_id
+        self.args = args
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            "jobId": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "createdAt": self.created_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+        }
+
+
+class JobScheduler:
+    """
+    Bounded, per-user fair job queue in front of the analysis workers
+
+    - At most `max_concurrency` jobs run at once
+    - Waiting jobs are served round-robin across users, so one heavy
+      uploader can't starve everyone else
+    - Submissions beyond the queue limits raise QueueFull
+    """
+
+    def __init__(
+        self,
+        handler,
+        max_concurrency: int = ANALYSIS_MAX_CONCURRENCY,
+        max_queued: int = ANALYSIS_QUEUE_LIMIT,
+        max_per_user: int = ANALYSIS_USER_QUEUE_LIMIT,
+        history: int = ANALYSIS_JOB_HISTORY,
+    ):
+        self.handler = handler
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.max_queued = max_queued
+        self.max_per_user = max_per_user
+        self.history = history
+
+        # user_id -> deque of waiting jobs, in round-robin order
+        self._queues = OrderedDict()
+        self._queued = 0
+        self._running = 0
+        self._jobs = OrderedDict()
+        self._cond = threading.Condition()
+        self._threads = []
+
+    # ---------- Submission ----------
+    def submit(self, user_id, *args) -> Job:
+        with self._cond:
+            user_q = self._queues.get(user_id)
+            if self._queued >= self.max_queued:
+                raise QueueFull("Analysis queue is full")
+            if user_q is not None and len(user_q) >= self.max_per_user:
+                raise QueueFull("Too many queued analyses for this user")
+
+            job = Job(user_id, args)
+            if user_q is None:
+                user_q = self._queues[user_id] = deque()
+            user_q.append(job)
+            self._queued += 1
+            self._remember(job)
+
+            self._ensure_workers()
+            self._cond.notify()
+            return job
+
+    # ---------- Status ----------
+    def get(self, job_id, user_id=None):
+        """Status dict of a job, or None if unknown (or, with `user_id`, not theirs)"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None or (user_id is not None and job.user_id != user_id):
+                return None
+            info = job.to_dict()
+            if job.status == "queued":
+                info["position"] = self._position(job)
+            return info
+
+    def stats(self):
+        with self._cond:
+            return {
+                "queued": self._queued,
+                "running": self._running,
+                "maxConcurrency": self.max_concurrency,
+                "maxQueued": self.max_queued,
+            }
+
+    def _position(self, job):
+        """1-based position of a waiting job in round-robin dispatch order"""
+        queues = [list(q) for q in self._queues.values()]
+        pos = 0
+        depth = 0
+        while True:
+            advanced = False
+            for q in queues:
+                if depth < len(q):
+                    advanced = True
+                    pos += 1
+                    if q[depth] is job:
+                        return pos
+            if not advanced:
+                return None
+            depth += 1
+
+    def _remember(self, job):
+        self._jobs[job.id] = job
+        # Evict the oldest finished jobs once history is full
+        while len(self._jobs) > self.history + self._queued + self._running:
+            for old_id, old in self._jobs.items():
+                if old.status in ("done", "failed"):
+                    del self._jobs[old_id]
+                    break
+            else:
+                break
+
+    # ---------- Dispatch ----------
+    def _ensure_workers(self):
+        while len(self._threads) < self.max_concurrency:
+            t = threading.Thread(target=self._worker, daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def _next_job(self):
+        user_id, user_q = next(iter(self._queues.items()))
+        job = user_q.popleft()
+        del self._queues[user_id]
+        if user_q:
+            # User goes to the back of the line for its next job
+            self._queues[user_id] = user_q
+        self._queued -= 1
+        return job
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queues:
+                    self._cond.wait()
+                job = self._next_job()
+                job.status = "running"
+                job.started_at = time.time()
+                self._running += 1
+
+            try:
+                result = self.handler(job.user_id, *job.args)
+                status, error = "done", None
+            except Exception as e:
+                result, status, error = None, "failed", str(e)
+
+            with self._cond:
+                job.result = result
+                job.error = error
+                job.status = status
+                job.finished_at = time.time()
+                self._running -= 1
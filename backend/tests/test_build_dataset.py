@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ml.build_dataset import LocalAnalyses, build_dataset, read_columns  # noqa: E402
+
+
+def write_analysis(folder, name, label="Good", head=10.0):
+    path = os.path.join(folder, name)
+    with open(path, "w") as f:
+        json.dump({"weak_label": label, "overall_score": 80, "feature_vector": {"head_dev_deg": head}}, f)
+    # LocalAnalyses versions files by mtime and size
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+@pytest.fixture
+def paths(tmp_path):
+    src = tmp_path / "analyses"
+    src.mkdir()
+    return str(src), str(tmp_path / "dataset"), str(tmp_path / "manifest.json")
+
+
+def build(paths, **kwargs):
+    src, dataset, manifest = paths
+    return build_dataset(LocalAnalyses(src), dataset, manifest, workers=4, **kwargs)
+
+
+def rows(paths):
+    _, dataset, manifest = paths
+    columns = read_columns(dataset, manifest)
+    return dict(zip(columns["source_file"].tolist(), columns["head_dev_deg"].tolist()))
+
+
+def test_incremental_build_writes_only_new_rows(paths):
+    src, dataset, _ = paths
+    for i in range(20):
+        write_analysis(src, f"a{i:02d}.json")
+    assert build(paths)["added"] == 20
+
+    write_analysis(src, "new.json", head=3.0)
+    stats = build(paths)
+    assert (stats["fetched"], stats["added"], stats["rows"]) == (1, 1, 21)
+    newest = sorted(os.listdir(dataset))[-1]
+    with np.load(os.path.join(dataset, newest)) as shard:
+        assert shard["source_file"].tolist() == ["new.json"]
+
+    stats = build(paths)
+    assert stats["fetched"] == 0
+    assert rows(paths)["new.json"] == 3.0
+
+
+def test_changed_and_deleted_analyses_are_superseded(paths):
+    src, _, _ = paths
+    for i in range(10):
+        write_analysis(src, f"a{i}.json")
+    build(paths)
+
+    write_analysis(src, "a1.json", head=42.0)
+    write_analysis(src, "a2.json", label="Unknown")
+    os.remove(os.path.join(src, "a3.json"))
+    stats = build(paths)
+
+    current = rows(paths)
+    assert stats["rows"] == len(current) == 8
+    assert current["a1.json"] == 42.0
+    assert "a2.json" not in current and "a3.json" not in current
+
+
+def test_compaction_keeps_live_rows(paths):
+    src, dataset, _ = paths
+    write_analysis(src, "a.json")
+    write_analysis(src, "b.json")
+    build(paths)
+    for head in (1.0, 2.0, 3.0):
+        write_analysis(src, "a.json", head=head)
+        stats = build(paths)
+
+    assert stats["compacted"]
+    assert stats["shards"] == len(os.listdir(dataset)) == 1
+    assert rows(paths) == {"a.json": 3.0, "b.json": 10.0}
+
+
+def test_full_rebuild_replaces_shards(paths):
+    src, dataset, _ = paths
+    for i in range(3):
+        write_analysis(src, f"a{i}.json")
+    build(paths)
+    write_analysis(src, "a3.json")
+    build(paths)
+
+    stats = build(paths, full=True)
+    assert stats["rows"] == 4
+    assert stats["shards"] == len(os.listdir(dataset)) == 1
+    assert len(rows(paths)) == 4
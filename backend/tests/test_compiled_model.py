@@ -0,0 +1,67 @@
+import warnings
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sklearn")
+
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+from sklearn.pipeline import Pipeline  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+from ml.compiled import CompiledModel, export_pipeline  # noqa: E402
+
+COLUMNS = ["head_dev_deg", "torso_dev_deg"]
+
+
+def training_data(n_classes: int):
+    rng = np.random.default_rng(n_classes)
+    X = np.column_stack([rng.uniform(0, 60, 300), rng.uniform(0, 30, 300)])
+    labels = np.array(["Good", "Okay", "Bad"][:n_classes])
+    y = labels[np.minimum((X[:, 0] + X[:, 1] + rng.normal(0, 5, 300)) // (90 / n_classes), n_classes - 1).astype(int)]
+    return X, y
+
+
+def probe_rows():
+    rng = np.random.default_rng(1)
+    return np.vstack([
+        np.column_stack([rng.uniform(0, 90, 2000), rng.uniform(0, 45, 2000)]),
+        # Far outside the training range, where the logistic / softmax saturates
+        rng.normal(0, 1e3, (200, 2)),
+    ])
+
+
+@pytest.mark.parametrize(
+    "n_classes, clf, kind",
+    [
+        (2, LogisticRegression(max_iter=2000), "binary"),
+        (3, LogisticRegression(max_iter=2000, class_weight="balanced"), "multinomial"),
+        (3, LogisticRegression(solver="liblinear"), "ovr"),
+    ],
+    ids=["binary", "multinomial", "liblinear-ovr"],
+)
+def test_compiled_matches_sklearn(tmp_path, n_classes, clf, kind):
+    X, y = training_data(n_classes)
+    with warnings.catch_warnings():
+        # scikit-learn deprecates multiclass liblinear; still what older models used
+        warnings.simplefilter("ignore", FutureWarning)
+        pipeline = Pipeline([("scaler", StandardScaler()), ("clf", clf)]).fit(X, y)
+    path = str(tmp_path / "model.npz")
+    export_pipeline(pipeline, COLUMNS, path)
+    compiled = CompiledModel.load(path)
+
+    assert compiled.kind == kind
+    rows = np.vstack([X, probe_rows()])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        expected_proba = pipeline.predict_proba(rows)
+        expected_labels = pipeline.predict(rows)
+    np.testing.assert_allclose(compiled.predict_proba(rows), expected_proba, rtol=1e-9, atol=1e-12)
+    np.testing.assert_array_equal(compiled.predict(rows), expected_labels)
+    assert list(compiled.classes_) == list(pipeline.classes_)
+
+
+def test_unsupported_estimator_is_rejected(tmp_path):
+    X, y = training_data(2)
+    with pytest.raises(ValueError):
+        export_pipeline(LogisticRegression().fit(X, y), COLUMNS, str(tmp_path / "model.npz"))
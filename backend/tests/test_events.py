@@ -0,0 +1,60 @@
+import time
+
+from events import EventLog, SQLiteEventLog, parse_event_id
+
+
+def test_fresh_subscribe_sees_nothing_old():
+    log = EventLog()
+    log.publish("u", {"type": "analysis_complete", "title": "a"})
+    log.publish("u", {"type": "analysis_complete", "title": "b"})
+
+    sub = log.subscribe("u")
+    assert sub.next(0.05) == []
+
+    event_id = log.publish("u", {"type": "analysis_complete", "title": "c"})
+    assert sub.next(0.05) == [(event_id, {"type": "analysis_complete", "title": "c"})]
+
+
+def test_resume_replays_only_missed_events():
+    log = EventLog()
+    first = log.publish("u", {"n": 1})
+    log.publish("u", {"n": 2})
+    log.publish("u", {"n": 3})
+
+    sub = log.subscribe("u", after=first)
+    assert [event["n"] for _, event in sub.next(0.05)] == [2, 3]
+
+
+def test_unknown_newer_id_replays_buffer():
+    # e.g. a Last-Event-ID from before a server restart
+    log = EventLog()
+    log.publish("u", {"n": 1})
+
+    sub = log.subscribe("u", after=99)
+    assert [event["n"] for _, event in sub.next(0.05)] == [1]
+
+
+def test_resubscribing_does_not_keep_idle_channel():
+    log = EventLog(ttl_sec=0.05)
+    log.publish("u", {"n": 1})
+    time.sleep(0.1)
+
+    for _ in range(3):
+        log.subscribe("u").close()
+    log._sweep(time.time())
+    assert log.stats()["users"] == 0
+
+
+def test_sqlite_fresh_subscribe_sees_nothing_old(tmp_path):
+    log = SQLiteEventLog(path=str(tmp_path / "events.sqlite3"), poll_sec=0.01)
+    log.publish("u", {"n": 1})
+    time.sleep(0.05)
+
+    sub = log.subscribe("u")
+    assert sub.next(0.05) == []
+
+
+def test_parse_event_id():
+    assert parse_event_id("7") == 7
+    assert parse_event_id(None) is None
+    assert parse_event_id("nope") is None
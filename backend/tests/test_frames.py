@@ -0,0 +1,40 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+from analysis.frames import PipelinedFrames  # noqa: E402
+from analysis.sampling import FixedSampler  # noqa: E402
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 30, (64, 48))
+    for i in range(120):
+        writer.write(np.full((48, 64, 3), i, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_pipelined_close_joins_decoder_before_release(video):
+    cap = cv2.VideoCapture(video)
+    frames = PipelinedFrames(cap, FixedSampler(2), ring_size=2)
+    with pytest.raises(RuntimeError):
+        try:
+            for index, _ in frames:
+                if index > 10:
+                    raise RuntimeError("inference failed")
+        finally:
+            frames.close()
+            assert not frames._thread.is_alive()
+            cap.release()
+
+
+def test_pipelined_reads_whole_video(video):
+    cap = cv2.VideoCapture(video)
+    frames = PipelinedFrames(cap, FixedSampler(2), ring_size=2)
+    indices = [index for index, _ in frames]
+    frames.close()
+    cap.release()
+    assert indices == list(range(2, 121, 2))
@@ -0,0 +1,34 @@
+import math
+
+import pytest
+
+from live_sessions import LiveSessions
+
+
+def _upright():
+    # Shoulders straight above hips, everything visible
+    points = [[0.5, 0.5, 0.0, 1.0] for _ in range(33)]
+    for i, (x, y) in {11: (0.45, 0.3), 12: (0.55, 0.3), 23: (0.45, 0.7), 24: (0.55, 0.7)}.items():
+        points[i] = [x, y, 0.0, 1.0]
+    return points
+
+
+@pytest.mark.parametrize("t", [math.nan, math.inf, -math.inf, True, "1.0", None])
+def test_push_rejects_non_finite_or_non_numeric_t(t):
+    sessions = LiveSessions()
+    session = sessions.create("u")
+    with pytest.raises(ValueError):
+        sessions.push(session, [{"t": 0.0, "landmarks": _upright()}, {"t": t, "landmarks": _upright()}])
+
+    # Nothing of the rejected batch reached the window
+    assert session.window.frames_received == 0
+
+
+def test_push_scores_the_window():
+    sessions = LiveSessions()
+    session = sessions.create("u", window_sec=5)
+    result = sessions.push(session, [{"t": i / 10, "landmarks": _upright()} for i in range(20)])
+
+    assert result["accepted"] == 20
+    assert result["window"]["frames"] == 20
+    assert math.isfinite(result["overall_score"])
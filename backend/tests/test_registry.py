@@ -0,0 +1,43 @@
+import os
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+joblib = pytest.importorskip("joblib")
+pytest.importorskip("sklearn")
+
+from sklearn.linear_model import LogisticRegression  # noqa: E402
+from sklearn.pipeline import Pipeline  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+from ml.compiled import export_pipeline  # noqa: E402
+from ml.registry import LEGACY_COMPILED_FILE, LEGACY_FEATURE_COLUMNS, LEGACY_MODEL_FILE, ModelRegistry  # noqa: E402
+
+
+def fit(flip: bool):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 2))
+    y = np.where((X[:, 0] > 0) != flip, "Good", "Bad")
+    return Pipeline([("scaler", StandardScaler()), ("clf", LogisticRegression())]).fit(X, y)
+
+
+def test_retrained_legacy_joblib_replaces_stale_compiled_export(tmp_path):
+    models = str(tmp_path)
+    joblib.dump(fit(flip=False), os.path.join(models, LEGACY_MODEL_FILE))
+    export_pipeline(fit(flip=False), LEGACY_FEATURE_COLUMNS, os.path.join(models, LEGACY_COMPILED_FILE))
+
+    registry = ModelRegistry(models, check_sec=0)
+    X = np.array([[2.0, 0.0]])
+    assert registry.current().model.predict(X)[0] == "Good"
+
+    # Retrained: only the joblib file changes
+    time.sleep(0.01)
+    joblib.dump(fit(flip=True), os.path.join(models, LEGACY_MODEL_FILE))
+
+    loaded = registry.current()
+    assert loaded.backend == "compiled"
+    assert loaded.model.predict(X)[0] == "Bad"
+    reloads = registry.reloads
+    registry.current()
+    assert registry.reloads == reloads
@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded on first use only (see lazy.py and benchmarks/bench_startup.py)
+DEFERRED_MODULES = ["boto3", "botocore", "requests", "numpy", "pandas", "sklearn", "joblib", "cv2", "mediapipe"]
+
+
+def imported_after(module: str) -> list:
+    """Deferred modules present in sys.modules after `import module` in a fresh interpreter"""
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps(sorted(m for m in {DEFERRED_MODULES!r} if m in sys.modules)))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("module", ["app", "asgi"])
+def test_import_defers_heavy_dependencies(module):
+    if module == "asgi":
+        pytest.importorskip("starlette")
+        pytest.importorskip("aiohttp")
+    assert imported_after(module) == []
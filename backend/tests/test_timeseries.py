@@ -0,0 +1,60 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analysis.accumulator import PostureAccumulator  # noqa: E402
+from analysis.timeseries import load_series, write_series  # noqa: E402
+
+ANGLE_FEATURES = ("head_angle_mean_deg", "torso_angle_mean_deg", "head_dev_deg", "torso_dev_deg", "stability_std_dev_deg")
+
+
+def posture_frames(seed: int, n: int = 2000) -> np.ndarray:
+    """A steady pose with per-frame jitter, like a player at the instrument"""
+    rng = np.random.default_rng(seed)
+    base = rng.uniform(0.2, 0.8, (33, 4)).astype(np.float32)
+    base[:, 3] = 0.9
+    return (base + rng.normal(0, 0.02, (n, 33, 4))).astype(np.float32)
+
+
+def score(lms, fps=30.0):
+    posture = PostureAccumulator(fps)
+    posture.add_batch(np.asarray(lms, dtype=np.float32))
+    posture.total_frames = posture.sampled_frames = len(lms)
+    return posture.score()
+
+
+def test_round_trip_memory_maps_without_side_effects(tmp_path):
+    path = str(tmp_path / "v.landmarks.npz")
+    lms = posture_frames(0, 50)
+    write_series(path, np.arange(2, 101, 2), lms, 30.0, meta={"total_frames": 100})
+
+    series = load_series(path)
+    assert os.listdir(tmp_path) == ["v.landmarks.npz"]
+    assert isinstance(series["landmarks"], np.memmap)
+    assert series["meta"]["total_frames"] == 100
+    np.testing.assert_array_equal(series["landmarks"], load_series(path, mmap=False)["landmarks"])
+    np.testing.assert_array_equal(series["frame_index"], np.arange(2, 101, 2))
+
+
+def test_timestamps_start_at_zero(tmp_path):
+    path = str(tmp_path / "v.landmarks.npz")
+    write_series(path, np.array([1, 2, 31]), posture_frames(0, 3), 30.0)
+    np.testing.assert_allclose(load_series(path)["t"], [0.0, 1 / 30, 1.0])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_recompute_from_float16_is_within_tolerance(tmp_path, seed):
+    path = str(tmp_path / "v.landmarks.npz")
+    lms = posture_frames(seed)
+    write_series(path, np.arange(1, len(lms) + 1), lms, 30.0)
+
+    original = score(lms)
+    recomputed = score(load_series(path)["landmarks"])
+
+    for name in ANGLE_FEATURES:
+        assert recomputed["feature_vector"][name] == pytest.approx(original["feature_vector"][name], abs=0.05)
+    assert recomputed["head_var"] == pytest.approx(original["head_var"], rel=0.01)
+    assert recomputed["quality"] == pytest.approx(original["quality"], abs=1e-3)
+    assert abs(recomputed["overall_score"] - original["overall_score"]) <= 1
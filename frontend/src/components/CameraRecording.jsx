@@ -192,7 +192,7 @@ export default function CameraRecording({ stream }) {
 
     } catch (err) {
       console.error(err);
-      setStatus("Upload or analysis failed.");
+      setStatus(err.userMessage || "Upload or analysis failed.");
     }
   };
 
@@ -21,23 +21,29 @@ function ChatBox() {
     setInput("");
     setLoading(true);
 
+    // Index of the assistant reply once its placeholder is added; every
+    // update targets that entry, never "the last message"
+    const slot = newMessages.length;
+    let reply = "";
+    let streaming = false;
+
+    const showReply = (content) => {
+      setMessages((prev) =>
+        prev.map((msg, i) => (i === slot ? { ...msg, content } : msg))
+      );
+    };
+
     try {
       const response = await fetch(
         `${import.meta.env.VITE_API_BASE_URL}/api/chat`,
         {
           method: "POST",
           headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ messages: newMessages }),
+          body: JSON.stringify({ messages: newMessages, stream: true }),
         }
       );
 
-      const data = await response.json();
-      if (response.ok && data.reply) {
-        setMessages((prev) => [
-          ...prev,
-          { role: "assistant", content: data.reply },
-        ]);
-      } else {
+      if (!response.ok || !response.body) {
         setMessages((prev) => [
           ...prev,
           {
@@ -45,13 +51,57 @@ function ChatBox() {
             content: "Sorry — something went wrong getting a response.",
           },
         ]);
+        setLoading(false);
+        return;
+      }
+
+      // Empty until the first token (hidden while "AI is typing…" shows)
+      setMessages((prev) => [...prev, { role: "assistant", content: "" }]);
+      streaming = true;
+
+      // Tokens arrive as SSE events: {delta}, then {done} or {error}
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      let failed = false;
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        const events = buffer.split("\n\n");
+        buffer = events.pop();
+        for (const raw of events) {
+          if (!raw.startsWith("data: ")) continue;
+          const event = JSON.parse(raw.slice(6));
+          if (event.delta) {
+            if (!reply) setLoading(false);
+            reply += event.delta;
+            showReply(reply);
+          } else if (event.error) {
+            failed = true;
+          }
+        }
+      }
+
+      if (!reply) {
+        showReply("Sorry — something went wrong getting a response.");
+      } else if (failed) {
+        showReply(`${reply}\n\n⚠️ The response was cut off. Please try again.`);
       }
     } catch (err) {
       console.error(err);
-      setMessages((prev) => [
-        ...prev,
-        { role: "assistant", content: "Network error. Please try again." },
-      ]);
+      if (!streaming) {
+        setMessages((prev) => [
+          ...prev,
+          { role: "assistant", content: "Network error. Please try again." },
+        ]);
+      } else if (reply) {
+        showReply(`${reply}\n\n⚠️ Network error, the response was cut off.`);
+      } else {
+        showReply("Network error. Please try again.");
+      }
     }
 
     setLoading(false);
@@ -95,6 +145,8 @@ function ChatBox() {
 
         {messages.map((msg, idx) => {
           const isUser = msg.role === "user";
+          // Reply placeholder before its first token
+          if (!isUser && !msg.content) return null;
           return (
             <div
               key={idx}
@@ -3,7 +3,14 @@ import { Pose } from "@mediapipe/pose";
 import { Camera } from "@mediapipe/camera_utils";
 import { drawConnectors, drawLandmarks } from "@mediapipe/drawing_utils";
 import * as mpPose from "@mediapipe/pose";
+import { getAuth, onAuthStateChanged } from "firebase/auth";
 import { checkRequiredLandmarks } from "../utils/poseUtils";
+import {
+  LIVE_MAX_FRAMES_PER_BATCH,
+  closeLiveSession,
+  pushLiveFrames,
+  startLiveSession,
+} from "../utils/liveSession";
 
 /**
  * Tunable parameters to control responsiveness vs stability of posture
@@ -12,6 +19,7 @@ import { checkRequiredLandmarks } from "../utils/poseUtils";
 const SMOOTHING_WINDOW = 3;        // Rolling average window (~0.5s)
 const GOOD_TORSO_DEVIATION = 6;    // degrees from baseline
 const STATE_THRESHOLD = 1;          // Strength for posture state (good/bad)
+const LIVE_SEND_INTERVAL_MS = 500;  // How often landmark batches go to the backend
 
 // Landmark indices for torso angle calculation
 const LEFT_SHOULDER = 11;
@@ -33,6 +41,99 @@ export default function LivePose({ onStream }) {
   const postureScore = useRef(0);
   const postureState = useRef("bad");
 
+  // Backend live session: landmarks are batched and scored server-side
+  const liveUser = useRef(null);
+  const liveSession = useRef(null);
+  const liveStart = useRef(0);
+  const liveFrames = useRef([]);
+  const liveInFlight = useRef(false);
+  const liveScore = useRef(null);
+
+  /**
+   * Live session lifecycle
+   * One session per signed-in user; frames are flushed on a fixed interval
+   * so the request rate doesn't depend on the camera frame rate
+   */
+  useEffect(() => {
+    const unsubscribe = onAuthStateChanged(getAuth(), (user) => {
+      endLiveSession();
+      if (user) openLiveSession(user.uid);
+    });
+    const timer = setInterval(flushLiveFrames, LIVE_SEND_INTERVAL_MS);
+
+    return () => {
+      unsubscribe();
+      clearInterval(timer);
+      endLiveSession();
+    };
+  }, []);
+
+  function openLiveSession(userId) {
+    liveUser.current = userId;
+    startLiveSession(userId)
+      .then(({ sessionId }) => {
+        // Signed out (or unmounted) while the session was being created
+        if (liveUser.current !== userId) {
+          closeLiveSession(sessionId, userId);
+          return;
+        }
+        liveSession.current = { sessionId, userId };
+        liveStart.current = performance.now();
+        liveFrames.current = [];
+      })
+      .catch((err) => console.warn("Live scoring unavailable:", err));
+  }
+
+  function endLiveSession() {
+    const session = liveSession.current;
+    liveUser.current = null;
+    liveSession.current = null;
+    liveFrames.current = [];
+    liveScore.current = null;
+    if (session) closeLiveSession(session.sessionId, session.userId);
+  }
+
+  async function flushLiveFrames() {
+    const session = liveSession.current;
+    if (!session || liveInFlight.current || liveFrames.current.length === 0) return;
+
+    const frames = liveFrames.current.splice(0, LIVE_MAX_FRAMES_PER_BATCH);
+    liveInFlight.current = true;
+    try {
+      const result = await pushLiveFrames(session.sessionId, session.userId, frames);
+      if (liveSession.current === session) liveScore.current = result;
+    } catch (err) {
+      // Session expired on the server (e.g. tab was in the background): start over
+      if (err.status === 404 && liveSession.current === session) {
+        liveSession.current = null;
+        openLiveSession(session.userId);
+      } else {
+        console.warn("Live frames not sent:", err);
+      }
+    } finally {
+      liveInFlight.current = false;
+    }
+  }
+
+  /**
+   * Queues one processed frame for the backend
+   * Frames without a detected pose are sent too (landmarks: null), they count against coverage
+   */
+  function queueLiveFrame(landmarks) {
+    if (!liveSession.current) return;
+    const buffer = liveFrames.current;
+    buffer.push({
+      t: (performance.now() - liveStart.current) / 1000,
+      landmarks: landmarks
+        ? landmarks.map((p) => [p.x, p.y, p.z, p.visibility])
+        : null,
+    });
+    // Keep only the newest frames if the backend falls behind
+    if (buffer.length > LIVE_MAX_FRAMES_PER_BATCH) {
+      buffer.splice(0, buffer.length - LIVE_MAX_FRAMES_PER_BATCH);
+    }
+  }
+
   useEffect(() => {
     let camera = null;
     let pose = null;
@@ -159,6 +260,20 @@ export default function LivePose({ onStream }) {
     // Draw camera image as background
     ctx.drawImage(results.image, 0, 0, canvas.width, canvas.height);
 
+    queueLiveFrame(results.poseLandmarks);
+
+    // Rolling-window score from the backend (same scoring as uploaded videos)
+    const live = liveScore.current;
+    if (live && live.weak_label !== "Unknown") {
+      ctx.font = "20px Arial";
+      ctx.fillStyle = "white";
+      ctx.fillText(
+        `Score (last ${Math.round(live.window.seconds)}s): ${live.overall_score} - ${live.weak_label}`,
+        20,
+        canvas.height - 20
+      );
+    }
+
     if (results.poseLandmarks) {
       // Visualize skeleton
       drawConnectors(ctx, results.poseLandmarks, mpPose.POSE_CONNECTIONS, {
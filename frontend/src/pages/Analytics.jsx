@@ -22,33 +22,27 @@ export default function Analytics() {
       }
 
       try {
-        // Get presigned video URL
-        const videoRes = await fetch(
-          `${import.meta.env.VITE_API_BASE_URL}/api/download-url`,
+        // Presigned video and analysis URLs in one round-trip
+        const urlsRes = await fetch(
+          `${import.meta.env.VITE_API_BASE_URL}/api/download-urls`,
           {
             method: "POST",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ userId: user.uid, key: videoKey }),
+            body: JSON.stringify({
+              userId: user.uid,
+              keys: [videoKey, analysisKey],
+            }),
           }
         );
-        const videoData = await videoRes.json();
-        if (!videoRes.ok) throw new Error(videoData.error || "Failed to load video URL");
-        setVideoUrl(videoData.downloadUrl);
-
-        // Get presigned analysis URL
-        const analysisRes = await fetch(
-          `${import.meta.env.VITE_API_BASE_URL}/api/download-url`,
-          {
-            method: "POST",
-            headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ userId: user.uid, key: analysisKey }),
-          }
-        );
-        const analysisUrlData = await analysisRes.json();
-        if (!analysisRes.ok) throw new Error(analysisUrlData.error || "Failed to load analysis URL");
+        const urlsData = await urlsRes.json();
+        if (!urlsRes.ok) throw new Error(urlsData.error || "Failed to load URLs");
+        const { urls } = urlsData;
+        if (!urls[videoKey]) throw new Error("Failed to load video URL");
+        if (!urls[analysisKey]) throw new Error("Failed to load analysis URL");
+        setVideoUrl(urls[videoKey]);
 
         // Fetch analysis JSON
-        const analysisJsonRes = await fetch(analysisUrlData.downloadUrl);
+        const analysisJsonRes = await fetch(urls[analysisKey]);
         if (!analysisJsonRes.ok) throw new Error("Analysis file not found");
 
         const analysisJson = await analysisJsonRes.json();
@@ -0,0 +1,51 @@
+/**
+ * Client for the backend live session API
+ *
+ * The browser already runs MediaPipe for the overlay, so only landmark
+ * frames are sent; the backend keeps the rolling window and returns
+ * the same score and weak label the offline analysis would give.
+ */
+const API_BASE = import.meta.env.VITE_API_BASE_URL;
+
+// Must stay within the backend's LIVE_MAX_FRAMES_PER_BATCH
+export const LIVE_MAX_FRAMES_PER_BATCH = 120;
+
+export async function startLiveSession(userId, windowSec) {
+  const res = await fetch(`${API_BASE}/api/live/sessions`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ userId, windowSec }),
+  });
+  if (!res.ok) {
+    throw new Error("Failed to start live session");
+  }
+  return res.json();
+}
+
+/**
+ * Sends a batch of { t, landmarks } frames and returns the window score
+ * An expired or unknown session rejects with err.status === 404
+ */
+export async function pushLiveFrames(sessionId, userId, frames) {
+  const res = await fetch(`${API_BASE}/api/live/sessions/${sessionId}/frames`, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify({ userId, frames }),
+  });
+  if (!res.ok) {
+    const err = new Error("Failed to send live frames");
+    err.status = res.status;
+    throw err;
+  }
+  return res.json();
+}
+
+/**
+ * Ends a session; keepalive lets the request finish while the page unloads
+ */
+export function closeLiveSession(sessionId, userId) {
+  return fetch(
+    `${API_BASE}/api/live/sessions/${sessionId}?userId=${encodeURIComponent(userId)}`,
+    { method: "DELETE", keepalive: true }
+  ).catch(() => {});
+}
@@ -87,6 +87,16 @@ export async function uploadFile(
       }
     );
 
+    // 429: the analysis queue is full, the backend says when to retry
+    if (analyzeRes.status === 429) {
+      const body = await analyzeRes.json().catch(() => ({}));
+      const retryAfter =
+        body.retryAfterSec || Number(analyzeRes.headers.get("Retry-After")) || 30;
+      const err = new Error("Analysis queue is full");
+      err.userMessage = `The analysis queue is full right now. Please try again in about ${retryAfter} seconds.`;
+      throw err;
+    }
+
     if (!analyzeRes.ok) {
       throw new Error("Failed to start analysis");
     }
@@ -98,7 +108,7 @@ export async function uploadFile(
 
     return { videoKey: objectKey };
   } catch (err) {
-    toast.error("Upload failed", { id: toastId });
+    toast.error(err.userMessage || "Upload failed", { id: toastId });
     throw err;
   }
 }